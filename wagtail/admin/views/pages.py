@@ -85,7 +85,9 @@ def index(request, parent_page_id=None):
         # Retrieve pages in their most specific form.
         # Only do this for paginated listings, as this could potentially be a
         # very expensive operation when performed on a large queryset.
-        pages = pages.specific()
+        # The fields shared by all pages have already been fetched by this
+        # query, so only fetch the fields of each page type's own table.
+        pages = pages.specific(defer=True)
 
     # allow hooks to modify the queryset
     for hook in hooks.get_hooks('construct_explorer_page_queryset'):
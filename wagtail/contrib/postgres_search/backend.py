@@ -3,15 +3,16 @@ from warnings import warn
 from django.contrib.postgres.search import SearchQuery as PostgresSearchQuery
 from django.contrib.postgres.search import SearchRank, SearchVector
 from django.db import DEFAULT_DB_ALIAS, NotSupportedError, connections, transaction
-from django.db.models import F, Manager, Q, TextField, Value
+from django.db.models import F, IntegerField, Manager, Q, TextField, Value
 from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import RawSQL
 from django.db.models.functions import Cast
 from django.utils.encoding import force_text
 
 from wagtail.search.backends.base import (
     BaseSearchBackend, BaseSearchQueryCompiler, BaseSearchResults)
-from wagtail.search.index import RelatedFields, SearchField
-from wagtail.search.query import And, MatchAll, Not, Or, SearchQueryShortcut, Term
+from wagtail.search.index import RelatedFields, SearchField, prefetch_search_related_objects
+from wagtail.search.query import And, MatchAll, Not, Or, Prefix, SearchQueryShortcut, Term
 from wagtail.search.utils import ADD, AND, OR
 
 from .models import IndexEntry
@@ -20,7 +21,29 @@ from .utils import (
     get_descendants_content_types_pks, get_postgresql_connections, get_weight, unidecode)
 
 
-# TODO: Add autocomplete.
+class PostgresPrefixSearchQuery(PostgresSearchQuery):
+    """
+    A tsquery matching the lexemes that start with each word of value, using
+    ``to_tsquery`` with the ``:*`` prefix label
+    """
+    def get_tsquery(self):
+        # Quote each word, so that characters with a meaning in tsquery syntax are ignored
+        return ' & '.join(
+            "'%s':*" % word.replace('\\', '\\\\').replace("'", "''")
+            for word in self.value.split()
+        )
+
+    def as_sql(self, compiler, connection):
+        params = [self.get_tsquery()]
+        if self.config:
+            config_sql, config_params = compiler.compile(self.config)
+            template = 'to_tsquery({}::regconfig, %s)'.format(config_sql)
+            params = config_params + params
+        else:
+            template = 'to_tsquery(%s)'
+        if self.invert:
+            template = '!!({})'.format(template)
+        return template, params
 
 
 class Index:
@@ -68,8 +91,10 @@ class Index:
                              for item in value.values())
         return force_text(value)
 
-    def prepare_field(self, obj, field):
+    def prepare_field(self, obj, field, partial_match_only=False):
         if isinstance(field, SearchField):
+            if partial_match_only and not field.partial_match:
+                return
             yield (unidecode(self.prepare_value(field.get_value(obj))),
                    get_weight(field.boost))
         elif isinstance(field, RelatedFields):
@@ -84,45 +109,66 @@ class Index:
                 sub_objs = [sub_obj]
             for sub_obj in sub_objs:
                 for sub_field in field.fields:
-                    for value in self.prepare_field(sub_obj, sub_field):
+                    for value in self.prepare_field(sub_obj, sub_field,
+                                                    partial_match_only):
                         yield value
 
     def prepare_body(self, obj):
         return [(value, boost) for field in self.search_fields
                 for value, boost in self.prepare_field(obj, field)]
 
+    def prepare_autocomplete(self, obj):
+        return [value for field in self.search_fields
+                for value, boost in self.prepare_field(obj, field,
+                                                       partial_match_only=True)]
+
     def add_item(self, obj):
         self.add_items(self.model, [obj])
 
-    def add_items_upsert(self, connection, content_type_pk, objs, config):
+    def add_items_upsert(self, connection, content_type_pk, objs, config,
+                         autocomplete_config):
         vectors_sql = []
         data_params = []
         sql_template = ('to_tsvector(%s)' if config is None
                         else "to_tsvector('%s', %%s)" % config)
         sql_template = 'setweight(%s, %%s)' % sql_template
+        autocomplete_sql_template = "to_tsvector('%s', %%s)" % autocomplete_config
         for obj in objs:
             data_params.extend((content_type_pk, obj._object_id))
             if obj._body_:
-                vectors_sql.append('||'.join(sql_template for _ in obj._body_))
+                body_sql = '||'.join(sql_template for _ in obj._body_)
                 data_params.extend([v for t in obj._body_ for v in t])
             else:
-                vectors_sql.append("''::tsvector")
+                body_sql = "''::tsvector"
+            if obj._autocomplete_:
+                autocomplete_sql = '||'.join(autocomplete_sql_template
+                                             for _ in obj._autocomplete_)
+                data_params.extend(obj._autocomplete_)
+            else:
+                autocomplete_sql = "''::tsvector"
+            vectors_sql.append('%s, %s' % (body_sql, autocomplete_sql))
         data_sql = ', '.join(['(%%s, %%s, %s)' % s for s in vectors_sql])
         with connection.cursor() as cursor:
             cursor.execute("""
-                INSERT INTO %s(content_type_id, object_id, body_search)
+                INSERT INTO %s(content_type_id, object_id, body_search, autocomplete)
                 (VALUES %s)
                 ON CONFLICT (content_type_id, object_id)
-                DO UPDATE SET body_search = EXCLUDED.body_search
+                DO UPDATE SET body_search = EXCLUDED.body_search,
+                              autocomplete = EXCLUDED.autocomplete
                 """ % (IndexEntry._meta.db_table, data_sql), data_params)
 
-    def add_items_update_then_create(self, content_type_pk, objs, config):
+    def add_items_update_then_create(self, content_type_pk, objs, config,
+                                     autocomplete_config):
         ids_and_objs = {}
         for obj in objs:
             obj._search_vector = (
                 ADD([SearchVector(Value(text), weight=weight, config=config)
                      for text, weight in obj._body_])
                 if obj._body_ else SearchVector(Value('')))
+            obj._autocomplete_vector = (
+                ADD([SearchVector(Value(text), config=autocomplete_config)
+                     for text in obj._autocomplete_])
+                if obj._autocomplete_ else SearchVector(Value('')))
             ids_and_objs[obj._object_id] = obj
         index_entries_for_ct = self.index_entries.filter(
             content_type_id=content_type_pk)
@@ -132,7 +178,8 @@ class Index:
         for indexed_id in indexed_ids:
             obj = ids_and_objs[indexed_id]
             index_entries_for_ct.filter(object_id=obj._object_id) \
-                .update(body_search=obj._search_vector)
+                .update(body_search=obj._search_vector,
+                        autocomplete=obj._autocomplete_vector)
         to_be_created = []
         for object_id in ids_and_objs:
             if object_id not in indexed_ids:
@@ -140,15 +187,22 @@ class Index:
                     content_type_id=content_type_pk,
                     object_id=object_id,
                     body_search=ids_and_objs[object_id]._search_vector,
+                    autocomplete=ids_and_objs[object_id]._autocomplete_vector,
                 ))
         self.index_entries.bulk_create(to_be_created)
 
     def add_items(self, model, objs):
         content_type_pk = get_content_type_pk(model)
         config = self.backend.get_config()
+        autocomplete_config = self.backend.get_autocomplete_config()
+
+        # Fetch the related objects needed for the index entries for all objects at once
+        prefetch_search_related_objects(model, objs)
+
         for obj in objs:
             obj._object_id = force_text(obj.pk)
             obj._body_ = self.prepare_body(obj)
+            obj._autocomplete_ = self.prepare_autocomplete(obj)
 
         # Removes index entries of an ancestor model in case the descendant
         # model instance was created since.
@@ -158,9 +212,11 @@ class Index:
 
         connection = connections[self.db_alias]
         if connection.pg_version >= 90500:  # PostgreSQL >= 9.5
-            self.add_items_upsert(connection, content_type_pk, objs, config)
+            self.add_items_upsert(connection, content_type_pk, objs, config,
+                                  autocomplete_config)
         else:
-            self.add_items_update_then_create(content_type_pk, objs, config)
+            self.add_items_update_then_create(content_type_pk, objs, config,
+                                              autocomplete_config)
 
     def delete_item(self, item):
         item.index_entries.using(self.db_alias).delete()
@@ -172,10 +228,16 @@ class Index:
 class PostgresSearchQueryCompiler(BaseSearchQueryCompiler):
     DEFAULT_OPERATOR = 'and'
 
+    # The field of IndexEntry holding the search vectors to match the query against
+    vector_field = 'body_search'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.search_fields = self.queryset.model.get_searchable_search_fields()
 
+    def get_config(self, backend):
+        return backend.get_config()
+
     def build_database_query(self, query=None, config=None):
         if query is None:
             query = self.query
@@ -188,6 +250,12 @@ class PostgresSearchQueryCompiler(BaseSearchQueryCompiler):
                 warn('PostgreSQL search backend '
                      'does not support term boosting for now.')
             return PostgresSearchQuery(unidecode(query.term), config=config)
+        if isinstance(query, Prefix):
+            if query.boost != 1:
+                warn('PostgreSQL search backend '
+                     'does not support term boosting for now.')
+            return PostgresPrefixSearchQuery(unidecode(query.prefix),
+                                             config=config)
         if isinstance(query, Not):
             return ~self.build_database_query(query.subquery, config)
         if isinstance(query, And):
@@ -226,7 +294,7 @@ class PostgresSearchQueryCompiler(BaseSearchQueryCompiler):
         queryset = self.queryset
         query = queryset.query
         if self.fields is None:
-            vector = F('index_entries__body_search')
+            vector = F('index_entries__' + self.vector_field)
         else:
             vector = ADD(
                 SearchVector(field, config=search_query.config,
@@ -234,7 +302,7 @@ class PostgresSearchQueryCompiler(BaseSearchQueryCompiler):
                 for field in self.fields)
         vector = vector.resolve_expression(query)
         search_query = search_query.resolve_expression(query)
-        lookup = IndexEntry._meta.get_field('body_search').get_lookup('exact')(
+        lookup = IndexEntry._meta.get_field(self.vector_field).get_lookup('exact')(
             vector, search_query)
         query.where.add(lookup, 'AND')
         if self.order_by_relevance:
@@ -266,13 +334,56 @@ class PostgresSearchQueryCompiler(BaseSearchQueryCompiler):
         return q
 
 
+class PostgresAutocompleteQueryCompiler(PostgresSearchQueryCompiler):
+    """
+    Matches each word of the query as the start of a word in the fields with
+    ``partial_match=True``, so that results can be shown as the user types
+    """
+    vector_field = 'autocomplete'
+
+    def get_config(self, backend):
+        return backend.get_autocomplete_config()
+
+    def build_database_query(self, query=None, config=None):
+        if query is None:
+            query = self.query
+
+        if isinstance(query, Term):
+            return PostgresPrefixSearchQuery(unidecode(query.term),
+                                             config=config)
+        return super().build_database_query(query, config)
+
+
 class PostgresSearchResults(BaseSearchResults):
     def _do_search(self):
-        return list(self.query_compiler.search(self.backend.get_config(),
-                                               self.start, self.stop))
+        queryset = self.query_compiler.search(self.query_compiler.get_config(self.backend),
+                                              self.start, self.stop)
+
+        # The index entries only hold search vectors, so field values are
+        # read from the model's table, without creating model instances
+        if self._values_fields is not None:
+            return list(self._get_records_from_queryset(queryset))
+
+        return list(queryset)
+
+    def _do_search_with_count(self):
+        if self._values_fields is not None:
+            return super()._do_search_with_count()
+
+        # Count the matching rows with a window function, in the same query as the results
+        queryset = self.query_compiler.search(self.query_compiler.get_config(self.backend),
+                                              None, None)
+        queryset = queryset.annotate(
+            _total_count=RawSQL('COUNT(*) OVER ()', (), output_field=IntegerField())
+        )
+        results = list(queryset[self.start:self.stop])
+        if not results:
+            return results, None
+
+        return results, results[0]._total_count
 
     def _do_count(self):
-        return self.query_compiler.search(self.backend.get_config(), None, None).count()
+        return self.query_compiler.search(self.query_compiler.get_config(self.backend), None, None).count()
 
 
 class PostgresSearchRebuilder:
@@ -283,11 +394,17 @@ class PostgresSearchRebuilder:
         self.index.delete_stale_entries()
         return self.index
 
+    def resume(self, index_name):
+        return self.index
+
     def finish(self):
         pass
 
 
 class PostgresSearchAtomicRebuilder(PostgresSearchRebuilder):
+    # An interrupted rebuild is rolled back, so it can't be resumed
+    resume = None
+
     def __init__(self, index):
         super().__init__(index)
         self.transaction = transaction.atomic(using=index.db_alias)
@@ -311,6 +428,7 @@ class PostgresSearchAtomicRebuilder(PostgresSearchRebuilder):
 
 class PostgresSearchBackend(BaseSearchBackend):
     query_compiler_class = PostgresSearchQueryCompiler
+    autocomplete_query_compiler_class = PostgresAutocompleteQueryCompiler
     results_class = PostgresSearchResults
     rebuilder_class = PostgresSearchRebuilder
     atomic_rebuilder_class = PostgresSearchAtomicRebuilder
@@ -325,6 +443,10 @@ class PostgresSearchBackend(BaseSearchBackend):
     def get_config(self):
         return self.params.get('SEARCH_CONFIG')
 
+    def get_autocomplete_config(self):
+        # Words are kept unstemmed by default, so that any prefix of them matches
+        return self.params.get('AUTOCOMPLETE_CONFIG', 'simple')
+
     def get_index_for_model(self, model, db_alias=None):
         return Index(self, model, db_alias)
 
@@ -0,0 +1,23 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('postgres_search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='indexentry',
+            name='autocomplete',
+            field=django.contrib.postgres.search.SearchVectorField(default=''),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='indexentry',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['autocomplete'], name='postgres_se_autocom_ee48c8_gin'),
+        ),
+    ]
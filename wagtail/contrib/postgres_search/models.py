@@ -48,12 +48,14 @@ class IndexEntry(Model):
 
     # TODO: Add per-object boosting.
     body_search = SearchVectorField()
+    # The words of the fields with partial_match=True, unstemmed, for prefix queries
+    autocomplete = SearchVectorField()
 
     class Meta:
         unique_together = ('content_type', 'object_id')
         verbose_name = _('index entry')
         verbose_name_plural = _('index entries')
-        indexes = [GinIndex(fields=['body_search'])]
+        indexes = [GinIndex(fields=['body_search']), GinIndex(fields=['autocomplete'])]
 
     def __str__(self):
         return '%s: %s' % (self.content_type.name, self.content_object)
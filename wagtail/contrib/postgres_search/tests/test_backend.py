@@ -1,6 +1,8 @@
 from django.test import TestCase
 
+from wagtail.search.query import Prefix
 from wagtail.search.tests.test_backends import BackendTests
+from wagtail.tests.search import models
 
 from ..utils import BOOSTS_WEIGHTS, WEIGHTS_VALUES, determine_boosts_weights, get_weight
 
@@ -8,6 +10,35 @@ from ..utils import BOOSTS_WEIGHTS, WEIGHTS_VALUES, determine_boosts_weights, ge
 class TestPostgresSearchBackend(BackendTests, TestCase):
     backend_path = 'wagtail.contrib.postgres_search.backend'
 
+    def test_autocomplete(self):
+        results = self.backend.autocomplete("Jav", models.Book)
+        self.assertUnsortedListEqual([r.title for r in results], [
+            "JavaScript: The good parts",
+            "JavaScript: The Definitive Guide"
+        ])
+
+    def test_autocomplete_child_class_field_from_parent(self):
+        # "Westeros" only occurs in the Novel.setting field, which has partial_match=True
+        results = self.backend.autocomplete("Wester", models.Book)
+        self.assertUnsortedListEqual([r.title for r in results], [
+            "A Game of Thrones",
+            "A Clash of Kings",
+            "A Storm of Swords"
+        ])
+
+    def test_autocomplete_and_operator(self):
+        results = self.backend.autocomplete("Jav Defin", models.Book, operator='and')
+        self.assertUnsortedListEqual([r.title for r in results], [
+            "JavaScript: The Definitive Guide"
+        ])
+
+    def test_prefix(self):
+        results = self.backend.search(Prefix("Jav"), models.Book)
+        self.assertUnsortedListEqual([r.title for r in results], [
+            "JavaScript: The good parts",
+            "JavaScript: The Definitive Guide"
+        ])
+
     def test_weights(self):
         self.assertListEqual(BOOSTS_WEIGHTS,
                              [(10, 'A'), (2, 'B'), (0.5, 'C'), (0.25, 'D')])
@@ -208,6 +208,55 @@ class Block(metaclass=BaseBlock):
         """
         return value
 
+    def collect_object_references(self, value, references):
+        """
+        Add the primary keys of the model instances that to_python would fetch for 'value' (a
+        JSON-serialisable value) to 'references', a dict mapping each model to a set of primary
+        keys. Blocks that look up model instances (such as choosers), or that contain other
+        blocks, override this along with to_python_with_objects, so that all the instances
+        referred to within a stream can be fetched with one query per model.
+        """
+        pass
+
+    def to_python_with_objects(self, value, objects):
+        """
+        Equivalent to to_python, but taking the model instances referred to by 'value' from
+        'objects' - a dict mapping each model to a dict of its instances by primary key, as
+        returned by get_referenced_objects - rather than the database.
+        """
+        return self.to_python(value)
+
+    def has_custom_to_python(self):
+        """
+        Return True if a subclass overrides the to_python of the class that implements
+        to_python_with_objects, so that values should be converted through to_python rather
+        than the collect_object_references protocol
+        """
+        for cls in type(self).__mro__:
+            if 'to_python_with_objects' in vars(cls):
+                return type(self).to_python is not cls.to_python
+
+        return False
+
+    def has_custom_bulk_to_python(self):
+        """
+        Return True if this block converts lists of values through its own bulk_to_python,
+        rather than the collect_object_references protocol
+        """
+        return type(self).bulk_to_python is not Block.bulk_to_python
+
+    def bulk_to_python(self, values):
+        """
+        Apply to_python to a list of values, fetching the model instances that they refer to
+        with one query per model. The results are returned in the same order as the values.
+        """
+        references = {}
+        for value in values:
+            self.collect_object_references(value, references)
+
+        objects = get_referenced_objects(references)
+        return [self.to_python_with_objects(value, objects) for value in values]
+
     def get_context(self, value, parent_context=None):
         """
         Return a dict of context variables (derived from the block value and combined with the parent_context)
@@ -406,6 +455,18 @@ class Block(metaclass=BaseBlock):
         return (self.name == other.name) and (self.deconstruct() == other.deconstruct())
 
 
+def get_referenced_objects(references):
+    """
+    Fetch the model instances given by 'references' (as populated by
+    Block.collect_object_references) with one query per model, and return them as a dict
+    mapping each model to a dict of its instances by primary key
+    """
+    return {
+        model: model.objects.in_bulk(pks)
+        for model, pks in references.items()
+    }
+
+
 class BoundBlock:
     def __init__(self, block, value, prefix=None, errors=None):
         self.block = block
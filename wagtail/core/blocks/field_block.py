@@ -549,13 +549,18 @@ class ChooserBlock(FieldBlock):
             except self.target_model.DoesNotExist:
                 return None
 
-    def bulk_to_python(self, values):
-        """Return the model instances for the given list of primary keys.
-
-        The instances must be returned in the same order as the values and keep None values.
-        """
-        objects = self.target_model.objects.in_bulk(values)
-        return [objects.get(id) for id in values]  # Keeps the ordering the same as in values.
+    def collect_object_references(self, value, references):
+        if value is not None and not self.has_custom_to_python():
+            references.setdefault(self.target_model, set()).add(value)
+
+    def to_python_with_objects(self, value, objects):
+        # ids missing from objects are of deleted instances, which to_python also returns as None
+        if self.has_custom_to_python():
+            return self.to_python(value)
+        elif value is None:
+            return value
+        else:
+            return objects.get(self.target_model, {}).get(value)
 
     def get_prep_value(self, value):
         # the native value (a model instance or None) should serialise to a PK or None
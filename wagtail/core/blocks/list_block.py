@@ -134,6 +134,22 @@ class ListBlock(Block):
             for item in value
         ]
 
+    def collect_object_references(self, value, references):
+        if self.has_custom_to_python():
+            return
+
+        for item in value:
+            self.child_block.collect_object_references(item, references)
+
+    def to_python_with_objects(self, value, objects):
+        if self.has_custom_to_python():
+            return self.to_python(value)
+
+        return [
+            self.child_block.to_python_with_objects(item, objects)
+            for item in value
+        ]
+
     def get_prep_value(self, value):
         # recursively call get_prep_value on children and return as a list
         return [
@@ -1,23 +1,39 @@
 import collections
+import json
 import uuid
 
 from django import forms
+from django.conf import settings
 from django.contrib.staticfiles.templatetags.staticfiles import static
 from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.forms.utils import ErrorList
 from django.template.loader import render_to_string
 from django.utils.html import format_html_join
+from django.utils.module_loading import import_string
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext as _
 
 from wagtail.core.utils import escape_script
 
-from .base import Block, BoundBlock, DeclarativeSubBlocksMetaclass
+from .base import Block, BoundBlock, DeclarativeSubBlocksMetaclass, get_referenced_objects
 from .utils import indent, js_dict
 
 __all__ = ['BaseStreamBlock', 'StreamBlock', 'StreamValue', 'StreamBlockValidationError']
 
 
+def load_stream_json(raw_json):
+    """
+    Parse the JSON representation of a stream, using the function named by the
+    ``WAGTAIL_STREAMFIELD_JSON_LOADS`` setting (such as ``'ujson.loads'``) if it is set,
+    or ``json.loads`` otherwise. The function must raise ValueError for invalid JSON.
+    """
+    loads_path = getattr(settings, 'WAGTAIL_STREAMFIELD_JSON_LOADS', None)
+    if loads_path:
+        return import_string(loads_path)(raw_json)
+    else:
+        return json.loads(raw_json)
+
+
 class StreamBlockValidationError(ValidationError):
     def __init__(self, block_errors=None, non_block_errors=None):
         params = {}
@@ -237,6 +253,25 @@ class BaseStreamBlock(Block):
             if child_data['type'] in self.child_blocks
         ], is_lazy=True)
 
+    def collect_object_references(self, value, references):
+        if self.has_custom_to_python():
+            return
+
+        for child_data in value:
+            child_block = self.child_blocks.get(child_data['type'])
+            # Blocks with their own bulk_to_python are converted by it, in StreamValue
+            if child_block is not None and not child_block.has_custom_bulk_to_python():
+                child_block.collect_object_references(child_data['value'], references)
+
+    def to_python_with_objects(self, value, objects):
+        if self.has_custom_to_python():
+            return self.to_python(value)
+
+        # As to_python, but the children are expanded (lazily) from the instances in objects
+        stream_value = self.to_python(value)
+        stream_value._objects = objects
+        return stream_value
+
     def get_prep_value(self, value):
         if value is None:
             # treat None as identical to an empty stream
@@ -347,7 +382,7 @@ class StreamValue(collections.Sequence):
             """
             return self.block.name
 
-    def __init__(self, stream_block, stream_data, is_lazy=False, raw_text=None):
+    def __init__(self, stream_block, stream_data, is_lazy=False, raw_text=None, raw_json=None):
         """
         Construct a StreamValue linked to the given StreamBlock,
         with child values given in stream_data.
@@ -366,25 +401,74 @@ class StreamValue(collections.Sequence):
         migrated to a StreamField. In this situation we return a blank StreamValue
         with the raw text accessible under the `raw_text` attribute, so that migration
         code can be rewritten to convert it as desired.
+
+        raw_json is the stream's content as stored in the database, as a JSON string; when
+        it is given, stream_data and raw_text are not passed, and are only found (by parsing
+        raw_json, as StreamField.to_python would) when first accessed, so that values which
+        are loaded but never used don't cost the time and memory of parsing them. This
+        implies is_lazy=True.
         """
-        self.is_lazy = is_lazy
+        self.is_lazy = is_lazy or raw_json is not None
         self.stream_block = stream_block  # the StreamBlock object that handles this value
-        self.stream_data = stream_data  # a list of (type_name, value) tuples
+        self._stream_data = stream_data  # a list of (type_name, value) tuples
         self._bound_blocks = {}  # populated lazily from stream_data as we access items through __getitem__
-        self.raw_text = raw_text
+        self._objects = None  # model instances referred to by stream_data, fetched on first access
+        self._raw_text = raw_text
+        self._raw_json = raw_json
+
+    def _parse_raw_json(self):
+        raw_json, self._raw_json = self._raw_json, None
+        try:
+            stream_data = load_stream_json(raw_json)
+        except ValueError:
+            # Not valid JSON; keep the raw text, as StreamField.to_python does
+            self._raw_text = raw_json
+            stream_data = []
+
+        # Skip unrecognised block types, as StreamBlock.to_python does. stream_data is None
+        # if the field holds the literal string 'null'
+        self._stream_data = [
+            child_data for child_data in stream_data or []
+            if child_data['type'] in self.stream_block.child_blocks
+        ]
+
+    @property
+    def stream_data(self):
+        if self._raw_json is not None:
+            self._parse_raw_json()
+        return self._stream_data
+
+    @stream_data.setter
+    def stream_data(self, stream_data):
+        self._raw_json = None
+        self._stream_data = stream_data
+
+    @property
+    def raw_text(self):
+        if self._raw_json is not None:
+            self._parse_raw_json()
+        return self._raw_text
+
+    @raw_text.setter
+    def raw_text(self, raw_text):
+        self._raw_text = raw_text
 
     def __getitem__(self, i):
+        if isinstance(i, slice):
+            # Only the children within the slice are converted to native values
+            return [self[j] for j in range(*i.indices(len(self)))]
+
         if i not in self._bound_blocks:
             if self.is_lazy:
                 raw_value = self.stream_data[i]
                 type_name = raw_value['type']
                 child_block = self.stream_block.child_blocks[type_name]
-                if hasattr(child_block, 'bulk_to_python'):
+                if child_block.has_custom_bulk_to_python():
                     self._prefetch_blocks(type_name, child_block)
                     return self._bound_blocks[i]
-                else:
-                    value = child_block.to_python(raw_value['value'])
-                    block_id = raw_value.get('id')
+
+                value = child_block.to_python_with_objects(raw_value['value'], self._get_objects())
+                block_id = raw_value.get('id')
             else:
                 try:
                     type_name, value, block_id = self.stream_data[i]
@@ -398,9 +482,35 @@ class StreamValue(collections.Sequence):
 
         return self._bound_blocks[i]
 
+    def _get_block_name(self, i):
+        if self.is_lazy:
+            return self.stream_data[i]['type']
+        else:
+            return self.stream_data[i][0]
+
+    def blocks_by_name(self, block_name):
+        """
+        Return a list of the children of the given block type (such as 'image'), without
+        converting the other children to native values
+        """
+        return [
+            self[i] for i in range(len(self))
+            if self._get_block_name(i) == block_name
+        ]
+
+    def first_block_by_name(self, block_name):
+        """
+        Return the first child of the given block type, or None if there isn't one
+        """
+        for i in range(len(self)):
+            if self._get_block_name(i) == block_name:
+                return self[i]
+
+        return None
+
     def _prefetch_blocks(self, type_name, child_block):
         """Prefetch all child blocks for the given `type_name` using the
-        given `child_blocks`.
+        given `child_blocks`, for blocks that implement their own bulk_to_python.
 
         This prevents n queries for n blocks of a specific type.
         """
@@ -419,6 +529,19 @@ class StreamValue(collections.Sequence):
             block_id = self.stream_data[i].get('id')
             self._bound_blocks[i] = StreamValue.StreamChild(child_block, value, id=block_id)
 
+    def _get_objects(self):
+        """
+        Return the model instances referred to by any of the blocks in the stream (including
+        those nested within structs, lists and streams), fetching them with one query per
+        model on first access. This prevents n queries for n chooser blocks.
+        """
+        if self._objects is None:
+            references = {}
+            self.stream_block.collect_object_references(self.stream_data, references)
+            self._objects = get_referenced_objects(references)
+
+        return self._objects
+
     def __eq__(self, other):
         if not isinstance(other, StreamValue):
             return False
@@ -439,3 +562,22 @@ class StreamValue(collections.Sequence):
 
     def __str__(self):
         return self.__html__()
+
+
+def prefetch_stream_values(stream_values):
+    """
+    Fetch the model instances referred to by the blocks of all the given StreamValues with
+    one query per model, rather than one query per model for each StreamValue
+    """
+    stream_values = [
+        stream_value for stream_value in stream_values
+        if stream_value.is_lazy and stream_value._objects is None
+    ]
+
+    references = {}
+    for stream_value in stream_values:
+        stream_value.stream_block.collect_object_references(stream_value.stream_data, references)
+
+    objects = get_referenced_objects(references)
+    for stream_value in stream_values:
+        stream_value._objects = objects
@@ -147,6 +147,27 @@ class BaseStructBlock(Block):
             for name, child_block in self.child_blocks.items()
         ])
 
+    def collect_object_references(self, value, references):
+        if self.has_custom_to_python():
+            return
+
+        for name, child_block in self.child_blocks.items():
+            if name in value:
+                child_block.collect_object_references(value[name], references)
+
+    def to_python_with_objects(self, value, objects):
+        if self.has_custom_to_python():
+            return self.to_python(value)
+
+        return self._to_struct_value([
+            (
+                name,
+                (child_block.to_python_with_objects(value[name], objects) if name in value
+                 else child_block.get_default())
+            )
+            for name, child_block in self.child_blocks.items()
+        ])
+
     def _to_struct_value(self, block_items):
         """ Return a Structvalue representation of the sub-blocks in this block """
         return self.meta.value_class(self, block_items)
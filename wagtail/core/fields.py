@@ -4,6 +4,7 @@ from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 from wagtail.core.blocks import Block, BlockField, StreamBlock, StreamValue
+from wagtail.core.blocks.stream_block import load_stream_json
 
 
 class RichTextField(models.TextField):
@@ -67,7 +68,7 @@ class StreamField(models.Field):
             return value
         elif isinstance(value, str):
             try:
-                unpacked_value = json.loads(value)
+                unpacked_value = load_stream_json(value)
             except ValueError:
                 # value is not valid JSON; most likely, this field was previously a
                 # rich text field before being migrated to StreamField, and the data
@@ -106,6 +107,11 @@ class StreamField(models.Field):
             return json.dumps(self.stream_block.get_prep_value(value), cls=DjangoJSONEncoder)
 
     def from_db_value(self, value, expression, connection, context):
+        # Only parse the JSON when the value is first accessed - unless the stream block
+        # converts it in its own way
+        if isinstance(value, str) and value and not self.stream_block.has_custom_to_python():
+            return StreamValue(self.stream_block, None, raw_json=value)
+
         return self.to_python(value)
 
     def formfield(self, **kwargs):
@@ -18,7 +18,6 @@ from django.db.models import Q, Value
 from django.db.models.functions import Concat, Substr
 from django.http import Http404
 from django.template.response import TemplateResponse
-from django.urls import reverse
 from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.text import capfirst, slugify
@@ -27,9 +26,11 @@ from modelcluster.models import ClusterableModel, get_all_child_relations
 from treebeard.mp_tree import MP_Node
 
 from wagtail.core.query import PageQuerySet, TreeQuerySet
+from wagtail.core.rich_text import render_cache
 from wagtail.core.signals import page_published, page_unpublished
-from wagtail.core.sites import get_site_for_hostname
-from wagtail.core.url_routing import RouteResult
+from wagtail.core.sites import (
+    SiteRootPathIndex, get_site_for_hostname, site_cache, site_cache_enabled)
+from wagtail.core.url_routing import RouteResult, reverse_serve_url
 from wagtail.core.utils import WAGTAIL_APPEND_SLASH, camelcase_to_underscore, resolve_model_string
 from wagtail.search import index
 
@@ -486,6 +487,8 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
         # Check if this is a root page of any sites and clear the 'wagtail_site_root_paths' key if so
         if Site.objects.filter(root_page=self).exists():
             cache.delete('wagtail_site_root_paths')
+            if site_cache_enabled():
+                site_cache.invalidate()
 
         # Log
         if is_new:
@@ -592,6 +595,13 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
                 Value(new_url_path),
                 Substr('url_path', len(old_url_path) + 1))))
 
+        # The url_path of a site root page held in the site cache may have changed
+        if site_cache_enabled():
+            site_cache.invalidate()
+
+        # Rich text may link to any of the descendants, whose URLs have changed
+        render_cache.invalidate_all()
+
     #: Return this page in its most specific subclassed form.
     @cached_property
     def specific(self):
@@ -786,6 +796,20 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
             cache_object._wagtail_cached_site_root_paths = Site.get_site_root_paths()
             return cache_object._wagtail_cached_site_root_paths
 
+    def _get_site_root_path_index(self, request=None):
+        """
+        Return a ``SiteRootPathIndex`` for ``Site.get_site_root_paths()``, using the
+        cached copy on the request object if available.
+        """
+        cache_object = request if request else self
+        try:
+            return cache_object._wagtail_cached_site_root_path_index
+        except AttributeError:
+            cache_object._wagtail_cached_site_root_path_index = SiteRootPathIndex(
+                self._get_site_root_paths(request)
+            )
+            return cache_object._wagtail_cached_site_root_path_index
+
     def get_url_parts(self, request=None):
         """
         Determine the URL for this page and return it as a tuple of
@@ -803,17 +827,21 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
         ``request`` directly, and should just pass it to the original method
         when calling ``super``.
         """
-        for (site_id, root_path, root_url) in self._get_site_root_paths(request):
-            if self.url_path.startswith(root_path):
-                page_path = reverse('wagtail_serve', args=(self.url_path[len(root_path):],))
+        site_root_path = self._get_site_root_path_index(request).find(self.url_path)
+        if site_root_path is None:
+            # page is not within any site
+            return
 
-                # Remove the trailing slash from the URL reverse generates if
-                # WAGTAIL_APPEND_SLASH is False and we're not trying to serve
-                # the root path
-                if not WAGTAIL_APPEND_SLASH and page_path != '/':
-                    page_path = page_path.rstrip('/')
+        site_id, root_path, root_url = site_root_path
+        page_path = reverse_serve_url(self.url_path[len(root_path):])
 
-                return (site_id, root_url, page_path)
+        # Remove the trailing slash from the URL reverse generates if
+        # WAGTAIL_APPEND_SLASH is False and we're not trying to serve
+        # the root path
+        if not WAGTAIL_APPEND_SLASH and page_path != '/':
+            page_path = page_path.rstrip('/')
+
+        return (site_id, root_url, page_path)
 
     def get_full_url(self, request=None):
         """Return the full URL (including protocol / domain) to this page, or None if it is not routable"""
@@ -1416,6 +1444,30 @@ class Page(AbstractPage, index.Indexed, ClusterableModel, metaclass=PageBase):
         verbose_name_plural = _('pages')
 
 
+def get_urls_bulk(pages, request=None, full_url=False):
+    """
+    Return a list of the URLs of the given pages, in the same order; each URL is
+    the same as ``page.get_url(request)`` (or ``page.get_full_url(request)`` if
+    ``full_url`` is True) would return.
+
+    The list of site root paths is looked up once and shared between all of the
+    pages, even if no request is passed to cache it on.
+    """
+    pages = list(pages)
+
+    if request is None and pages:
+        site_root_paths = Site.get_site_root_paths()
+        site_root_path_index = SiteRootPathIndex(site_root_paths)
+        for page in pages:
+            page._wagtail_cached_site_root_paths = site_root_paths
+            page._wagtail_cached_site_root_path_index = site_root_path_index
+
+    if full_url:
+        return [page.get_full_url(request=request) for page in pages]
+    else:
+        return [page.get_url(request=request) for page in pages]
+
+
 class Orderable(models.Model):
     sort_order = models.IntegerField(null=True, blank=True, editable=False)
     sort_order_field = 'sort_order'
@@ -3,11 +3,12 @@ from collections import defaultdict
 
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import CharField, Q
+from django.db.models import DEFERRED, CharField, Q
 from django.db.models.functions import Length, Substr
-from django.db.models.query import BaseIterable
+from django.db.models.query import BaseIterable, ModelIterable, prefetch_related_objects
 from treebeard.mp_tree import MP_NodeQuerySet
 
+from wagtail.core.blocks.stream_block import StreamValue, prefetch_stream_values
 from wagtail.search.queryset import SearchableQuerySetMixin
 
 
@@ -127,6 +128,22 @@ class TreeQuerySet(MP_NodeQuerySet):
 
 
 class PageQuerySet(SearchableQuerySetMixin, TreeQuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prefetch_stream_blocks_fields = ()
+        self._prefetch_stream_blocks_done = False
+
+    def _clone(self, **kwargs):
+        clone = super()._clone(**kwargs)
+        clone._prefetch_stream_blocks_fields = self._prefetch_stream_blocks_fields
+        return clone
+
+    def _fetch_all(self):
+        super()._fetch_all()
+        if self._prefetch_stream_blocks_fields and not self._prefetch_stream_blocks_done:
+            prefetch_stream_blocks(self._result_cache, *self._prefetch_stream_blocks_fields)
+            self._prefetch_stream_blocks_done = True
+
     def live_q(self):
         return Q(live=True)
 
@@ -336,15 +353,72 @@ class PageQuerySet(SearchableQuerySetMixin, TreeQuerySet):
         for page in self.live():
             page.unpublish()
 
-    def specific(self):
+    def specific(self, defer=False):
         """
         This efficiently gets all the specific pages for the queryset, using
         the minimum number of queries.
+
+        Any ``select_related``, ``prefetch_related``, ``annotate``, ``extra``,
+        ``defer`` and ``only`` settings on the queryset are carried over to
+        the specific pages.
+
+        If ``defer`` is True, only the columns of the specific pages' own tables
+        are fetched for each page type; the fields inherited from the queryset's
+        model are filled in from the rows that the queryset has already fetched.
         """
         clone = self._clone()
-        clone._iterable_class = SpecificIterable
+        if defer:
+            clone._iterable_class = DeferredSpecificIterable
+        else:
+            clone._iterable_class = SpecificIterable
         return clone
 
+    def iterator(self, chunk_size=None):
+        """
+        When called on a ``specific()`` queryset with a ``chunk_size``, the pages are
+        fetched and converted to their specific types ``chunk_size`` at a time, so only
+        one chunk of pages is held in memory at once. The order of the queryset is kept.
+        """
+        if chunk_size is not None and self._iterable_class in (SpecificIterable, DeferredSpecificIterable):
+            return specific_chunked_iterator(
+                self, chunk_size, defer=self._iterable_class is DeferredSpecificIterable
+            )
+
+        if chunk_size is None:
+            return super().iterator()
+        else:
+            return super().iterator(chunk_size=chunk_size)
+
+    def prefetch_stream_blocks(self, *field_names):
+        """
+        When the queryset is evaluated, fetch the objects that chooser blocks (including
+        those nested within structs, lists and streams) refer to in the given StreamFields
+        of all of the pages, with one query per model for the whole queryset, rather than
+        one query per model for each page. Pages without one of the fields (such as pages
+        of other types, on a ``specific()`` queryset) are skipped.
+
+        Calling ``prefetch_stream_blocks(None)`` clears the list of fields.
+        """
+        clone = self._clone()
+        if field_names == (None, ):
+            clone._prefetch_stream_blocks_fields = ()
+        else:
+            clone._prefetch_stream_blocks_fields = self._prefetch_stream_blocks_fields + field_names
+        return clone
+
+    def with_urls(self, request=None, full_url=False):
+        """
+        This evaluates the QuerySet and returns a list of ``(page, url)`` pairs, looking
+        up the site root paths only once for all of the pages.
+
+        The URL of each page is the same as ``page.get_url(request)`` (or
+        ``page.get_full_url(request)`` if ``full_url`` is True) would return.
+        """
+        from wagtail.core.models import get_urls_bulk
+
+        pages = list(self)
+        return list(zip(pages, get_urls_bulk(pages, request=request, full_url=full_url)))
+
     def in_site(self, site):
         """
         This filters the QuerySet to only contain pages within the specified site.
@@ -352,36 +426,280 @@ class PageQuerySet(SearchableQuerySetMixin, TreeQuerySet):
         return self.descendant_of(site.root_page, inclusive=True)
 
 
-def specific_iterator(qs):
+def prefetch_stream_blocks(instances, *field_names):
+    """
+    Fetch the objects that chooser blocks refer to in the given StreamFields of a list of
+    model instances, with one query per model for all of the instances
+    """
+    stream_values = []
+    for instance in instances:
+        for field_name in field_names:
+            # Look the field up in the instance's __dict__, so that deferred fields aren't
+            # loaded, and instances without the field (or results of values()) are skipped
+            value = getattr(instance, '__dict__', {}).get(field_name)
+            if isinstance(value, StreamValue):
+                stream_values.append(value)
+
+    prefetch_stream_values(stream_values)
+
+
+def _get_select_related_lookups(select_related, prefix=''):
+    """
+    Convert the tree of related fields held in ``Query.select_related`` back into
+    the lookups that were passed to ``select_related()``
+    """
+    for name, children in select_related.items():
+        if children:
+            yield from _get_select_related_lookups(children, prefix + name + '__')
+        else:
+            yield prefix + name
+
+
+def _copy_state_to_specific_page(page, specific_page, attnames):
+    """
+    Copy the attributes with the given names, along with any related objects fetched
+    through select_related, from a page onto its specific instance
+    """
+    for attname in attnames:
+        if attname in page.__dict__ and attname not in specific_page.__dict__:
+            specific_page.__dict__[attname] = page.__dict__[attname]
+
+    # On Django >= 2.0, related objects are cached in the model state rather than
+    # in the instance __dict__
+    fields_cache = getattr(page._state, 'fields_cache', None)
+    if fields_cache:
+        for name, value in fields_cache.items():
+            specific_page._state.fields_cache.setdefault(name, value)
+
+
+CONTENT_TYPE_FIELD_NAMES = {'content_type', 'content_type_id'}
+
+
+def _with_content_type_loaded(qs):
+    """
+    Return qs, making sure that the content type of each page is among the fields it
+    loads (``specific()`` reads it from every page), even if it was left out by
+    ``defer()`` or ``only()``
+    """
+    field_names, defer = qs.query.deferred_loading
+    if defer:
+        if not CONTENT_TYPE_FIELD_NAMES.intersection(field_names):
+            return qs
+        field_names = frozenset(field_names).difference(CONTENT_TYPE_FIELD_NAMES)
+    else:
+        if not field_names or CONTENT_TYPE_FIELD_NAMES.intersection(field_names):
+            return qs
+        field_names = frozenset(field_names).union({'content_type'})
+
+    qs = qs._clone()
+    qs.query.deferred_loading = (field_names, defer)
+    return qs
+
+
+def _get_specific_pages(qs, model, pages):
+    """
+    Return a dict of the specific instances of the given pages, which all have the
+    content type of ``model``, keyed by pk. This runs a query against ``model``
+    that reproduces the select_related and deferred field settings of ``qs``.
+    """
+    specific_qs = model.objects.filter(pk__in=[page.pk for page in pages])
+
+    select_related = qs.query.select_related
+    if select_related is True:
+        specific_qs = specific_qs.select_related()
+    elif select_related:
+        specific_qs = specific_qs.select_related(*_get_select_related_lookups(select_related))
+
+    field_names, defer = qs.query.deferred_loading
+    if field_names:
+        if defer:
+            specific_qs = specific_qs.defer(*field_names)
+        else:
+            specific_qs = specific_qs.only(*field_names)
+
+    return {specific_page.pk: specific_page for specific_page in specific_qs}
+
+
+def _get_deferred_specific_pages(qs, model, pages):
+    """
+    Return a dict of the specific instances of the given pages, which all have the
+    content type of ``model``, keyed by pk. Only the fields that ``model`` does not
+    inherit from ``qs.model`` are fetched; all others are taken from ``pages``.
+    """
+    base_attnames = {field.attname for field in qs.model._meta.concrete_fields}
+    attnames = [field.attname for field in model._meta.concrete_fields]
+    specific_attnames = [attname for attname in attnames if attname not in base_attnames]
+
+    if specific_attnames:
+        specific_values = {
+            values[0]: values[1:]
+            for values in model.objects.filter(
+                pk__in=[page.pk for page in pages]
+            ).values_list('pk', *specific_attnames)
+        }
+    else:
+        # model adds no fields of its own (e.g. it is a proxy model)
+        specific_values = {page.pk: () for page in pages}
+
+    specific_pages = {}
+    for page in pages:
+        try:
+            values = dict(zip(specific_attnames, specific_values[page.pk]))
+        except KeyError:
+            continue
+
+        specific_page = model.from_db(qs.db, attnames, [
+            values[attname] if attname in values else page.__dict__.get(attname, DEFERRED)
+            for attname in attnames
+        ])
+
+        # Carry over everything else fetched with the page, such as annotations
+        _copy_state_to_specific_page(page, specific_page, [
+            attname for attname in page.__dict__ if attname != '_state'
+        ])
+
+        specific_pages[page.pk] = specific_page
+
+    return specific_pages
+
+
+def specific_iterator(qs, defer=False):
     """
     This efficiently iterates all the specific pages in a queryset, using
     the minimum number of queries.
 
     This should be called from ``PageQuerySet.specific``
     """
-    pks_and_types = qs.values_list('pk', 'content_type')
-    pks_by_type = defaultdict(list)
-    for pk, content_type in pks_and_types:
-        pks_by_type[content_type].append(pk)
+    # Fetch the pages themselves first; the content type of each page is read from
+    # these rows, and they carry the annotations and related objects to pass on
+    qs = _with_content_type_loaded(qs)
+    pages = list(ModelIterable(qs))
 
-    # Content types are cached by ID, so this will not run any queries.
-    content_types = {pk: ContentType.objects.get_for_id(pk)
-                     for _, pk in pks_and_types}
+    pages_by_type = defaultdict(list)
+    for page in pages:
+        pages_by_type[page.content_type_id].append(page)
+
+    annotation_names = list(qs.query.extra_select) + list(qs.query.annotation_select)
 
     # Get the specific instances of all pages, one model class at a time.
-    pages_by_type = {}
-    for content_type, pks in pks_by_type.items():
+    specific_pages_by_type = {}
+    for content_type_id, pages_of_type in pages_by_type.items():
         # look up model class for this content type, falling back on the original
-        # model (i.e. Page) if the more specific one is missing
-        model = content_types[content_type].model_class() or qs.model
-        pages = model.objects.filter(pk__in=pks)
-        pages_by_type[content_type] = {page.pk: page for page in pages}
+        # model (i.e. Page) if the more specific one is missing. Content types are
+        # cached by ID, so this will not run any queries.
+        model = ContentType.objects.get_for_id(content_type_id).model_class() or qs.model
+
+        if model is qs.model:
+            # These pages are already in their most specific form
+            continue
+
+        if defer:
+            specific_pages = _get_deferred_specific_pages(qs, model, pages_of_type)
+        else:
+            specific_pages = _get_specific_pages(qs, model, pages_of_type)
+
+            if annotation_names:
+                for page in pages_of_type:
+                    if page.pk in specific_pages:
+                        _copy_state_to_specific_page(page, specific_pages[page.pk], annotation_names)
+
+        specific_pages_by_type[content_type_id] = specific_pages
 
     # Yield all of the pages, in the order they occurred in the original query.
-    for pk, content_type in pks_and_types:
-        yield pages_by_type[content_type][pk]
+    # Pages whose model is missing are yielded as they are; a page whose specific
+    # row is missing raises KeyError, as it always has
+    for page in pages:
+        if page.content_type_id in specific_pages_by_type:
+            yield specific_pages_by_type[page.content_type_id][page.pk]
+        else:
+            yield page
+
+
+# Orderings that are unique across all pages, so the queryset can be walked in
+# chunks by filtering on the last value seen
+KEYSET_ORDERINGS = ['path', '-path', 'pk', '-pk', 'id', '-id']
+
+
+def _get_ordering(qs):
+    if qs.query.order_by:
+        return list(qs.query.order_by)
+    elif qs.query.default_ordering:
+        return list(qs.model._meta.ordering)
+    else:
+        return []
+
+
+def specific_chunked_iterator(qs, chunk_size, defer=False):
+    """
+    Equivalent to ``specific_iterator``, but fetches the pages ``chunk_size`` at a time.
+
+    Querysets that are unordered or ordered by ``path`` or ``pk`` are walked by keyset
+    pagination; any other queryset has its page IDs fetched up front, and the pages
+    are then fetched in chunks of those IDs.
+
+    This should be called from ``PageQuerySet.iterator``
+    """
+    ordering = _get_ordering(qs)
+    is_sliced = qs.query.low_mark != 0 or qs.query.high_mark is not None
+
+    if len(ordering) <= 1 and set(ordering) <= set(KEYSET_ORDERINGS) and not is_sliced:
+        chunks = _get_keyset_chunks(qs, ordering[0] if ordering else 'pk', chunk_size, defer)
+    else:
+        chunks = _get_pk_chunks(qs, chunk_size, defer)
+
+    for pages in chunks:
+        # prefetch_related is normally applied by QuerySet._fetch_all, which is
+        # bypassed here; apply it to each chunk instead
+        if qs._prefetch_related_lookups:
+            prefetch_related_objects(pages, *qs._prefetch_related_lookups)
+        if qs._prefetch_stream_blocks_fields:
+            prefetch_stream_blocks(pages, *qs._prefetch_stream_blocks_fields)
+
+        yield from pages
+
+
+def _get_keyset_chunks(qs, ordering, chunk_size, defer):
+    field_name = ordering.lstrip('-')
+    if ordering.startswith('-'):
+        lookup = field_name + '__lt'
+    else:
+        lookup = field_name + '__gt'
+
+    qs = qs.order_by(ordering)
+    last_value = None
+    while True:
+        chunk_qs = qs if last_value is None else qs.filter(**{lookup: last_value})
+        pages = list(specific_iterator(chunk_qs[:chunk_size], defer=defer))
+        if pages:
+            yield pages
+
+        if len(pages) < chunk_size:
+            break
+
+        last_value = getattr(pages[-1], field_name)
+
+
+def _get_pk_chunks(qs, chunk_size, defer):
+    pks = list(qs.values_list('pk', flat=True))
+
+    unordered_qs = qs._clone()
+    unordered_qs.query.clear_limits()
+    unordered_qs.query.clear_ordering(force_empty=True)
+
+    for start in range(0, len(pks), chunk_size):
+        chunk_pks = pks[start:start + chunk_size]
+        pages_by_pk = {
+            page.pk: page
+            for page in specific_iterator(unordered_qs.filter(pk__in=chunk_pks), defer=defer)
+        }
+        yield [pages_by_pk[pk] for pk in chunk_pks if pk in pages_by_pk]
 
 
 class SpecificIterable(BaseIterable):
     def __iter__(self):
         return specific_iterator(self.queryset)
+
+
+class DeferredSpecificIterable(BaseIterable):
+    def __iter__(self):
+        return specific_iterator(self.queryset, defer=True)
@@ -1,6 +1,7 @@
 from django.utils.safestring import mark_safe
 
 from wagtail.core.rich_text.feature_registry import FeatureRegistry
+from wagtail.core.rich_text.render_cache import get_cache_key, get_render_cache
 from wagtail.core.rich_text.rewriters import EmbedRewriter, LinkRewriter, MultiRuleRewriter
 
 
@@ -16,7 +17,8 @@ FRONTEND_REWRITER = None
 
 def expand_db_html(html):
     """
-    Expand database-representation HTML into proper HTML usable on front-end templates
+    Expand database-representation HTML into proper HTML usable on front-end templates,
+    from the render cache if one is configured (see wagtail.core.rich_text.render_cache)
     """
     global FRONTEND_REWRITER
 
@@ -24,10 +26,23 @@ def expand_db_html(html):
         embed_rules = features.get_embed_types()
         link_rules = features.get_link_types()
         FRONTEND_REWRITER = MultiRuleRewriter([
-            LinkRewriter(link_rules), EmbedRewriter(embed_rules)
+            LinkRewriter(link_rules, features.get_bulk_link_types()),
+            EmbedRewriter(embed_rules, features.get_bulk_embed_types())
         ])
 
-    return FRONTEND_REWRITER(html)
+    render_cache = get_render_cache()
+    cache_key = get_cache_key(render_cache, html) if render_cache is not None else None
+    if cache_key is not None:
+        result = render_cache.get(cache_key)
+        if result is not None:
+            return result
+
+    result = FRONTEND_REWRITER(html)
+
+    if cache_key is not None:
+        render_cache.set(cache_key, result)
+
+    return result
 
 
 class RichText:
@@ -37,6 +37,13 @@ class FeatureRegistry:
         # HTML fragment to replace it with
         self.embed_types = {}
 
+        # mappings of linktype / embedtype names to optional bulk rewriter functions, which take
+        # a list of dicts of attributes of elements of that type, and return a list of the
+        # rewritten HTML for each of them; these allow all elements of the type to be rewritten
+        # at once, fetching the objects they refer to in bulk
+        self.bulk_link_types = {}
+        self.bulk_embed_types = {}
+
         # a dict of dicts, one for each converter backend (editorhtml, contentstate etc);
         # each dict is a mapping of feature names to 'rule' objects that define how to convert
         # that feature's elements between editor representation and database representation
@@ -68,22 +75,44 @@ class FeatureRegistry:
         except KeyError:
             return None
 
-    def register_link_type(self, link_type, handler):
+    def register_link_type(self, link_type, handler, bulk_handler=None):
         self.link_types[link_type] = handler
 
+        # A bulk handler registered along with a handler that has since been replaced must
+        # not be used
+        if bulk_handler is None:
+            self.bulk_link_types.pop(link_type, None)
+        else:
+            self.bulk_link_types[link_type] = bulk_handler
+
     def get_link_types(self):
         if not self.has_scanned_for_features:
             self._scan_for_features()
         return self.link_types
 
-    def register_embed_type(self, embed_type, handler):
+    def get_bulk_link_types(self):
+        if not self.has_scanned_for_features:
+            self._scan_for_features()
+        return self.bulk_link_types
+
+    def register_embed_type(self, embed_type, handler, bulk_handler=None):
         self.embed_types[embed_type] = handler
 
+        if bulk_handler is None:
+            self.bulk_embed_types.pop(embed_type, None)
+        else:
+            self.bulk_embed_types[embed_type] = bulk_handler
+
     def get_embed_types(self):
         if not self.has_scanned_for_features:
             self._scan_for_features()
         return self.embed_types
 
+    def get_bulk_embed_types(self):
+        if not self.has_scanned_for_features:
+            self._scan_for_features()
+        return self.bulk_embed_types
+
     def register_converter_rule(self, converter_name, feature_name, rule):
         rules = self.converter_rules_by_converter.setdefault(converter_name, {})
         rules[feature_name] = rule
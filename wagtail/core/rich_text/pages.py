@@ -1,6 +1,6 @@
 from django.utils.html import escape
 
-from wagtail.core.models import Page
+from wagtail.core.models import Page, get_urls_bulk
 
 
 class PageLinkHandler:
@@ -40,3 +40,20 @@ def page_linktype_handler(attrs):
         return '<a href="%s">' % escape(page.specific.url)
     except Page.DoesNotExist:
         return "<a>"
+
+
+def bulk_page_linktype_handler(attrs_list):
+    """
+    Rewrite a list of page links at once, fetching the pages with one query per page type
+    and looking up the site root paths once for all of them
+    """
+    ids = [str(attrs.get('id')) for attrs in attrs_list if str(attrs.get('id')).isdigit()]
+    pages = list(Page.objects.filter(id__in=ids).specific())
+    urls = {str(page.id): url for page, url in zip(pages, get_urls_bulk(pages))}
+
+    html = []
+    for attrs in attrs_list:
+        page_id = str(attrs.get('id'))
+        html.append('<a href="%s">' % escape(urls[page_id]) if page_id in urls else "<a>")
+
+    return html
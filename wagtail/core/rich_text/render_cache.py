@@ -0,0 +1,143 @@
+"""
+A cache of rendered rich text, held in front of the link and embed rewriters.
+
+When the ``WAGTAIL_RICH_TEXT_CACHE`` setting names one of the caches defined in ``CACHES``,
+``expand_db_html`` (and so ``RichText`` values and the ``|richtext`` filter) looks for the
+front-end HTML of the rich text in that cache before rewriting its links and embeds, so
+that rendering a page again doesn't cost a lookup of every page, document and image it
+refers to. For example::
+
+    CACHES = {
+        'default': {...},
+        'richtext': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': '127.0.0.1:11211',
+        },
+    }
+
+    WAGTAIL_RICH_TEXT_CACHE = 'richtext'
+
+Cache keys are made from a hash of the rich text source, of the active language, script
+prefix and URLconf (which the URLs of pages depend on), and of a marker for each object it
+links to or embeds (such as ``<a linktype="page" id="3">``) - a token held in the same
+cache, which is replaced whenever that object changes, along with a marker shared by all
+rich text for changes that may affect any link (such as moving a page, which changes the
+URLs of its descendants). The signal handlers of ``wagtail.core``, ``wagtail.documents``
+and ``wagtail.images`` replace the markers of pages, documents and images when they are
+saved, published, moved or deleted; objects of other link and embed types are cached until
+the cache's default timeout. Rich text without any such links or embeds isn't cached, as
+it can be rendered without database queries.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.urls import get_script_prefix, get_urlconf
+from django.utils.translation import get_language
+
+from wagtail.core.rich_text.rewriters import FIND_A_TAG, FIND_EMBED_TAG, extract_attrs
+
+GLOBAL_MARKER_KEY = 'wagtail-rich-text-marker'
+
+
+def get_render_cache():
+    """
+    Return the cache named by the ``WAGTAIL_RICH_TEXT_CACHE`` setting, or None if rendered
+    rich text should not be cached
+    """
+    alias = getattr(settings, 'WAGTAIL_RICH_TEXT_CACHE', None)
+    if not alias:
+        return None
+
+    return caches[alias]
+
+
+def get_marker_key(object_type, object_id):
+    # Ids come from the rich text source, so hash them to get a valid key for any backend
+    object_hash = hashlib.md5(('%s-%s' % (object_type, object_id)).encode('utf-8')).hexdigest()
+    return '%s-%s' % (GLOBAL_MARKER_KEY, object_hash)
+
+
+def get_references(html):
+    """
+    Return a set of (type, id) tuples for the objects that the links and embeds in html
+    refer to
+    """
+    references = set()
+    for regex, type_attribute in ((FIND_A_TAG, 'linktype'), (FIND_EMBED_TAG, 'embedtype')):
+        for match in regex.finditer(html):
+            attrs = extract_attrs(match.group(1))
+            if type_attribute in attrs and 'id' in attrs:
+                references.add((attrs[type_attribute], attrs['id']))
+
+    return references
+
+
+def get_markers(cache, marker_keys):
+    markers = cache.get_many(marker_keys)
+
+    missing_keys = [key for key in marker_keys if key not in markers]
+    if missing_keys:
+        # Another process may add the same marker in the meantime, so read them back
+        for key in missing_keys:
+            cache.add(key, uuid.uuid4().hex, None)
+        markers.update(cache.get_many(missing_keys))
+
+    return markers
+
+
+def get_cache_key(cache, html):
+    """
+    Return the key that the front-end HTML of html is cached under, or None if it should
+    not be cached
+    """
+    references = get_references(html)
+    if not references:
+        return None
+
+    marker_keys = [GLOBAL_MARKER_KEY] + [
+        get_marker_key(object_type, object_id) for object_type, object_id in sorted(references)
+    ]
+    markers = get_markers(cache, marker_keys)
+
+    key = hashlib.md5(html.encode('utf-8'))
+
+    # Page URLs depend on the active language (with i18n_patterns), script prefix and URLconf
+    key.update(('\n%s\n%s\n%s' % (get_language(), get_script_prefix(), get_urlconf())).encode('utf-8'))
+
+    for marker_key in marker_keys:
+        key.update(('\n%s' % markers.get(marker_key)).encode('utf-8'))
+
+    return 'wagtail-rich-text-%s' % key.hexdigest()
+
+
+def invalidate_markers(marker_keys):
+    # Again once the current transaction commits, so that a process rendering rich text
+    # in the meantime can't cache stale links under the new markers
+    cache = get_render_cache()
+    if cache is None:
+        return
+
+    def delete_markers():
+        cache.delete_many(marker_keys)
+
+    delete_markers()
+    transaction.on_commit(delete_markers)
+
+
+def invalidate_object(object_type, object_id):
+    """
+    Stop cached rich text that links to or embeds the given object from being used
+    """
+    if object_id is not None:
+        invalidate_markers([get_marker_key(object_type, object_id)])
+
+
+def invalidate_all():
+    """
+    Stop all cached rich text from being used
+    """
+    invalidate_markers([GLOBAL_MARKER_KEY])
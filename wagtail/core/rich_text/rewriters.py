@@ -20,13 +20,77 @@ def extract_attrs(attr_string):
     return attributes
 
 
-class EmbedRewriter:
+class BulkTagRewriter:
+    """
+    Base class for rewriters that replace tags whose type is given by one of their attributes.
+
+    Tags of a type with a bulk rule are rewritten in two passes: the first finds all of them,
+    and the second replaces them with the HTML fragments returned by a single call to the bulk
+    rule for each type, which takes a list of dicts of attributes and returns a list of HTML
+    fragments in the same order. This allows the objects that the tags refer to (such as
+    pages or images) to be fetched with one query for each type, rather than one per tag.
+    Other tags are rewritten one at a time by replace_tag.
+    """
+    tag_regex = None
+    type_attribute = None
+
+    def __init__(self, bulk_rules=None):
+        self.bulk_rules = bulk_rules or {}
+
+    def replace_tag(self, match):
+        raise NotImplementedError
+
+    def __call__(self, html):
+        if not self.bulk_rules:
+            return self.tag_regex.sub(self.replace_tag, html)
+
+        # First pass: find the tags of each type that has a bulk rule
+        matches = []
+        attrs_by_type = {}
+        for match in self.tag_regex.finditer(html):
+            attrs = extract_attrs(match.group(1))
+            tag_type = attrs.get(self.type_attribute)
+            if tag_type not in self.bulk_rules:
+                tag_type = None
+            else:
+                attrs_by_type.setdefault(tag_type, []).append(attrs)
+
+            matches.append((match, tag_type))
+
+        if not attrs_by_type:
+            return self.tag_regex.sub(self.replace_tag, html)
+
+        replacements_by_type = {
+            tag_type: iter(self.bulk_rules[tag_type](attrs_list))
+            for tag_type, attrs_list in attrs_by_type.items()
+        }
+
+        # Second pass: replace the tags
+        parts = []
+        position = 0
+        for match, tag_type in matches:
+            parts.append(html[position:match.start()])
+            if tag_type is None:
+                parts.append(self.replace_tag(match))
+            else:
+                parts.append(next(replacements_by_type[tag_type]))
+            position = match.end()
+
+        parts.append(html[position:])
+        return ''.join(parts)
+
+
+class EmbedRewriter(BulkTagRewriter):
     """
     Rewrites <embed embedtype="foo" /> tags within rich text into the HTML fragment given by the
     embed rule for 'foo'. Each embed rule is a function that takes a dict of attributes and
-    returns the HTML fragment.
+    returns the HTML fragment. Embed types may also have a bulk rule (see BulkTagRewriter).
     """
-    def __init__(self, embed_rules):
+    tag_regex = FIND_EMBED_TAG
+    type_attribute = 'embedtype'
+
+    def __init__(self, embed_rules, bulk_embed_rules=None):
+        super().__init__(bulk_embed_rules)
         self.embed_rules = embed_rules
 
     def replace_tag(self, match):
@@ -38,17 +102,19 @@ class EmbedRewriter:
             return ''
         return rule(attrs)
 
-    def __call__(self, html):
-        return FIND_EMBED_TAG.sub(self.replace_tag, html)
-
 
-class LinkRewriter:
+class LinkRewriter(BulkTagRewriter):
     """
     Rewrites <a linktype="foo"> tags within rich text into the HTML fragment given by the
     rule for 'foo'. Each link rule is a function that takes a dict of attributes and
-    returns the HTML fragment for the opening tag (only).
+    returns the HTML fragment for the opening tag (only). Link types may also have a bulk
+    rule (see BulkTagRewriter).
     """
-    def __init__(self, link_rules):
+    tag_regex = FIND_A_TAG
+    type_attribute = 'linktype'
+
+    def __init__(self, link_rules, bulk_link_rules=None):
+        super().__init__(bulk_link_rules)
         self.link_rules = link_rules
 
     def replace_tag(self, match):
@@ -67,9 +133,6 @@ class LinkRewriter:
 
         return rule(attrs)
 
-    def __call__(self, html):
-        return FIND_A_TAG.sub(self.replace_tag, html)
-
 
 class MultiRuleRewriter:
     """Rewrites HTML by applying a sequence of rewriter functions"""
@@ -0,0 +1,152 @@
+"""
+An optional, process-local index of the page tree used to resolve request paths
+without walking the tree one ``get_children().get(slug=...)`` query at a time.
+
+The index is a trie keyed on the segments of ``Page.url_path``, where each node
+records the page id, content type and live flag of the page at that path. It is
+enabled with the ``WAGTAIL_ROUTING_INDEX`` setting, and is rebuilt lazily whenever
+the version token held in the Django cache changes - this token is replaced by the
+signal handlers in ``wagtail.core.signal_handlers`` whenever a page is published,
+unpublished, moved, renamed or deleted, so all worker processes pick up the change.
+"""
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.http import Http404
+
+from wagtail.core.url_routing import RouteResult
+from wagtail.core.utils import get_cache_version, replace_cache_version
+
+VERSION_CACHE_KEY = 'wagtail_routing_index_version'
+
+
+def routing_index_enabled():
+    return getattr(settings, 'WAGTAIL_ROUTING_INDEX', False)
+
+
+class RoutingIndexNode:
+    __slots__ = ('children', 'page_id', 'content_type_id', 'live')
+
+    def __init__(self):
+        self.children = {}
+        self.page_id = None
+        self.content_type_id = None
+        self.live = False
+
+
+class RoutingIndex:
+    def __init__(self):
+        self.root = None
+        self.version = None
+
+    @staticmethod
+    def get_path_components(url_path):
+        return [component for component in url_path.split('/') if component]
+
+    def build(self):
+        """
+        Build a new trie from the url_path, id, content type and live flag of every page
+        in the tree. This is a single query, regardless of the depth of the tree.
+        """
+        from wagtail.core.models import Page
+
+        root = RoutingIndexNode()
+        for url_path, page_id, content_type_id, live in Page.objects.values_list(
+            'url_path', 'id', 'content_type_id', 'live'
+        ):
+            node = root
+            for component in self.get_path_components(url_path):
+                child = node.children.get(component)
+                if child is None:
+                    child = node.children[component] = RoutingIndexNode()
+                node = child
+
+            node.page_id = page_id
+            node.content_type_id = content_type_id
+            node.live = live
+
+        return root
+
+    def get_root(self):
+        version = get_cache_version(VERSION_CACHE_KEY)
+        if self.root is None or version is None or version != self.version:
+            self.root = self.build()
+            self.version = version
+
+        return self.root
+
+    def clear(self):
+        self.root = None
+        self.version = None
+
+    def invalidate(self):
+        """
+        Discard the index in this process, and replace the version token so that other
+        processes rebuild theirs
+        """
+        self.clear()
+        replace_cache_version(VERSION_CACHE_KEY)
+
+    def find_node(self, url_path):
+        node = self.get_root()
+        for component in self.get_path_components(url_path):
+            node = node.children.get(component)
+            if node is None:
+                return None
+
+        return node
+
+    def get_page(self, node, model_class):
+        from wagtail.core.models import Page
+
+        if model_class is None:
+            # The model for this content type is not available (see Page.specific); treat
+            # it as a plain Page
+            model_class = Page
+
+        return model_class.objects.get(id=node.page_id)
+
+    def route(self, request, site, path_components):
+        """
+        Equivalent to ``site.root_page.specific.route(request, path_components)``.
+
+        The index is followed for as long as the pages along the path use the standard
+        ``Page.route`` implementation; when a page that overrides ``route`` (such as a
+        ``RoutablePageMixin`` page) is reached, it is fetched and handed the remaining
+        path components, so custom routing continues to work as before.
+        """
+        from wagtail.core.models import Page
+
+        node = self.find_node(site.root_page.url_path)
+        if node is None or node.page_id is None:
+            return site.root_page.specific.route(request, path_components)
+
+        remaining_components = list(path_components)
+        while True:
+            model_class = ContentType.objects.get_for_id(node.content_type_id).model_class()
+            has_custom_route = model_class is None or model_class.route is not Page.route
+
+            if has_custom_route or not remaining_components:
+                if not has_custom_route and not node.live:
+                    raise Http404
+
+                try:
+                    page = self.get_page(node, model_class)
+                except Page.DoesNotExist:
+                    # The index is out of date; discard it and route through the tree instead
+                    self.invalidate()
+                    return site.root_page.specific.route(request, path_components)
+
+                if has_custom_route:
+                    return page.route(request, remaining_components)
+                else:
+                    return RouteResult(page)
+
+            node = node.children.get(remaining_components[0])
+            if node is None or node.page_id is None:
+                raise Http404
+
+            remaining_components = remaining_components[1:]
+
+
+routing_index = RoutingIndex()
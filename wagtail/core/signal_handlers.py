@@ -3,7 +3,11 @@ import logging
 from django.core.cache import cache
 from django.db.models.signals import post_delete, post_save, pre_delete
 
-from wagtail.core.models import Page, Site
+from wagtail.core.models import Page, Site, get_page_models
+from wagtail.core.rich_text import render_cache
+from wagtail.core.routing_index import routing_index, routing_index_enabled
+from wagtail.core.signals import page_published, page_unpublished
+from wagtail.core.sites import site_cache, site_cache_enabled
 
 logger = logging.getLogger('wagtail.core')
 
@@ -11,10 +15,16 @@ logger = logging.getLogger('wagtail.core')
 # Clear the wagtail_site_root_paths from the cache whenever Site records are updated.
 def post_save_site_signal_handler(instance, update_fields=None, **kwargs):
     cache.delete('wagtail_site_root_paths')
+    if site_cache_enabled():
+        site_cache.invalidate()
+    render_cache.invalidate_all()
 
 
 def post_delete_site_signal_handler(instance, **kwargs):
     cache.delete('wagtail_site_root_paths')
+    if site_cache_enabled():
+        site_cache.invalidate()
+    render_cache.invalidate_all()
 
 
 def pre_delete_page_unpublish(sender, instance, **kwargs):
@@ -28,9 +38,62 @@ def post_delete_page_log_deletion(sender, instance, **kwargs):
     logger.info("Page deleted: \"%s\" id=%d", instance.title, instance.id)
 
 
+# Fields which, when saved, may change the result of routing a request through the page tree
+ROUTING_FIELDS = {'slug', 'url_path', 'path', 'depth', 'live', 'content_type'}
+
+
+def post_save_page_invalidate_routing_index(instance, update_fields=None, **kwargs):
+    if not routing_index_enabled():
+        return
+
+    if update_fields is not None and not ROUTING_FIELDS.intersection(update_fields):
+        return
+
+    routing_index.invalidate()
+
+
+def post_delete_page_invalidate_routing_index(instance, **kwargs):
+    if routing_index_enabled():
+        routing_index.invalidate()
+
+
+def page_live_status_invalidate_routing_index(instance, **kwargs):
+    if routing_index_enabled():
+        routing_index.invalidate()
+
+
+# Fields which, when saved, may change the URL that rich text links to a page are rewritten to
+# (draft revisions are saved with update_fields that don't include any of these)
+RICH_TEXT_LINK_FIELDS = {'slug', 'url_path', 'live'}
+
+
+def post_save_page_invalidate_rich_text(instance, update_fields=None, **kwargs):
+    if update_fields is not None and not RICH_TEXT_LINK_FIELDS.intersection(update_fields):
+        return
+
+    render_cache.invalidate_object('page', instance.pk)
+
+
+def post_delete_page_invalidate_rich_text(instance, **kwargs):
+    render_cache.invalidate_object('page', instance.pk)
+
+
 def register_signal_handlers():
     post_save.connect(post_save_site_signal_handler, sender=Site)
     post_delete.connect(post_delete_site_signal_handler, sender=Site)
 
     pre_delete.connect(pre_delete_page_unpublish, sender=Page)
     post_delete.connect(post_delete_page_log_deletion, sender=Page)
+
+    # Keep the routing index in step with the page tree. Moves and renames are picked up
+    # through post_save, as Page.move and Page.save both save the moved / renamed page
+    for model in get_page_models():
+        post_save.connect(post_save_page_invalidate_routing_index, sender=model)
+        post_delete.connect(post_delete_page_invalidate_routing_index, sender=model)
+    page_published.connect(page_live_status_invalidate_routing_index)
+    page_unpublished.connect(page_live_status_invalidate_routing_index)
+
+    # Replace the rich text render cache markers of pages that are published, moved or deleted
+    for model in get_page_models():
+        post_save.connect(post_save_page_invalidate_rich_text, sender=model)
+        post_delete.connect(post_delete_page_invalidate_rich_text, sender=model)
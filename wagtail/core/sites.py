@@ -1,14 +1,26 @@
 from django.apps import apps
+from django.conf import settings
 from django.db.models import Case, IntegerField, Q, When
 
+from wagtail.core.utils import get_cache_version, replace_cache_version
+
 MATCH_HOSTNAME_PORT = 0
 MATCH_HOSTNAME_DEFAULT = 1
 MATCH_DEFAULT = 2
 MATCH_HOSTNAME = 3
 
+SITE_CACHE_VERSION_KEY = 'wagtail_site_cache_version'
+
+
+def site_cache_enabled():
+    return getattr(settings, 'WAGTAIL_SITE_CACHE', False)
+
 
 def get_site_for_hostname(hostname, port):
     """Return the wagtailcore.Site object for the given hostname and port."""
+    if site_cache_enabled():
+        return site_cache.get_site_for_hostname(hostname, port)
+
     Site = apps.get_model('wagtailcore.Site')
 
     sites = list(Site.objects.annotate(match=Case(
@@ -35,6 +47,14 @@ def get_site_for_hostname(hostname, port):
         'root_page'
     ))
 
+    return _select_site(Site, sites)
+
+
+def _select_site(Site, sites):
+    """
+    Pick the site to use from a list of candidate sites, annotated with ``match``
+    and sorted by it
+    """
     if sites:
         # if theres a unique match or hostname (with port or default) match
         if len(sites) == 1 or sites[0].match in (MATCH_HOSTNAME_PORT, MATCH_HOSTNAME_DEFAULT):
@@ -47,3 +67,142 @@ def get_site_for_hostname(hostname, port):
             return sites[len(sites) == 2]
 
     raise Site.DoesNotExist()
+
+
+class SiteRootPathIndex:
+    """
+    Wraps the list of ``(site_id, root_path, root_url)`` tuples returned by
+    ``Site.get_site_root_paths()`` to find the site that a url_path belongs to
+    by longest-prefix lookup, rather than scanning the whole list.
+    """
+    def __init__(self, site_root_paths):
+        self.site_root_paths = site_root_paths
+
+        # site_root_paths is ordered most specific path first, so where several sites
+        # share a root path, keep the first one, as a scan of the list would find
+        self.sites_by_root_path = {}
+        for site_root_path in site_root_paths:
+            self.sites_by_root_path.setdefault(site_root_path[1], site_root_path)
+
+    def __len__(self):
+        return len(self.site_root_paths)
+
+    def find(self, url_path):
+        """
+        Return the ``(site_id, root_path, root_url)`` tuple of the site with the
+        longest root path that url_path starts with, or None
+        """
+        # Root paths are url_paths, which always end in a slash; so test each
+        # slash-terminated prefix of url_path, longest first
+        end = len(url_path)
+        while end > 0:
+            site_root_path = self.sites_by_root_path.get(url_path[:end])
+            if site_root_path is not None:
+                return site_root_path
+
+            end = url_path.rfind('/', 0, end - 1) + 1
+
+        return None
+
+
+class SiteCache:
+    """
+    A process-local copy of the Site table (including each site's root page), used
+    by get_site_for_hostname in place of a database query when the ``WAGTAIL_SITE_CACHE``
+    setting is enabled.
+
+    The copy is reloaded whenever the version token held in the Django cache changes;
+    this token is replaced whenever a site is saved or deleted, or a site root page is
+    saved, so that all worker processes pick up the change.
+    """
+    def __init__(self):
+        self.sites = None
+        self.version = None
+        self.site_field_names = None
+        self.page_field_names = None
+
+    def load(self):
+        Site = apps.get_model('wagtailcore.Site')
+        Page = apps.get_model('wagtailcore.Page')
+
+        self.site_field_names = [field.attname for field in Site._meta.concrete_fields]
+        self.page_field_names = [field.attname for field in Page._meta.concrete_fields]
+
+        # Keep raw field values rather than model instances, so that every request gets
+        # its own Site and root Page objects to modify or attach cached data to
+        return [
+            (
+                site.hostname,
+                site.port,
+                site.is_default_site,
+                site._state.db,
+                [getattr(site, name) for name in self.site_field_names],
+                [getattr(site.root_page, name) for name in self.page_field_names],
+            )
+            for site in Site.objects.select_related('root_page')
+        ]
+
+    def get_sites(self):
+        version = get_cache_version(SITE_CACHE_VERSION_KEY)
+        if self.sites is None or version is None or version != self.version:
+            self.sites = self.load()
+            self.version = version
+
+        return self.sites
+
+    def clear(self):
+        self.sites = None
+        self.version = None
+
+    def invalidate(self):
+        """
+        Discard the copy held by this process, and replace the version token so that
+        other processes reload theirs
+        """
+        self.clear()
+        replace_cache_version(SITE_CACHE_VERSION_KEY)
+
+    def get_site_for_hostname(self, hostname, port):
+        """
+        Equivalent to get_site_for_hostname, using the same MATCH_* precedence rules
+        against the cached copy of the Site table
+        """
+        Site = apps.get_model('wagtailcore.Site')
+        Page = apps.get_model('wagtailcore.Page')
+
+        sites = self.get_sites()
+
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            port = None
+
+        candidates = []
+        for site_hostname, site_port, is_default_site, db, site_values, page_values in sites:
+            if site_hostname == hostname:
+                if site_port == port:
+                    match = MATCH_HOSTNAME_PORT
+                elif is_default_site:
+                    match = MATCH_HOSTNAME_DEFAULT
+                else:
+                    match = MATCH_HOSTNAME
+            elif is_default_site:
+                match = MATCH_DEFAULT
+            else:
+                continue
+
+            candidates.append((match, db, site_values, page_values))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        matched_sites = []
+        for match, db, site_values, page_values in candidates:
+            site = Site.from_db(db, self.site_field_names, site_values)
+            site.root_page = Page.from_db(db, self.page_field_names, page_values)
+            site.match = match
+            matched_sites.append(site)
+
+        return _select_site(Site, matched_sites)
+
+
+site_cache = SiteCache()
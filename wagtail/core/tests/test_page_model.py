@@ -10,9 +10,10 @@ from django.http import Http404, HttpRequest
 from django.test import Client, TestCase
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
+from django.urls import reverse
 from freezegun import freeze_time
 
-from wagtail.core.models import Page, PageManager, Site, get_page_models
+from wagtail.core.models import Page, PageManager, Site, get_page_models, get_urls_bulk
 from wagtail.tests.testapp.models import (
     AbstractPage, Advert, AlwaysShowInMenusPage, BlogCategory, BlogCategoryBlogPage, BusinessChild,
     BusinessIndex, BusinessNowherePage, BusinessSubIndex, CustomManager, CustomManagerPage,
@@ -354,6 +355,53 @@ class TestRouting(TestCase):
         with self.assertRaises(Http404):
             homepage.route(request, ['events', 'tentative-unpublished-event'])
 
+    def test_urls_match_reverse(self):
+        homepage = Page.objects.get(url_path='/home/')
+        unicode_page = homepage.add_child(instance=SimplePage(title="Café", slug="café", content="hello"))
+        default_site = Site.objects.get(is_default_site=True)
+
+        self.assertEqual(
+            unicode_page.get_url_parts(),
+            (default_site.id, 'http://localhost', reverse('wagtail_serve', args=('café/', )))
+        )
+        self.assertEqual(unicode_page.url, '/caf%C3%A9/')
+
+    @override_settings(ROOT_URLCONF='wagtail.tests.non_root_urls')
+    def test_urls_match_reverse_with_non_root_urlconf(self):
+        homepage = Page.objects.get(url_path='/home/')
+        unicode_page = homepage.add_child(instance=SimplePage(title="Café", slug="café", content="hello"))
+
+        self.assertEqual(unicode_page.url, reverse('wagtail_serve', args=('café/', )))
+        self.assertEqual(unicode_page.url, '/site/caf%C3%A9/')
+
+    def test_urls_with_nested_sites(self):
+        events_page = Page.objects.get(url_path='/home/events/')
+        events_site = Site.objects.create(hostname='events.example.com', root_page=events_page)
+        default_site = Site.objects.get(is_default_site=True)
+        christmas_page = Page.objects.get(url_path='/home/events/christmas/')
+        about_us_page = Page.objects.get(url_path='/home/about-us/')
+        root = Page.objects.get(url_path='/')
+
+        # The most specific site root containing the page is used
+        self.assertEqual(christmas_page.get_url_parts()[0], events_site.id)
+        self.assertEqual(events_page.get_url_parts()[0], events_site.id)
+        self.assertEqual(about_us_page.get_url_parts()[0], default_site.id)
+        self.assertIsNone(root.get_url_parts())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_get_urls_bulk(self):
+        pages = list(Page.objects.all())
+
+        # the site root paths are only looked up once
+        with self.assertNumQueries(1):
+            urls = get_urls_bulk(pages)
+
+        self.assertEqual(urls, [Page.objects.get(id=page.id).url for page in pages])
+        self.assertEqual(
+            get_urls_bulk(pages, full_url=True),
+            [Page.objects.get(id=page.id).full_url for page in pages]
+        )
+
     # Override CACHES so we don't generate any cache-related SQL queries (tests use DatabaseCache
     # otherwise) and so cache.get will always return None.
     @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
@@ -1,10 +1,17 @@
+import json
+
+import mock
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.db.models import Count
+from django.http import HttpRequest
+from django.test import TestCase, override_settings
 
 from wagtail.core.models import Page, PageViewRestriction, Site
 from wagtail.core.signals import page_unpublished
+from wagtail.images.models import Image
+from wagtail.images.tests.utils import get_test_image_file
 from wagtail.search.query import MATCH_ALL
-from wagtail.tests.testapp.models import EventPage, SimplePage, SingleEventPage
+from wagtail.tests.testapp.models import EventPage, SimplePage, SingleEventPage, StreamPage
 
 
 class TestPageQuerySet(TestCase):
@@ -431,6 +438,92 @@ class TestPageQueryInSite(TestCase):
         self.assertNotIn(self.about_us_page, site_2_pages)
 
 
+class TestPageQueryWithUrls(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.delete('wagtail_site_root_paths')
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_with_urls(self):
+        pages = Page.objects.filter(url_path__startswith='/home/events/').order_by('path')
+
+        with self.assertNumQueries(2):
+            # one query for the pages, and one for the site root paths
+            pages_and_urls = pages.with_urls()
+
+        self.assertEqual(pages_and_urls, [(page, page.get_url()) for page in pages])
+        self.assertEqual(pages_and_urls[0][1], '/events/')
+
+    def test_with_full_urls(self):
+        events_index = Page.objects.get(url_path='/home/events/')
+        Site.objects.create(hostname='events.example.com', root_page=events_index)
+        pages = Page.objects.filter(url_path__startswith='/home/').order_by('path')
+
+        pages_and_urls = pages.with_urls(full_url=True)
+
+        self.assertEqual(pages_and_urls, [(page, page.get_full_url()) for page in pages])
+        self.assertIn((events_index, 'http://events.example.com/'), pages_and_urls)
+
+    def test_with_urls_using_request(self):
+        request = HttpRequest()
+        request.site = Site.objects.get(is_default_site=True)
+        pages = Page.objects.filter(url_path__startswith='/home/events/').order_by('path')
+
+        pages_and_urls = pages.with_urls(request)
+
+        self.assertEqual(pages_and_urls, [(page, page.get_url(request)) for page in pages])
+        self.assertTrue(hasattr(request, '_wagtail_cached_site_root_paths'))
+
+
+class TestPageQueryPrefetchStreamBlocks(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        self.images = [
+            Image.objects.create(title='Test image %d' % i, file=get_test_image_file())
+            for i in range(3)
+        ]
+        home = Page.objects.get(url_path='/home/')
+        for i, image in enumerate(self.images):
+            home.add_child(instance=StreamPage(title='Stream page %d' % i, body=json.dumps([
+                {'type': 'text', 'value': 'foo'},
+                {'type': 'image', 'value': image.pk},
+            ])))
+
+    def test_prefetch_stream_blocks(self):
+        pages = Page.objects.type(StreamPage).specific().order_by('path').prefetch_stream_blocks('body')
+
+        with self.assertNumQueries(3):
+            # one query for the pages, one for the stream pages, and one for the images
+            images = [page.body[1].value for page in pages]
+
+        self.assertEqual(images, self.images)
+
+    def test_prefetch_stream_blocks_skips_other_page_types(self):
+        pages = Page.objects.specific().prefetch_stream_blocks('body')
+
+        self.assertIn(Page.objects.get(url_path='/home/').specific, pages)
+        with self.assertNumQueries(0):
+            [page.body[1].value for page in pages if isinstance(page, StreamPage)]
+
+    def test_prefetch_stream_blocks_with_chunk_size(self):
+        pages = StreamPage.objects.order_by('path').prefetch_stream_blocks('body')
+
+        with self.assertNumQueries(4):
+            # one query for the pages, and one for the images, of each of the two chunks
+            images = [page.body[1].value for page in pages.specific().iterator(chunk_size=2)]
+
+        self.assertEqual(images, self.images)
+
+    def test_clear_prefetch_stream_blocks(self):
+        pages = StreamPage.objects.prefetch_stream_blocks('body').prefetch_stream_blocks(None)
+
+        with self.assertNumQueries(len(self.images) + 1):
+            [page.body[1].value for page in pages]
+
+
 class TestPageQuerySetSearch(TestCase):
     fixtures = ['test.json']
 
@@ -619,6 +712,145 @@ class TestSpecificQuery(TestCase):
             Page.objects.get(url_path='/home/other/').specific,
         ])
 
+    def test_specific_keeps_select_related(self):
+        pages = list(Page.objects.get(url_path='/home/').get_children().select_related('owner').specific())
+
+        with self.assertNumQueries(0):
+            for page in pages:
+                page.owner
+
+    def test_specific_keeps_prefetch_related(self):
+        pages = list(Page.objects.get(url_path='/home/').get_children().prefetch_related('view_restrictions').specific())
+
+        with self.assertNumQueries(0):
+            for page in pages:
+                list(page.view_restrictions.all())
+
+    def test_specific_keeps_annotations(self):
+        pages = list(
+            Page.objects.get(url_path='/home/').get_descendants().annotate(
+                child_count=Count('id')
+            ).specific()
+        )
+
+        self.assertEqual(len(pages), 7)
+        for page in pages:
+            self.assertEqual(page.child_count, 1)
+
+    def test_specific_keeps_deferred_fields(self):
+        pages = list(Page.objects.type(EventPage).defer('search_description', 'seo_title').specific())
+
+        self.assertEqual(len(pages), 4)
+        for page in pages:
+            self.assertIsInstance(page, EventPage)
+            self.assertEqual(page.get_deferred_fields(), {'search_description', 'seo_title'})
+
+    def test_specific_with_only_loads_content_type(self):
+        root = Page.objects.get(url_path='/home/')
+
+        for qs in [root.get_descendants().only('title'), root.get_descendants().defer('content_type')]:
+            with self.assertNumQueries(4):
+                # One query to get the pages, and one query per page type
+                pages = list(qs.specific())
+
+            self.assertEqual(len(pages), 7)
+            self.assertIn(EventPage, [type(page) for page in pages])
+
+    def test_specific_with_missing_specific_row(self):
+        # A page whose row in its specific table can't be found is an error, rather than
+        # being silently returned as a plain Page
+        event_page = Page.objects.get(url_path='/home/events/christmas/')
+
+        with mock.patch('wagtail.core.query._get_specific_pages', return_value={}):
+            with self.assertRaises(KeyError):
+                list(Page.objects.filter(pk=event_page.pk).specific())
+
+    def test_specific_with_defer(self):
+        root = Page.objects.get(url_path='/home/')
+
+        with self.assertNumQueries(0):
+            qs = root.get_descendants().specific(defer=True)
+
+        with self.assertNumQueries(4):
+            # One query to get the pages, one query per page type to get the
+            # fields of its own table: EventIndex, EventPage, SimplePage
+            pages = list(qs)
+
+        self.assertEqual(len(pages), 7)
+
+        for page in pages:
+            model = page.content_type.model_class()
+            self.assertIsInstance(page, model)
+
+            # Fields of both the base and the specific tables are loaded
+            with self.assertNumQueries(0):
+                self.assertIs(page, page.specific)
+                page.title
+                if isinstance(page, EventPage):
+                    page.location
+
+        christmas = [page for page in pages if page.url_path == '/home/events/christmas/'][0]
+        self.assertEqual(christmas, EventPage.objects.get(url_path='/home/events/christmas/'))
+        self.assertEqual(christmas.location, EventPage.objects.get(url_path='/home/events/christmas/').location)
+
+    def test_specific_with_defer_keeps_annotations(self):
+        pages = list(
+            Page.objects.get(url_path='/home/').get_children().annotate(
+                child_count=Count('id')
+            ).specific(defer=True)
+        )
+
+        self.assertEqual(len(pages), 3)
+        for page in pages:
+            self.assertEqual(page.child_count, 1)
+
+    def test_specific_with_defer_gracefully_handles_missing_models(self):
+        missing_page_content_type = ContentType.objects.create(app_label='tests', model='missingpage')
+        Page.objects.filter(url_path='/home/events/').update(content_type=missing_page_content_type)
+
+        pages = list(Page.objects.get(url_path='/home/').get_children().specific(defer=True))
+        self.assertEqual(pages, [
+            Page.objects.get(url_path='/home/events/'),
+            Page.objects.get(url_path='/home/about-us/').specific,
+            Page.objects.get(url_path='/home/other/').specific,
+        ])
+        self.assertIs(type(pages[0]), Page)
+
+    def test_specific_iterator_with_chunk_size(self):
+        qs = Page.objects.get(url_path='/home/').get_descendants().specific()
+
+        with self.assertNumQueries(8):
+            # Three chunks of at most three pages; for each, one query to get the
+            # pages and one query per page type in the chunk:
+            # (EventIndex, EventPage), (EventPage, SimplePage), (EventPage)
+            pages = list(qs.iterator(chunk_size=3))
+
+        self.assertEqual(pages, list(qs))
+        for page in pages:
+            self.assertIsInstance(page, page.content_type.model_class())
+
+    def test_specific_iterator_with_chunk_size_keeps_descending_order(self):
+        qs = Page.objects.order_by('-path').specific()
+        self.assertEqual(list(qs.iterator(chunk_size=2)), list(qs))
+
+    def test_specific_iterator_with_chunk_size_keeps_other_orderings(self):
+        qs = Page.objects.live().order_by('-title')[1:6].specific(defer=True)
+        pages = list(qs.iterator(chunk_size=2))
+
+        self.assertEqual(pages, list(qs))
+        self.assertEqual(len(pages), 5)
+        for page in pages:
+            self.assertIsInstance(page, page.content_type.model_class())
+
+    def test_specific_iterator_with_chunk_size_keeps_prefetch_related(self):
+        pages = list(
+            Page.objects.prefetch_related('view_restrictions').specific().iterator(chunk_size=4)
+        )
+
+        with self.assertNumQueries(0):
+            for page in pages:
+                list(page.view_restrictions.all())
+
 
 class TestFirstCommonAncestor(TestCase):
     """
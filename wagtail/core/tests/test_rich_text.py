@@ -1,12 +1,14 @@
 from bs4 import BeautifulSoup
-from django.test import TestCase
-from mock import patch
+from django.test import TestCase, override_settings
+from django.urls import set_script_prefix
+from mock import Mock, patch
 
-from wagtail.core.models import Page
-from wagtail.core.rich_text import RichText, expand_db_html
+from wagtail.core.models import Page, Site
+from wagtail.core.rich_text import RichText, expand_db_html, render_cache
 from wagtail.core.rich_text.feature_registry import FeatureRegistry
-from wagtail.core.rich_text.pages import PageLinkHandler, page_linktype_handler
-from wagtail.core.rich_text.rewriters import extract_attrs
+from wagtail.core.rich_text.pages import (
+    PageLinkHandler, bulk_page_linktype_handler, page_linktype_handler)
+from wagtail.core.rich_text.rewriters import EmbedRewriter, LinkRewriter, extract_attrs
 
 
 class TestPageLinkHandler(TestCase):
@@ -41,6 +43,16 @@ class TestPageLinkHandler(TestCase):
         result = page_linktype_handler({'id': 1})
         self.assertEqual(result, '<a href="None">')
 
+    def test_bulk_expand_db_attributes(self):
+        attrs_list = [{'id': '2'}, {'id': '0'}, {'id': '3'}, {'id': '2'}]
+        Site.get_site_root_paths()
+
+        # One query for each page type, and one for the (cached) site root paths
+        with self.assertNumQueries(3):
+            result = bulk_page_linktype_handler(attrs_list)
+
+        self.assertEqual(result, [page_linktype_handler(attrs) for attrs in attrs_list])
+
 
 class TestExtractAttrs(TestCase):
     def test_extract_attr(self):
@@ -49,6 +61,39 @@ class TestExtractAttrs(TestCase):
         self.assertEqual(result, {'foo': 'bar', 'baz': 'quux'})
 
 
+class TestRewriters(TestCase):
+    def test_link_rewriter_with_bulk_rule(self):
+        bulk_rule = Mock(return_value=['<a href="/foo/">', '<a href="/bar/">'])
+        rewriter = LinkRewriter(
+            {'test': lambda attrs: '<a href="/single/">', 'other': lambda attrs: '<a href="/other/">'},
+            {'test': bulk_rule}
+        )
+
+        result = rewriter(
+            '<a linktype="test" id="1">foo</a> <a linktype="other" id="2">other</a> '
+            '<a href="/plain/">plain</a> <a linktype="test" id="3">bar</a> <a linktype="unknown">unknown</a>'
+        )
+
+        bulk_rule.assert_called_once_with([
+            {'linktype': 'test', 'id': '1'},
+            {'linktype': 'test', 'id': '3'},
+        ])
+        self.assertEqual(
+            result,
+            '<a href="/foo/">foo</a> <a href="/other/">other</a> '
+            '<a href="/plain/">plain</a> <a href="/bar/">bar</a> <a>unknown</a>'
+        )
+
+    def test_embed_rewriter_with_bulk_rule(self):
+        bulk_rule = Mock(return_value=['<img src="1.jpg">', '<img src="2.jpg">'])
+        rewriter = EmbedRewriter({}, {'test': bulk_rule})
+
+        result = rewriter('<p><embed embedtype="test" id="1"/></p><embed embedtype="test" id="2"/>')
+
+        self.assertEqual(bulk_rule.call_count, 1)
+        self.assertEqual(result, '<p><img src="1.jpg"></p><img src="2.jpg">')
+
+
 class TestExpandDbHtml(TestCase):
     def test_expand_db_html_with_linktype(self):
         html = '<a id="1" linktype="document">foo</a>'
@@ -69,6 +114,84 @@ class TestExpandDbHtml(TestCase):
         self.assertIn('test html', result)
 
 
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'richtext': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'wagtail-rich-text',
+        },
+    },
+    WAGTAIL_RICH_TEXT_CACHE='richtext',
+)
+class TestRenderCache(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        render_cache.get_render_cache().clear()
+
+    def test_repeated_render_is_cached(self):
+        html = '<p>Merry <a linktype="page" id="4">Christmas</a>!</p>'
+        result = expand_db_html(html)
+        self.assertEqual(result, '<p>Merry <a href="/events/christmas/">Christmas</a>!</p>')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(expand_db_html(html), result)
+
+    def test_script_prefix_is_part_of_key(self):
+        html = '<a linktype="page" id="4">Christmas</a>'
+        self.assertEqual(expand_db_html(html), '<a href="/events/christmas/">Christmas</a>')
+
+        set_script_prefix('/prefix/')
+        try:
+            self.assertEqual(expand_db_html(html), '<a href="/prefix/events/christmas/">Christmas</a>')
+        finally:
+            set_script_prefix('/')
+
+    def test_html_without_references_is_not_cached(self):
+        self.assertIsNone(render_cache.get_cache_key(render_cache.get_render_cache(), '<p>hello world</p>'))
+        self.assertIsNone(render_cache.get_cache_key(render_cache.get_render_cache(), '<a href="/">home</a>'))
+
+    def test_publishing_page_invalidates(self):
+        html = '<a linktype="page" id="4">Christmas</a>'
+        expand_db_html(html)
+
+        page = Page.objects.get(id=4).specific
+        page.slug = 'xmas'
+        page.save_revision().publish()
+
+        self.assertEqual(expand_db_html(html), '<a href="/events/xmas/">Christmas</a>')
+
+    def test_draft_revision_does_not_invalidate(self):
+        html = '<a linktype="page" id="4">Christmas</a>'
+        result = expand_db_html(html)
+
+        page = Page.objects.get(id=4).specific
+        page.slug = 'xmas'
+        page.save_revision()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(expand_db_html(html), result)
+
+    def test_moving_page_invalidates_links_to_descendants(self):
+        html = '<a linktype="page" id="4">Christmas</a>'
+        expand_db_html(html)
+
+        Page.objects.get(id=3).move(Page.objects.get(id=7), pos='last-child')
+
+        self.assertEqual(expand_db_html(html), '<a href="/about-us/events/christmas/">Christmas</a>')
+
+    def test_deleting_page_invalidates(self):
+        html = '<a linktype="page" id="4">Christmas</a>'
+        expand_db_html(html)
+
+        Page.objects.get(id=4).delete()
+
+        self.assertEqual(expand_db_html(html), '<a>Christmas</a>')
+
+
 class TestRichTextValue(TestCase):
     fixtures = ['test.json']
 
@@ -0,0 +1,112 @@
+from django.http import Http404, HttpRequest
+from django.test import TestCase, override_settings
+
+from wagtail.core.models import Page, Site
+from wagtail.core.routing_index import routing_index
+from wagtail.tests.routablepage.models import RoutablePageTest
+from wagtail.tests.testapp.models import EventPage, SimplePage
+
+
+@override_settings(WAGTAIL_ROUTING_INDEX=True)
+class TestRoutingIndex(TestCase):
+    fixtures = ['test.json']
+
+    def setUp(self):
+        # The index is held in process memory, so it isn't rolled back between tests
+        routing_index.invalidate()
+        self.site = Site.objects.get(is_default_site=True)
+
+    def route(self, path):
+        request = HttpRequest()
+        request.path = path
+        path_components = [component for component in path.split('/') if component]
+        return routing_index.route(request, self.site, path_components)
+
+    def test_route_to_page(self):
+        christmas_page = EventPage.objects.get(url_path='/home/events/christmas/')
+
+        page, args, kwargs = self.route('/events/christmas/')
+
+        self.assertEqual(page, christmas_page)
+        self.assertIsInstance(page, EventPage)
+        self.assertEqual(args, [])
+        self.assertEqual(kwargs, {})
+
+    def test_route_to_site_root(self):
+        page, args, kwargs = self.route('/')
+        self.assertEqual(page.url_path, '/home/')
+
+    def test_route_to_unknown_page_returns_404(self):
+        with self.assertRaises(Http404):
+            self.route('/events/quinquagesima/')
+
+    def test_route_to_unpublished_page_returns_404(self):
+        with self.assertRaises(Http404):
+            self.route('/events/tentative-unpublished-event/')
+
+    def test_route_uses_one_query_once_built(self):
+        self.route('/secret-plans/steal-underpants/')
+
+        # Only the specific page is fetched (plus the version token from the database cache)
+        with self.assertNumQueries(2):
+            page, args, kwargs = self.route('/secret-plans/steal-underpants/')
+        self.assertEqual(page.url_path, '/home/secret-plans/steal-underpants/')
+        self.assertIsInstance(page, EventPage)
+
+    def test_route_through_custom_route_method(self):
+        home_page = Page.objects.get(url_path='/home/')
+        routable_page = home_page.add_child(instance=RoutablePageTest(title="Routable Page", live=True))
+
+        page, args, kwargs = self.route('/routable-page/archive/year/2014/')
+
+        self.assertEqual(page, routable_page)
+        self.assertEqual(args, (routable_page.archive_by_year, ('2014', ), {}))
+
+    def test_index_follows_slug_change(self):
+        about_us = SimplePage.objects.get(url_path='/home/about-us/')
+        self.route('/about-us/')
+
+        about_us.slug = 'about'
+        about_us.save()
+
+        self.assertEqual(self.route('/about/')[0], about_us)
+        with self.assertRaises(Http404):
+            self.route('/about-us/')
+
+    def test_index_follows_unpublish(self):
+        christmas_page = EventPage.objects.get(url_path='/home/events/christmas/')
+        self.route('/events/christmas/')
+
+        christmas_page.unpublish()
+
+        with self.assertRaises(Http404):
+            self.route('/events/christmas/')
+
+    def test_index_follows_move(self):
+        christmas_page = EventPage.objects.get(url_path='/home/events/christmas/')
+        home_page = Page.objects.get(url_path='/home/')
+        self.route('/events/christmas/')
+
+        christmas_page.move(home_page, pos='last-child')
+
+        self.assertEqual(self.route('/christmas/')[0], christmas_page)
+        with self.assertRaises(Http404):
+            self.route('/events/christmas/')
+
+    def test_index_follows_delete(self):
+        self.route('/events/christmas/')
+
+        Page.objects.get(url_path='/home/events/').delete()
+
+        with self.assertRaises(Http404):
+            self.route('/events/christmas/')
+
+    def test_serve(self):
+        response = self.client.get('/events/christmas/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h1>Christmas</h1>')
+
+    def test_serve_unpublished_page_returns_404(self):
+        response = self.client.get('/events/tentative-unpublished-event/')
+        self.assertEqual(response.status_code, 404)
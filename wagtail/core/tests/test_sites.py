@@ -3,6 +3,7 @@ from django.http.request import HttpRequest
 from django.test import TestCase, override_settings
 
 from wagtail.core.models import Page, Site
+from wagtail.core.sites import site_cache
 
 
 class TestSiteNaturalKey(TestCase):
@@ -91,6 +92,76 @@ class TestFindSiteForRequest(TestCase):
             self.assertEqual(Site.find_for_request(request), self.site)
 
 
+@override_settings(WAGTAIL_SITE_CACHE=True)
+class TestFindSiteForRequestWithSiteCache(TestFindSiteForRequest):
+    def setUp(self):
+        super().setUp()
+        # The cache is held in process memory, so it isn't rolled back between tests
+        site_cache.invalidate()
+
+    def get_site(self, host, port=80):
+        request = HttpRequest()
+        request.META = {'HTTP_HOST': host, 'SERVER_PORT': port}
+        return Site.find_for_request(request)
+
+    def test_with_host_and_port(self):
+        site_8080 = Site.objects.create(hostname='example.com', port=8080, root_page=Page.objects.get(pk=2))
+        self.assertEqual(self.get_site('example.com', '8080'), site_8080)
+        self.assertEqual(self.get_site('example.com'), self.site)
+
+    def test_with_many_hostname_matches_uses_default(self):
+        Site.objects.create(hostname='example.com', port=8080, root_page=Page.objects.get(pk=2))
+        self.assertEqual(self.get_site('example.com', '8081'), self.default_site)
+
+    def test_with_single_hostname_match_on_other_port(self):
+        self.assertEqual(self.get_site('example.com', '8081'), self.site)
+
+    def test_with_no_default_site(self):
+        self.default_site.delete()
+        with self.assertRaises(Site.DoesNotExist):
+            self.get_site('unknown.com')
+
+    def test_includes_root_page(self):
+        site = self.get_site('example.com')
+        self.assertEqual(site.root_page.url_path, '/home/')
+
+    def test_no_queries_once_loaded(self):
+        self.get_site('example.com')
+
+        # Only the version token is read, from the database cache
+        with self.assertNumQueries(1):
+            site = self.get_site('example.com')
+            self.assertEqual(site.root_page.url_path, '/home/')
+
+    def test_returns_separate_instances(self):
+        self.get_site('example.com').hostname = 'changed.com'
+        self.assertEqual(self.get_site('example.com').hostname, 'example.com')
+
+    def test_cache_follows_site_save(self):
+        self.get_site('example.com')
+
+        self.site.hostname = 'example.org'
+        self.site.save()
+
+        self.assertEqual(self.get_site('example.com'), self.default_site)
+
+    def test_cache_follows_site_delete(self):
+        self.get_site('example.com')
+
+        self.site.delete()
+
+        self.assertEqual(self.get_site('example.com'), self.default_site)
+
+    def test_cache_follows_root_page_slug_change(self):
+        self.get_site('example.com')
+
+        root_page = Page.objects.get(pk=2)
+        root_page.slug = 'new-home'
+        root_page.save()
+
+        self.assertEqual(self.get_site('example.com').root_page.url_path, '/new-home/')
+
+
 class TestDefaultSite(TestCase):
     def test_create_default_site(self):
         Site.objects.all().delete()
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*
 import json
 
+import mock
 from django.apps import apps
 from django.db import models
 from django.template import Context, Template, engines
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils.safestring import SafeText
 
 from wagtail.core import blocks
@@ -111,6 +112,87 @@ class TestLazyStreamField(TestCase):
             assert instance.body[1].value is None
             assert instance.body[2].value.title == 'Test image 3'
 
+    def test_nested_blocks_are_fetched_in_bulk(self):
+        """
+        Chooser blocks nested within structs, lists and streams should be fetched with one
+        query per model for the whole stream
+        """
+        from wagtail.images.blocks import ImageChooserBlock
+
+        image_2 = Image.objects.create(title='Test image 2', file=get_test_image_file())
+        stream_block = blocks.StreamBlock([
+            ('gallery', blocks.StructBlock([
+                ('cover', ImageChooserBlock()),
+                ('images', blocks.ListBlock(ImageChooserBlock())),
+                ('page', blocks.PageChooserBlock()),
+            ])),
+            ('section', blocks.StreamBlock([
+                ('image', ImageChooserBlock()),
+            ])),
+            ('text', blocks.CharBlock()),
+        ])
+        value = stream_block.to_python([
+            {'type': 'text', 'value': 'foo'},
+            {'type': 'gallery', 'value': {'cover': self.image.pk, 'images': [image_2.pk, 0], 'page': 1}},
+            {'type': 'section', 'value': [{'type': 'image', 'value': image_2.pk}]},
+            {'type': 'gallery', 'value': {'cover': None, 'images': [self.image.pk]}},
+        ])
+
+        # One query for the images and one for the pages
+        with self.assertNumQueries(2):
+            self.assertEqual(value[1].value['cover'], self.image)
+            self.assertEqual(value[1].value['images'], [image_2, None])
+            self.assertEqual(value[1].value['page'].pk, 1)
+            self.assertEqual(value[2].value[0].value, image_2)
+            self.assertIsNone(value[3].value['cover'])
+            self.assertEqual(value[3].value['images'], [self.image])
+            self.assertIsNone(value[3].value['page'])
+            self.assertEqual(value[0].value, 'foo')
+
+    def test_custom_to_python_is_used_when_nested(self):
+        from wagtail.images.blocks import ImageChooserBlock
+
+        class TitledImageBlock(blocks.StructBlock):
+            image = ImageChooserBlock()
+
+            def to_python(self, value):
+                value = super().to_python(value)
+                value['title'] = value['image'].title.upper()
+                return value
+
+        stream_block = blocks.StreamBlock([
+            ('images', blocks.ListBlock(TitledImageBlock())),
+        ])
+        value = stream_block.to_python([{'type': 'images', 'value': [{'image': self.image.pk}]}])
+
+        self.assertEqual(value[0].value[0]['title'], 'TEST IMAGE')
+
+    def test_custom_bulk_to_python_is_used(self):
+        class UpperCaseBlock(blocks.CharBlock):
+            def bulk_to_python(self, values):
+                return [value.upper() for value in values]
+
+        stream_block = blocks.StreamBlock([
+            ('text', UpperCaseBlock()),
+        ])
+        value = stream_block.to_python([{'type': 'text', 'value': 'foo'}, {'type': 'text', 'value': 'bar'}])
+
+        with mock.patch.object(UpperCaseBlock, 'bulk_to_python', autospec=True,
+                               side_effect=UpperCaseBlock.bulk_to_python) as bulk_to_python:
+            self.assertEqual([child.value for child in value], ['FOO', 'BAR'])
+
+        self.assertEqual(bulk_to_python.call_count, 1)
+
+    def test_bulk_to_python(self):
+        from wagtail.images.blocks import ImageChooserBlock
+
+        block = blocks.ListBlock(ImageChooserBlock())
+
+        with self.assertNumQueries(1):
+            values = block.bulk_to_python([[self.image.pk], [], [self.image.pk, None]])
+
+        self.assertEqual(values, [[self.image], [], [self.image, None]])
+
 
 class TestSystemCheck(TestCase):
     def tearDown(self):
@@ -163,6 +245,86 @@ class TestStreamValueAccess(TestCase):
         self.assertEqual(fetched_body[0].value.source, "<h2>hello world</h2>")
 
 
+class TestLazyJSONStreamValue(TestCase):
+    def setUp(self):
+        self.instance = StreamModel.objects.create(body=json.dumps([
+            {'type': 'text', 'value': 'foo'},
+            {'type': 'rich_text', 'value': '<p>bar</p>'},
+            {'type': 'unknown', 'value': 'baz'},
+            {'type': 'text', 'value': 'quux'},
+        ]))
+
+    def test_json_is_parsed_on_first_access(self):
+        with mock.patch('wagtail.core.blocks.stream_block.json.loads', side_effect=json.loads) as loads:
+            body = StreamModel.objects.get(pk=self.instance.pk).body
+            self.assertFalse(loads.called)
+
+            self.assertEqual(len(body), 3)
+            self.assertEqual(body[2].value, 'quux')
+            self.assertEqual(loads.call_count, 1)
+
+    def test_non_json_content(self):
+        instance = StreamModel.objects.create(body="<h1>hello world</h1>")
+        body = StreamModel.objects.get(pk=instance.pk).body
+
+        self.assertEqual(body.raw_text, "<h1>hello world</h1>")
+        self.assertFalse(body)
+
+    def test_null_content(self):
+        instance = StreamModel.objects.create(body='null')
+        self.assertEqual(len(StreamModel.objects.get(pk=instance.pk).body), 0)
+
+    def test_unchanged_value_is_saved(self):
+        instance = StreamModel.objects.get(pk=self.instance.pk)
+        instance.save()
+
+        self.assertEqual(StreamModel.objects.get(pk=self.instance.pk).body, instance.body)
+
+    @override_settings(WAGTAIL_STREAMFIELD_JSON_LOADS='wagtail.core.tests.test_streamfield.counting_json_loads')
+    def test_custom_json_loads(self):
+        counting_json_loads.call_count = 0
+        body = StreamModel.objects.get(pk=self.instance.pk).body
+
+        self.assertEqual(body[0].value, 'foo')
+        self.assertEqual(counting_json_loads.call_count, 1)
+
+    def test_slice(self):
+        body = StreamModel.objects.get(pk=self.instance.pk).body
+
+        self.assertEqual([child.block_type for child in body[:2]], ['text', 'rich_text'])
+        self.assertEqual(set(body._bound_blocks), {0, 1})
+        self.assertEqual([child.value for child in body[-1:]], ['quux'])
+
+    def test_blocks_by_name(self):
+        body = StreamModel.objects.get(pk=self.instance.pk).body
+
+        self.assertEqual([child.value for child in body.blocks_by_name('text')], ['foo', 'quux'])
+        self.assertIsNone(body.first_block_by_name('image'))
+
+        # The rich text child was never asked for, so it is left unconverted
+        self.assertEqual(set(body._bound_blocks), {0, 2})
+
+    def test_first_block_by_name(self):
+        body = StreamModel.objects.get(pk=self.instance.pk).body
+
+        self.assertEqual(body.first_block_by_name('text').value, 'foo')
+        self.assertEqual(set(body._bound_blocks), {0})
+
+        self.assertEqual(body.first_block_by_name('rich_text').value.source, '<p>bar</p>')
+        self.assertEqual(set(body._bound_blocks), {0, 1})
+
+    def test_blocks_by_name_with_native_values(self):
+        body = StreamValue(StreamModel._meta.get_field('body').stream_block, [('text', 'foo'), ('text', 'bar', 'id')])
+
+        self.assertEqual(body.first_block_by_name('text').value, 'foo')
+        self.assertEqual([child.id for child in body.blocks_by_name('text')], [None, 'id'])
+
+
+def counting_json_loads(raw_json):
+    counting_json_loads.call_count += 1
+    return json.loads(raw_json)
+
+
 class TestStreamFieldRenderingBase(TestCase):
     def setUp(self):
         self.image = Image.objects.create(
@@ -1,3 +1,10 @@
+import re
+
+from django.conf import settings
+from django.urls import get_script_prefix, get_urlconf, reverse
+from django.utils.http import RFC3986_SUBDELIMS, urlquote
+from django.utils.translation import get_language
+
 
 class RouteResult:
     """
@@ -14,3 +21,35 @@ class RouteResult:
 
     def __getitem__(self, index):
         return (self.page, self.args, self.kwargs)[index]
+
+
+# Matches the paths that the wagtail_serve URL pattern accepts (whether or not
+# WAGTAIL_APPEND_SLASH is set), and that can therefore be appended to its prefix
+SERVE_PATH_RE = re.compile(r'^(?:[\w\-]+/)*$', re.UNICODE)
+
+_serve_url_prefixes = {}
+
+
+def get_serve_url_prefix():
+    """
+    Return the URL of the site root as served by the wagtail_serve URL pattern -
+    i.e. ``reverse('wagtail_serve', args=('',))`` - reversing it only once for each
+    combination of URLconf, script prefix and language.
+    """
+    key = (get_urlconf(), settings.ROOT_URLCONF, get_script_prefix(), get_language())
+    try:
+        return _serve_url_prefixes[key]
+    except KeyError:
+        prefix = _serve_url_prefixes[key] = reverse('wagtail_serve', args=('',))
+        return prefix
+
+
+def reverse_serve_url(path):
+    """
+    Equivalent to ``reverse('wagtail_serve', args=(path,))``, but builds the URL
+    from a prefix that is reversed once rather than on every call
+    """
+    if not SERVE_PATH_RE.match(path):
+        return reverse('wagtail_serve', args=(path,))
+
+    return get_serve_url_prefix() + urlquote(path, safe=RFC3986_SUBDELIMS + '/~:@')
@@ -1,9 +1,12 @@
 import inspect
 import re
 import unicodedata
+import uuid
 
 from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Model
 from django.utils.encoding import force_text
 from django.utils.text import slugify
@@ -103,3 +106,30 @@ def accepts_kwarg(func, kwarg):
         return True
     except TypeError:
         return False
+
+
+def get_cache_version(key):
+    """
+    Return the version token held under key in the default cache, which processes compare
+    to tell whether their own copy of some data is current. If the token has never been
+    set, or has been evicted, a fresh one is set, as copies made before can't be trusted.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+
+    return version
+
+
+def replace_cache_version(key):
+    """
+    Replace the version token held under key, so that all processes discard their copies
+    of the data. The token is replaced again once the current transaction commits, so that
+    a process reloading the data in the meantime can't keep a stale copy.
+    """
+    def replace_version():
+        cache.set(key, uuid.uuid4().hex, None)
+
+    replace_version()
+    transaction.on_commit(replace_version)
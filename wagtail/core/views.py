@@ -5,6 +5,7 @@ from django.urls import reverse
 from wagtail.core import hooks
 from wagtail.core.forms import PasswordViewRestrictionForm
 from wagtail.core.models import Page, PageViewRestriction
+from wagtail.core.routing_index import routing_index, routing_index_enabled
 
 
 def serve(request, path):
@@ -14,7 +15,10 @@ def serve(request, path):
         raise Http404
 
     path_components = [component for component in path.split('/') if component]
-    page, args, kwargs = request.site.root_page.specific.route(request, path_components)
+    if routing_index_enabled():
+        page, args, kwargs = routing_index.route(request, request.site, path_components)
+    else:
+        page, args, kwargs = request.site.root_page.specific.route(request, path_components)
 
     for fn in hooks.get_hooks('before_serve_page'):
         result = fn(page, request, args, kwargs)
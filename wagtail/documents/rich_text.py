@@ -17,6 +17,22 @@ def document_linktype_handler(attrs):
         return "<a>"
 
 
+def bulk_document_linktype_handler(attrs_list):
+    """
+    Rewrite a list of document links at once, fetching the documents in a single query
+    """
+    Document = get_document_model()
+    ids = [str(attrs.get('id')) for attrs in attrs_list if str(attrs.get('id')).isdigit()]
+    docs = {str(doc.id): doc for doc in Document.objects.filter(id__in=ids)}
+
+    html = []
+    for attrs in attrs_list:
+        doc = docs.get(str(attrs.get('id')))
+        html.append("<a>" if doc is None else '<a href="%s">' % escape(doc.url))
+
+    return html
+
+
 # hallo.js / editor-html conversion
 
 class DocumentLinkHandler:
@@ -1,6 +1,7 @@
 from django.db import transaction
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 
+from wagtail.core.rich_text import render_cache
 from wagtail.documents.models import get_document_model
 
 
@@ -9,6 +10,14 @@ def post_delete_file_cleanup(instance, **kwargs):
     transaction.on_commit(lambda: instance.file.delete(False))
 
 
+def invalidate_rich_text_for_document(instance, **kwargs):
+    # Saving a document may change its file, and so the URL of links to it
+    render_cache.invalidate_object('document', instance.pk)
+
+
 def register_signal_handlers():
     Document = get_document_model()
     post_delete.connect(post_delete_file_cleanup, sender=Document)
+
+    post_save.connect(invalidate_rich_text_for_document, sender=Document)
+    post_delete.connect(invalidate_rich_text_for_document, sender=Document)
@@ -1,7 +1,10 @@
 from bs4 import BeautifulSoup
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-from wagtail.documents.rich_text import DocumentLinkHandler, document_linktype_handler
+from wagtail.core.rich_text import expand_db_html, render_cache
+from wagtail.documents.models import Document
+from wagtail.documents.rich_text import (
+    DocumentLinkHandler, bulk_document_linktype_handler, document_linktype_handler)
 
 
 class TestDocumentRichTextLinkHandler(TestCase):
@@ -27,3 +30,29 @@ class TestDocumentRichTextLinkHandler(TestCase):
         result = document_linktype_handler({'id': 1})
         self.assertEqual(result,
                          '<a href="/documents/1/test.pdf">')
+
+    def test_bulk_expand_db_attributes(self):
+        attrs_list = [{'id': '1'}, {'id': '0'}, {'id': '1'}]
+
+        with self.assertNumQueries(1):
+            result = bulk_document_linktype_handler(attrs_list)
+
+        self.assertEqual(result, ['<a href="/documents/1/test.pdf">', '<a>', '<a href="/documents/1/test.pdf">'])
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'richtext': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        },
+        WAGTAIL_RICH_TEXT_CACHE='richtext',
+    )
+    def test_saving_document_invalidates_render_cache(self):
+        render_cache.get_render_cache().clear()
+        html = '<a linktype="document" id="1">test</a>'
+        self.assertEqual(expand_db_html(html), '<a href="/documents/1/test.pdf">test</a>')
+
+        document = Document.objects.get(id=1)
+        document.file.name = 'documents/other.pdf'
+        document.save()
+
+        self.assertEqual(expand_db_html(html), '<a href="/documents/1/other.pdf">test</a>')
@@ -22,7 +22,7 @@ from wagtail.documents.models import get_document_model
 from wagtail.documents.permissions import permission_policy
 from wagtail.documents.rich_text import (
     ContentstateDocumentLinkConversionRule, EditorHTMLDocumentLinkConversionRule,
-    document_linktype_handler)
+    bulk_document_linktype_handler, document_linktype_handler)
 
 
 @hooks.register('register_admin_urls')
@@ -80,7 +80,7 @@ def editor_js():
 
 @hooks.register('register_rich_text_features')
 def register_document_feature(features):
-    features.register_link_type('document', document_linktype_handler)
+    features.register_link_type('document', document_linktype_handler, bulk_document_linktype_handler)
 
     features.register_editor_plugin(
         'hallo', 'document-link',
@@ -9,6 +9,9 @@ from willow.plugins.pillow import PillowImage
 
 
 class Operation:
+    # Whether this operation can change the dimensions of the image
+    changes_size = True
+
     def __init__(self, method, *args):
         self.method = method
         self.args = args
@@ -31,8 +34,18 @@ class Operation:
     def run(self, willow, image, env):
         raise NotImplementedError
 
+    def get_resize_scale(self, width, height, image):
+        """
+        Return the factor that this operation will scale an image of the given size by,
+        before the image is decoded, or None if this can't be known in advance. This
+        allows large source images to be decoded at a reduced size (see Filter.run_many).
+        """
+        return None
+
 
 class DoNothingOperation(Operation):
+    changes_size = False
+
     def construct(self):
         pass
 
@@ -65,10 +78,22 @@ class FillOperation(Operation):
         if self.crop_closeness > 1:
             self.crop_closeness = 1
 
+    def get_resize_scale(self, width, height, image):
+        if self.crop_closeness and image.has_focal_point():
+            # The crop box may be zoomed in on the focal point
+            return None
+
+        return max(self.width / width, self.height / height)
+
     def run(self, willow, image, env):
         image_width, image_height = willow.get_size()
         focal_point = image.get_focal_point()
 
+        if focal_point is not None and 'decode-scale' in env:
+            # The image was reduced in size when it was decoded, so scale the focal
+            # point down to match
+            focal_point = focal_point.scale(env['decode-scale'])
+
         # Get crop aspect ratio
         crop_aspect_ratio = self.width / self.height
 
@@ -153,6 +178,12 @@ class MinMaxOperation(Operation):
         self.width = int(width_str)
         self.height = int(height_str)
 
+    def get_resize_scale(self, width, height, image):
+        if self.method == 'min':
+            return max(self.width / width, self.height / height)
+        elif self.method == 'max':
+            return min(self.width / width, self.height / height)
+
     def run(self, willow, image, env):
         image_width, image_height = willow.get_size()
 
@@ -193,6 +224,12 @@ class WidthHeightOperation(Operation):
         self.size = int(size)
         self.force = force
 
+    def get_resize_scale(self, width, height, image):
+        if self.method == 'width':
+            return self.size / width
+        elif self.method == 'height':
+            return self.size / height
+
     def run(self, willow, image, env):
         image_width, image_height = willow.get_size()
 
@@ -249,6 +286,9 @@ class ForceFitOperation(Operation):
         self.width = int(width_str)
         self.height = int(height_str)
 
+    def get_resize_scale(self, width, height, image):
+        return min(self.width / width, self.height / height)
+
     def run(self, willow, image, env):
         (original_width, original_height) = willow.get_size()
         (target_width, target_height) = self.width, self.height
@@ -280,6 +320,8 @@ registry.register_operation(PillowImage, 'quantize', pillow_quantize)
 class QuantizeOperation(Operation):
     """Reduce image color palette to 256 colors."""
 
+    changes_size = False
+
     def construct(self, *args):
         pass
 
@@ -288,6 +330,8 @@ class QuantizeOperation(Operation):
 
 
 class JPEGQualityOperation(Operation):
+    changes_size = False
+
     def construct(self, quality):
         self.quality = int(quality)
 
@@ -299,6 +343,8 @@ class JPEGQualityOperation(Operation):
 
 
 class FormatOperation(Operation):
+    changes_size = False
+
     def construct(self, fmt):
         self.format = fmt
 
@@ -310,6 +356,8 @@ class FormatOperation(Operation):
 
 
 class BackgroundColorOperation(Operation):
+    changes_size = False
+
     def construct(self, color_string):
         self.color = parse_color_string(color_string)
 
@@ -318,6 +366,8 @@ class BackgroundColorOperation(Operation):
 
 
 class AltTextOperation(Operation):
+    changes_size = False
+
     def construct(self, *args):
         pass
 
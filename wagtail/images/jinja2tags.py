@@ -7,7 +7,7 @@ def image(image, filterspec, **attrs):
     if not image:
         return ''
 
-    rendition = get_rendition_or_not_found(image, filterspec)
+    rendition = get_rendition_or_not_found(image, filterspec, allow_placeholder=True)
 
     if attrs:
         return rendition.img_tag(attrs)
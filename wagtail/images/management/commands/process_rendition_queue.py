@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from wagtail.images.rendition_queue import DatabaseRenditionQueue
+
+
+class Command(BaseCommand):
+    help = "Generates the renditions queued by the database rendition queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', action='store', dest='batch_size', type=int, default=100,
+            help="Number of queued renditions to fetch at a time (default: 100)")
+
+    def handle(self, *args, **options):
+        count = DatabaseRenditionQueue({}).process(batch_size=options['batch_size'])
+        self.stdout.write("Generated %d renditions" % count)
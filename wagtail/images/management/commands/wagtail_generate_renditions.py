@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from wagtail.images import get_image_model
+from wagtail.images.exceptions import InvalidFilterSpecError
+from wagtail.images.models import Filter, get_renditions
+
+
+class Command(BaseCommand):
+    help = "Generates the renditions of all images (or the images in a collection) for the given filter specs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'filter_specs', nargs='+', metavar='filter_spec',
+            help="Filter specs to generate renditions for, such as fill-300x200 or width-640|jpegquality-60")
+        parser.add_argument(
+            '--collection', action='store', dest='collection_id', type=int,
+            help="Only generate renditions for the images in the collection with this ID")
+        parser.add_argument(
+            '--workers', action='store', dest='workers', type=int, default=1,
+            help="Number of threads to generate renditions in (default: 1)")
+        parser.add_argument(
+            '--chunk-size', action='store', dest='chunk_size', type=int, default=100,
+            help="Number of images for each worker to fetch and process at a time (default: 100)")
+
+    def generate_renditions(self, image_ids, filters):
+        Image = get_image_model()
+        images = Image.objects.filter(pk__in=image_ids)
+        return sum(len(renditions) for renditions in get_renditions(images, filters).values())
+
+    def generate_renditions_in_thread(self, image_ids, filters):
+        try:
+            return self.generate_renditions(image_ids, filters)
+        finally:
+            # Each thread has its own database connection; don't leave it open
+            connection.close()
+
+    def handle(self, *args, **options):
+        filters = [Filter(spec=filter_spec) for filter_spec in options['filter_specs']]
+        for filter in filters:
+            try:
+                filter.operations
+            except InvalidFilterSpecError as e:
+                raise CommandError("Invalid filter spec '%s': %s" % (filter.spec, e))
+
+        Image = get_image_model()
+        images = Image.objects.all()
+        if options['collection_id'] is not None:
+            images = images.filter(collection_id=options['collection_id'])
+
+        image_ids = list(images.order_by('pk').values_list('pk', flat=True))
+        chunk_size = options['chunk_size']
+        chunks = [image_ids[start:start + chunk_size] for start in range(0, len(image_ids), chunk_size)]
+
+        self.stdout.write("Generating renditions for %d images" % len(image_ids))
+
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                counts = executor.map(lambda chunk: self.generate_renditions_in_thread(chunk, filters), chunks)
+                total = 0
+                for count in counts:
+                    total += count
+                    self.stdout.write("Generated %d renditions" % total)
+        else:
+            total = 0
+            for chunk in chunks:
+                total += self.generate_renditions(chunk, filters)
+                self.stdout.write("Generated %d renditions" % total)
+
+        self.stdout.write("Done")
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailimages', '0022_auto_20190506_2114'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingRendition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image_id', models.IntegerField()),
+                ('filter_spec', models.CharField(max_length=255)),
+                ('focal_point_key', models.CharField(blank=True, default='', max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='pendingrendition',
+            unique_together={('image_id', 'filter_spec', 'focal_point_key')},
+        ),
+    ]
@@ -1,9 +1,11 @@
 import hashlib
+import math
 import os.path
 from collections import OrderedDict
 from contextlib import contextmanager
 from io import BytesIO
 
+import PIL.Image
 from django.conf import settings
 from django.core import checks
 from django.core.exceptions import ObjectDoesNotExist
@@ -17,12 +19,14 @@ from django.utils.translation import ugettext_lazy as _
 from taggit.managers import TaggableManager
 from unidecode import unidecode
 from willow.image import Image as WillowImage
+from willow.plugins.pillow import PillowImage
 
 from wagtail.admin.utils import get_object_usage
 from wagtail.core import hooks
 from wagtail.core.models import CollectionMember
 from wagtail.images.exceptions import InvalidFilterSpecError
 from wagtail.images.rect import Rect
+from wagtail.images.rendition_cache import cache_rendition, get_cached_rendition
 from wagtail.search import index
 from wagtail.search.queryset import SearchableQuerySetMixin
 
@@ -107,7 +111,19 @@ def get_rendition_upload_to(instance, filename):
 
 
 class ImageQuerySet(SearchableQuerySetMixin, models.QuerySet):
-    pass
+    def prefetch_renditions(self, *filter_specs):
+        """
+        Fetch the existing renditions of all images in the queryset for the given
+        filter specs in a single query, so that ``get_rendition`` (and the ``{% image %}``
+        tag) can use them without querying the database for each image. Renditions that
+        don't exist yet are still generated by ``get_rendition`` when needed.
+        """
+        Rendition = self.model.get_rendition_model()
+        return self.prefetch_related(models.Prefetch(
+            'renditions',
+            queryset=Rendition.objects.filter(filter_spec__in=filter_specs),
+            to_attr='prefetched_renditions',
+        ))
 
 
 class WillowImageWrapper:
@@ -304,44 +320,124 @@ class AbstractImage(CollectionMember, index.Indexed, models.Model, WillowImageWr
         """ Get the Rendition model for this Image model """
         return cls.renditions.rel.related_model
 
-    def _get_rendition(self, renditions, filter, focal_point_key=''):
-        filter_spec = filter.spec
-        spec_hash = filter.get_cache_key(self)
-
+    def _get_rendition(self, renditions, filter, focal_point_key='', allow_placeholder=False):
         try:
             rendition = renditions.get(
-                filter_spec=filter_spec,
+                filter_spec=filter.spec,
                 focal_point_key=focal_point_key,
             )
         except ObjectDoesNotExist:
-            try:
-                # Generate the rendition image
-                generated_image = filter.run(self, BytesIO())
-            except IOError:
-                return _rendition_for_missing_image(renditions.model, self,
-                                                    filter_spec=filter_spec)
+            rendition = self._get_missing_rendition(renditions, filter, focal_point_key, allow_placeholder)
+
+        return rendition
+
+    def _get_missing_rendition(self, renditions, filter, focal_point_key='', allow_placeholder=False):
+        return self._get_missing_renditions(renditions, [(filter, focal_point_key)], allow_placeholder)[0]
 
+    def _get_missing_renditions(self, renditions, filters, allow_placeholder=False):
+        """
+        Generate (or queue, see get_rendition) the renditions for a list of
+        ``(filter, focal_point_key)`` tuples, returning the renditions in the same order
+        """
+        from wagtail.images.rendition_queue import get_placeholder_url, get_rendition_queue
+
+        rendition_queue = get_rendition_queue() if allow_placeholder else None
+        if rendition_queue is None:
+            return self._create_renditions(renditions, filters)
+
+        placeholder_urls = [get_placeholder_url(self, filter.spec) for filter, focal_point_key in filters]
+        if None in placeholder_urls:
+            # There's no URL to show until the renditions are generated, so generate them now
+            return self._create_renditions(renditions, filters)
+
+        # Leave the renditions to be generated in the background
+        placeholder_renditions = []
+        for (filter, focal_point_key), placeholder_url in zip(filters, placeholder_urls):
+            rendition_queue.enqueue(self, filter.spec, focal_point_key)
+            placeholder_renditions.append(
+                self._get_placeholder_rendition(renditions.model, filter, focal_point_key, placeholder_url)
+            )
+
+        return placeholder_renditions
+
+    def _get_placeholder_rendition(self, rendition_model, filter, focal_point_key, placeholder_url):
+        rendition = rendition_model(image=self, filter_spec=filter.spec, focal_point_key=focal_point_key)
+        rendition.placeholder_url = placeholder_url
+        return rendition
+
+    def _create_rendition(self, renditions, filter, focal_point_key=''):
+        return self._create_renditions(renditions, [(filter, focal_point_key)])[0]
+
+    def _create_renditions(self, renditions, filters):
+        try:
+            # Generate the rendition images. The source image is only decoded once
+            generated_images = Filter.run_many(self, [filter for filter, focal_point_key in filters])
+        except IOError:
+            return [
+                _rendition_for_missing_image(renditions.model, self, filter_spec=filter.spec)
+                for filter, focal_point_key in filters
+            ]
+
+        input_filename = os.path.basename(self.file.name)
+
+        created_renditions = []
+        for (filter, focal_point_key), generated_image in zip(filters, generated_images):
             # Generate filename
-            input_filename = os.path.basename(self.file.name)
             output_filename = _generate_output_filename(
-                                input_filename,
-                                generated_image.format_name,
-                                spec_hash)
+                input_filename,
+                generated_image.format_name,
+                filter.get_cache_key(self))
 
             rendition, created = renditions.get_or_create(
-                filter_spec=filter_spec,
+                filter_spec=filter.spec,
                 focal_point_key=focal_point_key,
                 defaults={'file': File(generated_image.f, name=output_filename)}
             )
+            created_renditions.append(rendition)
 
-        return rendition
+        return created_renditions
+
+    def _get_prefetched_rendition(self, filter_spec, focal_point_key):
+        """
+        Return the rendition with the given filter spec and focal point key from the
+        renditions fetched by ``ImageQuerySet.prefetch_renditions``, ``get_renditions`` or
+        ``prefetch_related('renditions')``, or None if it was not fetched
+        """
+        renditions = list(self.__dict__.get('prefetched_renditions', []))
+        if 'renditions' in getattr(self, '_prefetched_objects_cache', {}):
+            renditions.extend(self.renditions.all())
+
+        for rendition in renditions:
+            if rendition.filter_spec == filter_spec and rendition.focal_point_key == focal_point_key:
+                return rendition
 
-    def get_rendition(self, filter):
+    def get_rendition(self, filter, allow_placeholder=False):
+        """
+        Get the rendition of this image for filter (a filter spec string or a Filter object),
+        generating it if it doesn't exist.
+
+        If allow_placeholder is True and the ``WAGTAILIMAGES_RENDITION_QUEUE`` setting is
+        defined, a missing rendition is instead queued to be generated in the background,
+        and an unsaved placeholder rendition with no file (see ``AbstractRendition.url``)
+        is returned.
+
+        If the ``WAGTAILIMAGES_RENDITION_CACHE`` setting is defined, existing renditions
+        are looked up in the rendition cache before the database (see
+        ``wagtail.images.rendition_cache``).
+        """
         if isinstance(filter, str):
             filter = Filter(spec=filter)
 
-        return self._get_rendition(self.renditions, filter,
-                                   self.get_focal_point_key(filter))
+        focal_point_key = self.get_focal_point_key(filter)
+
+        rendition = self._get_prefetched_rendition(filter.spec, focal_point_key)
+        if rendition is None:
+            rendition = get_cached_rendition(self, filter)
+        if rendition is None:
+            rendition = self._get_rendition(self.renditions, filter, focal_point_key, allow_placeholder)
+            cache_rendition(self, filter, rendition)
+
+        return rendition
 
     def get_user_rendition(self, filter):
         if isinstance(filter, str):
@@ -392,6 +488,111 @@ class Image(AbstractImage):
     )
 
 
+def get_renditions(images, filters, allow_placeholder=False):
+    """
+    Get the renditions of every image in ``images`` for every filter in ``filters``
+    (either filter spec strings or Filter objects), all of the same image model.
+
+    The existing renditions are fetched in a single query, and only the missing ones
+    are generated (or, if ``allow_placeholder`` is True, queued as described in
+    ``AbstractImage.get_rendition``). The renditions are also stored on each image, so
+    that subsequent calls to ``get_rendition`` (such as those made by the ``{% image %}``
+    tag) for these filters do not need to query the database.
+
+    Returns a dict mapping each image's ID to a dict of its renditions keyed by filter spec.
+    """
+    images = list(images)
+    filters = [Filter(spec=filter) if isinstance(filter, str) else filter for filter in filters]
+
+    if not images or not filters:
+        return {}
+
+    Rendition = images[0].get_rendition_model()
+    existing_renditions = {
+        (rendition.image_id, rendition.filter_spec, rendition.focal_point_key): rendition
+        for rendition in Rendition.objects.filter(
+            image__in=[image.pk for image in images],
+            filter_spec__in=[filter.spec for filter in filters],
+        )
+    }
+
+    renditions = {}
+    for image in images:
+        prefetched_renditions = image.__dict__.setdefault('prefetched_renditions', [])
+        image_renditions = renditions.setdefault(image.pk, {})
+
+        missing_filters = []
+        for filter in filters:
+            focal_point_key = image.get_focal_point_key(filter)
+
+            rendition = image._get_prefetched_rendition(filter.spec, focal_point_key)
+            if rendition is None:
+                rendition = existing_renditions.get((image.pk, filter.spec, focal_point_key))
+                if rendition is None:
+                    missing_filters.append((filter, focal_point_key))
+                    continue
+
+                rendition.image = image
+                prefetched_renditions.append(rendition)
+
+            image_renditions[filter.spec] = rendition
+
+        # Generate all of the image's missing renditions together, so its file is only
+        # opened and decoded once
+        if missing_filters:
+            missing_renditions = image._get_missing_renditions(
+                image.renditions, missing_filters, allow_placeholder
+            )
+            for (filter, focal_point_key), rendition in zip(missing_filters, missing_renditions):
+                if rendition.pk is not None:
+                    prefetched_renditions.append(rendition)
+
+                image_renditions[filter.spec] = rendition
+
+    return renditions
+
+
+def _open_jpeg_for_filters(image, willow, filters):
+    """
+    Decode a JPEG image file at the smallest size that all of the given filters can
+    produce their output from without loss of quality, using Pillow's draft mode; this
+    shrinks the image by a factor of 2, 4 or 8 as it is decoded, which is much faster
+    (and uses much less memory) than decoding it at full size.
+
+    Returns a PillowImage and the factor it was scaled by, or the original willow image
+    and None if it needs to be decoded at full size.
+    """
+    willow.f.seek(0)
+
+    # This only reads the header of the file
+    pillow_image = PIL.Image.open(willow.f)
+    width, height = pillow_image.size
+
+    # Plan against the dimensions of the image after auto_orient has been applied
+    try:
+        orientation = pillow_image._getexif().get(0x0112, 1)
+    except Exception:
+        # Blanket cover all the ways _getexif can fail in (as Willow does)
+        orientation = 1
+
+    if orientation in (5, 6, 7, 8):
+        oriented_width, oriented_height = height, width
+    else:
+        oriented_width, oriented_height = width, height
+
+    decode_scale = max(
+        filter.get_decode_scale(oriented_width, oriented_height, image)
+        for filter in filters
+    )
+    if decode_scale >= 1:
+        return willow, None
+
+    pillow_image.draft(pillow_image.mode, (math.ceil(width * decode_scale), math.ceil(height * decode_scale)))
+    pillow_image.load()
+
+    return PillowImage(pillow_image), pillow_image.size[0] / width
+
+
 class Filter:
     """
     Represents one or more operations that can be applied to an Image to produce a rendition
@@ -421,52 +622,103 @@ class Filter:
         return operations
 
     def run(self, image, output):
+        return self.run_many(image, [self], [output])[0]
+
+    @classmethod
+    def run_many(cls, image, filters, outputs=None):
+        """
+        Run several filters on an image, writing each result to the corresponding
+        file-like object in ``outputs`` (new BytesIO objects by default).
+
+        The source image is opened, decoded and orientated only once, and the result is
+        shared by all of the filters. Returns the list of output images.
+        """
+        if outputs is None:
+            outputs = [BytesIO() for filter in filters]
+
         with image.get_willow_image() as willow:
             original_format = willow.format_name
 
-            # Fix orientation of image
+            env = {}
+            if original_format == 'jpeg':
+                # Shrink the image as it is decoded, as far as the filters allow
+                willow, decode_scale = _open_jpeg_for_filters(image, willow, filters)
+                if decode_scale is not None:
+                    env['decode-scale'] = decode_scale
+
+            # Fix orientation of image. This also decodes the image.
             willow = willow.auto_orient()
 
-            env = {
-                'original-format': original_format,
-            }
-            for operation in self.operations:
-                willow = operation.run(willow, image, env) or willow
+            return [
+                filter._run(willow, image, original_format, output, env)
+                for filter, output in zip(filters, outputs)
+            ]
+
+    def get_decode_scale(self, width, height, image):
+        """
+        Work out from the operations of this filter, before the image is decoded, the
+        smallest factor that an image of the given size could be scaled down by when it
+        is decoded without reducing the quality of the output; this is the factor
+        that the first operation to change the image's size scales it by. Returns 1 if
+        the image needs to be decoded at full size.
+        """
+        for operation in self.operations:
+            if not operation.changes_size:
+                continue
 
-            # Find the output format to use
-            if 'output-format' in env:
-                # Developer specified an output format
-                output_format = env['output-format']
+            scale = operation.get_resize_scale(width, height, image)
+            if scale is None:
+                return 1
+
+            return min(scale, 1)
+
+        return 1
+
+    def _run(self, willow, image, original_format, output, env=None):
+        env = dict(env or {})
+        env['original-format'] = original_format
+
+        for operation in self.operations:
+            willow = operation.run(willow, image, env) or willow
+
+            if operation.changes_size:
+                # The image is no longer the one that was decoded
+                env.pop('decode-scale', None)
+
+        # Find the output format to use
+        if 'output-format' in env:
+            # Developer specified an output format
+            output_format = env['output-format']
+        else:
+            # Default to outputting in original format
+            output_format = original_format
+
+            # Convert BMP files to PNG
+            if original_format == 'bmp':
+                output_format = 'png'
+
+            # Convert unanimated GIFs to PNG as well
+            if original_format == 'gif' and not willow.has_animation():
+                output_format = 'png'
+
+        if output_format == 'jpeg':
+            # Allow changing of JPEG compression quality
+            if 'jpeg-quality' in env:
+                quality = env['jpeg-quality']
+            elif hasattr(settings, 'WAGTAILIMAGES_JPEG_QUALITY'):
+                quality = settings.WAGTAILIMAGES_JPEG_QUALITY
             else:
-                # Default to outputting in original format
-                output_format = original_format
-
-                # Convert BMP files to PNG
-                if original_format == 'bmp':
-                    output_format = 'png'
-
-                # Convert unanimated GIFs to PNG as well
-                if original_format == 'gif' and not willow.has_animation():
-                    output_format = 'png'
-
-            if output_format == 'jpeg':
-                # Allow changing of JPEG compression quality
-                if 'jpeg-quality' in env:
-                    quality = env['jpeg-quality']
-                elif hasattr(settings, 'WAGTAILIMAGES_JPEG_QUALITY'):
-                    quality = settings.WAGTAILIMAGES_JPEG_QUALITY
-                else:
-                    quality = 85
+                quality = 85
 
-                # If the image has an alpha channel, give it a white background
-                if willow.has_alpha():
-                    willow = willow.set_background_color_rgb((255, 255, 255))
+            # If the image has an alpha channel, give it a white background
+            if willow.has_alpha():
+                willow = willow.set_background_color_rgb((255, 255, 255))
 
-                return willow.save_as_jpeg(output, quality=quality, progressive=True, optimize=True)
-            elif output_format == 'png':
-                return willow.save_as_png(output)
-            elif output_format == 'gif':
-                return willow.save_as_gif(output)
+            return willow.save_as_jpeg(output, quality=quality, progressive=True, optimize=True)
+        elif output_format == 'png':
+            return willow.save_as_png(output)
+        elif output_format == 'gif':
+            return willow.save_as_gif(output)
 
     def get_cache_key(self, image):
         return (
@@ -512,8 +764,15 @@ class AbstractRendition(models.Model):
     focal_point_key = models.CharField(max_length=16, blank=True, default='', editable=False)
     alt_text = models.CharField(max_length=255, null=True, blank=True)
 
+    # Set on the unsaved renditions that stand in for renditions being generated in
+    # the background (see wagtail.images.rendition_queue)
+    placeholder_url = None
+
     @property
     def url(self):
+        if self.placeholder_url is not None:
+            return self.placeholder_url
+
         return self.file.url
 
     @property
@@ -595,7 +854,10 @@ class UserRendition(AbstractRendition, WillowImageWrapper):
             ('image', 'filter_spec', 'focal_point_key'),
         )
 
-    def get_rendition(self, filter_spec):
+    def get_rendition(self, filter_spec, allow_placeholder=False):
+        # allow_placeholder is accepted for compatibility with AbstractImage.get_rendition;
+        # renditions of user renditions are always generated immediately
+
         # we need to construct a new filter combining what we've been passed
         # and the filter used to get THIS rendition
         if not hasattr(filter_spec, 'run'):
@@ -644,3 +906,19 @@ class UserRendition(AbstractRendition, WillowImageWrapper):
 
     def has_focal_point(self):
         return False
+
+
+class PendingRendition(models.Model):
+    """
+    A rendition waiting to be generated by the ``process_rendition_queue`` management command
+    (see wagtail.images.rendition_queue.DatabaseRenditionQueue)
+    """
+    image_id = models.IntegerField()
+    filter_spec = models.CharField(max_length=255)
+    focal_point_key = models.CharField(max_length=16, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = (
+            ('image_id', 'filter_spec', 'focal_point_key'),
+        )
@@ -102,6 +102,18 @@ class Rect:
 
         return clone
 
+    def scale(self, factor):
+        """
+        Returns a new rect with all attributes multiplied by factor. This converts
+        the rect to the coordinates of the image resized by that factor.
+        """
+        return type(self)(
+            self.left * factor,
+            self.top * factor,
+            self.right * factor,
+            self.bottom * factor,
+        )
+
     def move_to_clamp(self, other):
         """
         Moves this rect so it is completely covered by the rect in "other" and
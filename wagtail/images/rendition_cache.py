@@ -0,0 +1,113 @@
+"""
+A cache of rendition lookups, held in front of the renditions table.
+
+When the ``WAGTAILIMAGES_RENDITION_CACHE`` setting names one of the caches defined in
+``CACHES``, ``AbstractImage.get_rendition`` looks for the rendition in that cache before
+querying the database, so that rendering an ``{% image %}`` tag for a rendition that
+already exists doesn't cost a query. For example::
+
+    CACHES = {
+        'default': {...},
+        'renditions': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': '127.0.0.1:11211',
+        },
+    }
+
+    WAGTAILIMAGES_RENDITION_CACHE = 'renditions'
+
+The cache holds one entry per image, mapping the cache key of each filter for the image
+(see ``Filter.get_cache_key``, which changes along with the image's focal point) to the
+field values of the rendition. A missing entry falls back to the database as before. The
+signal handlers in ``wagtail.images.signal_handlers`` delete the entry for an image
+whenever the image, or any of its renditions, is saved or deleted.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_rendition_cache():
+    """
+    Return the cache named by the ``WAGTAILIMAGES_RENDITION_CACHE`` setting, or None
+    if rendition lookups should not be cached
+    """
+    alias = getattr(settings, 'WAGTAILIMAGES_RENDITION_CACHE', None)
+    if not alias:
+        return None
+
+    return caches[alias]
+
+
+def get_cache_key(image_model, image_id):
+    return 'wagtail-renditions-%s-%s' % (image_model._meta.label_lower, image_id)
+
+
+def get_cached_rendition(image, filter):
+    """
+    Return the rendition of image for filter from the rendition cache, or None if it is
+    not cached (or the cache is not enabled)
+    """
+    cache = get_rendition_cache()
+    if cache is None or image.pk is None:
+        return None
+
+    renditions = cache.get(get_cache_key(type(image), image.pk))
+    if not renditions:
+        return None
+
+    field_values = renditions.get(filter.get_cache_key(image))
+    if field_values is None:
+        return None
+
+    rendition_model = image.get_rendition_model()
+    rendition = rendition_model.from_db(
+        image._state.db,
+        [field.attname for field in rendition_model._meta.concrete_fields],
+        field_values
+    )
+    rendition.image = image
+    return rendition
+
+
+def cache_rendition(image, filter, rendition):
+    """
+    Add rendition (a saved rendition of image for filter) to the rendition cache
+    """
+    cache = get_rendition_cache()
+    if cache is None or image.pk is None or rendition.pk is None:
+        return
+
+    cache_key = get_cache_key(type(image), image.pk)
+
+    # Keep raw field values rather than the rendition itself, so that cache entries
+    # don't hold a copy of the image
+    field_values = [
+        field.get_prep_value(field.value_from_object(rendition))
+        for field in rendition._meta.concrete_fields
+    ]
+
+    # Another process may add a rendition of the same image in the meantime, in which
+    # case one of the two is lost from the cache; that only costs a later database lookup
+    renditions = cache.get(cache_key) or {}
+    renditions[filter.get_cache_key(image)] = field_values
+    cache.set(cache_key, renditions)
+
+
+def invalidate_image(image_model, image_id):
+    """
+    Remove the cached renditions of an image - again once the current transaction commits,
+    so that a process looking up renditions in the meantime can't cache stale data.
+    """
+    cache = get_rendition_cache()
+    if cache is None or image_id is None:
+        return
+
+    cache_key = get_cache_key(image_model, image_id)
+
+    def delete_entry():
+        cache.delete(cache_key)
+
+    delete_entry()
+    transaction.on_commit(delete_entry)
@@ -0,0 +1,214 @@
+"""
+Background generation of image renditions.
+
+When the ``WAGTAILIMAGES_RENDITION_QUEUE`` setting is defined, the ``{% image %}`` tag
+(and the Jinja2 ``image()`` function) no longer generate missing renditions while
+rendering the page. Instead, the rendition is added to a queue to be generated in the
+background, and an unsaved placeholder rendition is returned in its place. The URL of
+the placeholder points to the ``wagtailimages_serve`` view (which generates the rendition
+on demand). If that view isn't installed, renditions are generated while rendering the
+page as before - unless the ``PLACEHOLDER_ORIGINAL_IMAGE`` option is True, in which case
+the placeholder points to the original image file. That file may be much larger than the
+rendition, so this is opt-in.
+
+For example::
+
+    WAGTAILIMAGES_RENDITION_QUEUE = {
+        'BACKEND': 'wagtail.images.rendition_queue.DatabaseRenditionQueue',
+    }
+
+The available backends are ``ThreadPoolRenditionQueue``, which generates renditions in
+a pool of threads within the web server process (the number of threads is set by the
+``WORKERS`` option, default 2), and ``DatabaseRenditionQueue``, which records the
+renditions to generate in the database, to be generated by the ``process_rendition_queue``
+management command.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.urls import NoReverseMatch
+from django.utils.module_loading import import_string
+
+from wagtail.images import get_image_model
+from wagtail.images.exceptions import InvalidFilterSpecError
+
+logger = logging.getLogger('wagtail.images')
+
+
+_rendition_queues = {}
+
+
+def get_rendition_queue():
+    """
+    Return the rendition queue configured by the ``WAGTAILIMAGES_RENDITION_QUEUE``
+    setting, or None if renditions should be generated immediately
+    """
+    params = getattr(settings, 'WAGTAILIMAGES_RENDITION_QUEUE', None)
+    if not params:
+        return None
+
+    # Queues hold state (such as a thread pool), so only create one of each
+    backend = params['BACKEND']
+    if backend not in _rendition_queues:
+        _rendition_queues[backend] = import_string(backend)(params)
+
+    return _rendition_queues[backend]
+
+
+def get_placeholder_url(image, filter_spec):
+    """
+    Return the URL to use for a rendition while it is generated in the background, or None
+    if there is no URL to use (so the rendition should be generated immediately)
+    """
+    # Avoid a circular import; the view module builds on the image model
+    from wagtail.images.views.serve import generate_image_url
+
+    try:
+        return generate_image_url(image, filter_spec)
+    except NoReverseMatch:
+        params = getattr(settings, 'WAGTAILIMAGES_RENDITION_QUEUE', None) or {}
+        if params.get('PLACEHOLDER_ORIGINAL_IMAGE', False):
+            return image.file.url
+
+        return None
+
+
+def generate_rendition(image_id, filter_spec):
+    """
+    Generate the rendition of the image with the given ID for filter_spec, unless it
+    already exists. Returns the rendition, or None if the image no longer exists.
+    """
+    Image = get_image_model()
+
+    try:
+        image = Image.objects.get(id=image_id)
+    except Image.DoesNotExist:
+        return None
+
+    try:
+        return image.get_rendition(filter_spec)
+    except InvalidFilterSpecError:
+        logger.exception("Invalid filter spec '%s' in rendition queue", filter_spec)
+
+
+class BaseRenditionQueue:
+    def __init__(self, params):
+        self.params = params
+
+    def enqueue(self, image, filter_spec, focal_point_key):
+        """
+        Arrange for the rendition of image for filter_spec to be generated. The rendition
+        is identified by image, filter_spec and focal_point_key, matching the unique_together
+        constraint of the rendition model; a rendition that is already queued is only
+        queued once.
+        """
+        raise NotImplementedError
+
+
+class ThreadPoolRenditionQueue(BaseRenditionQueue):
+    """
+    Generates renditions in a pool of threads within the current process
+    """
+    def __init__(self, params):
+        super().__init__(params)
+        self.executor = ThreadPoolExecutor(max_workers=params.get('WORKERS', 2))
+        self.queued = set()
+        self.lock = threading.Lock()
+
+    def enqueue(self, image, filter_spec, focal_point_key):
+        key = (image.id, filter_spec, focal_point_key)
+        with self.lock:
+            if key in self.queued:
+                return
+
+        # Worker threads have their own database connections, so wait until anything
+        # done by this one (such as adding the image) has been committed. The key is only
+        # marked as queued then, so that it can be queued again if the transaction is
+        # rolled back
+        transaction.on_commit(lambda: self.submit(key))
+
+    def submit(self, key):
+        with self.lock:
+            if key in self.queued:
+                return
+
+            self.queued.add(key)
+
+        self.executor.submit(self.run, key)
+
+    def run(self, key):
+        image_id, filter_spec, focal_point_key = key
+
+        try:
+            generate_rendition(image_id, filter_spec)
+        except Exception:
+            logger.exception("Failed to generate rendition '%s' of image %d", filter_spec, image_id)
+        finally:
+            with self.lock:
+                self.queued.discard(key)
+
+            connection.close()
+
+
+class DatabaseRenditionQueue(BaseRenditionQueue):
+    """
+    Records renditions to generate in the PendingRendition table, to be generated by the
+    ``process_rendition_queue`` management command
+    """
+    def enqueue(self, image, filter_spec, focal_point_key):
+        from wagtail.images.models import PendingRendition
+
+        # If another request has queued this rendition, the unique_together constraint
+        # makes this return the existing record
+        PendingRendition.objects.get_or_create(
+            image_id=image.id,
+            filter_spec=filter_spec,
+            focal_point_key=focal_point_key,
+        )
+
+    def process(self, batch_size=100):
+        """
+        Generate all queued renditions, returning the number generated. A queue record is
+        only deleted once its rendition has been generated; renditions that fail to generate
+        are logged and left in the queue, to be retried by the next run. Several processes
+        can run this at once; where the database supports it, each record is locked while
+        its rendition is generated, so other processes skip it.
+        """
+        from wagtail.images.models import PendingRendition
+
+        skip_locked = connection.features.has_select_for_update_skip_locked
+
+        count = 0
+        failed_ids = set()
+        while True:
+            pending_renditions = list(
+                PendingRendition.objects.exclude(id__in=failed_ids).order_by('created_at', 'id')[:batch_size]
+            )
+            if not pending_renditions:
+                return count
+
+            for pending_rendition in pending_renditions:
+                try:
+                    with transaction.atomic():
+                        queryset = PendingRendition.objects.filter(id=pending_rendition.id)
+                        if skip_locked:
+                            queryset = queryset.select_for_update(skip_locked=True)
+
+                        if queryset.first() is None:
+                            # Another process has generated it, or is generating it
+                            continue
+
+                        if generate_rendition(pending_rendition.image_id, pending_rendition.filter_spec) is not None:
+                            count += 1
+
+                        PendingRendition.objects.filter(id=pending_rendition.id).delete()
+                except Exception:
+                    logger.exception(
+                        "Failed to generate rendition '%s' of image %d",
+                        pending_rendition.filter_spec, pending_rendition.image_id
+                    )
+                    failed_ids.add(pending_rendition.id)
@@ -25,6 +25,38 @@ def image_embedtype_handler(attrs):
     return image_format.image_to_html(image, attrs.get('alt', ''))
 
 
+def bulk_image_embedtype_handler(attrs_list):
+    """
+    Rewrite a list of image embeds at once, fetching the images, and their existing
+    renditions for the requested formats, in two queries
+    """
+    Image = get_image_model()
+    ids = [str(attrs.get('id')) for attrs in attrs_list if str(attrs.get('id')).isdigit()]
+
+    filter_specs = set()
+    for attrs in attrs_list:
+        try:
+            filter_specs.add(get_image_format(attrs['format']).filter_spec)
+        except KeyError:
+            pass
+
+    images = {
+        str(image.id): image
+        for image in Image.objects.filter(id__in=ids).prefetch_renditions(*filter_specs)
+    }
+
+    html = []
+    for attrs in attrs_list:
+        image = images.get(str(attrs.get('id')))
+        if image is None:
+            html.append("<img>")
+        else:
+            image_format = get_image_format(attrs['format'])
+            html.append(image_format.image_to_html(image, attrs.get('alt', '')))
+
+    return html
+
+
 # hallo.js / editor-html conversion
 
 class ImageEmbedHandler:
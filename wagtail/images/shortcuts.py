@@ -1,16 +1,17 @@
 from wagtail.images.models import SourceImageIOError
 
 
-def get_rendition_or_not_found(image, specs):
+def get_rendition_or_not_found(image, specs, allow_placeholder=False):
     """
     Tries to get / create the rendition for the image or renders a not-found image if it does not exist.
 
     :param image: AbstractImage
     :param specs: str or Filter
+    :param allow_placeholder: bool, passed on to AbstractImage.get_rendition
     :return: Rendition
     """
     try:
-        return image.get_rendition(specs)
+        return image.get_rendition(specs, allow_placeholder=allow_placeholder)
     except SourceImageIOError:
         # Image file is (probably) missing from /media/original_images - generate a dummy
         # rendition so that we just output a broken image, rather than crashing out completely
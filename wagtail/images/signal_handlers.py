@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.db import transaction
-from django.db.models.signals import post_delete, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 
+from wagtail.core.rich_text import render_cache
 from wagtail.images import get_image_model
+from wagtail.images.rendition_cache import invalidate_image
 
 
 def post_delete_file_cleanup(instance, **kwargs):
@@ -18,6 +20,24 @@ def pre_save_image_feature_detection(instance, **kwargs):
             instance.set_focal_point(instance.get_suggested_focal_point())
 
 
+def invalidate_rendition_cache_for_image(sender, instance, **kwargs):
+    # Saving an image may change its file or focal point
+    invalidate_image(sender, instance.pk)
+
+
+def invalidate_rendition_cache_for_rendition(sender, instance, **kwargs):
+    invalidate_image(sender._meta.get_field('image').related_model, instance.image_id)
+
+
+def invalidate_rich_text_for_image(instance, **kwargs):
+    render_cache.invalidate_object('image', instance.pk)
+
+
+def invalidate_rich_text_for_rendition(instance, **kwargs):
+    # Embeds of the image may refer to the deleted rendition
+    render_cache.invalidate_object('image', instance.image_id)
+
+
 def register_signal_handlers():
     Image = get_image_model()
     Rendition = Image.get_rendition_model()
@@ -25,3 +45,12 @@ def register_signal_handlers():
     pre_save.connect(pre_save_image_feature_detection, sender=Image)
     post_delete.connect(post_delete_file_cleanup, sender=Image)
     post_delete.connect(post_delete_file_cleanup, sender=Rendition)
+
+    post_save.connect(invalidate_rendition_cache_for_image, sender=Image)
+    post_delete.connect(invalidate_rendition_cache_for_image, sender=Image)
+    post_save.connect(invalidate_rendition_cache_for_rendition, sender=Rendition)
+    post_delete.connect(invalidate_rendition_cache_for_rendition, sender=Rendition)
+
+    post_save.connect(invalidate_rich_text_for_image, sender=Image)
+    post_delete.connect(invalidate_rich_text_for_image, sender=Image)
+    post_delete.connect(invalidate_rich_text_for_rendition, sender=Rendition)
@@ -95,7 +95,7 @@ class ImageNode(template.Node):
         if not image:
             return ''
 
-        rendition = get_rendition_or_not_found(image, self.filter)
+        rendition = get_rendition_or_not_found(image, self.filter, allow_placeholder=True)
 
         if self.output_var_name:
             # return the rendition object in the given variable
@@ -860,6 +860,12 @@ class TestMultipleImageUploader(TestCase, WagtailTestUtils):
         self.assertEqual(response_json['image_id'], response.context['image'].id)
         self.assertTrue(response_json['success'])
 
+        # The renditions shown in the admin have been generated
+        self.assertEqual(
+            set(response.context['image'].renditions.values_list('filter_spec', flat=True)),
+            {'max-165x165', 'max-800x600'}
+        )
+
     def test_add_post_noajax(self):
         """
         This tests that only AJAX requests are allowed to POST to the add view
@@ -1,12 +1,17 @@
 from io import BytesIO
 
+import PIL.Image
+from django.core.files.images import ImageFile
 from django.test import TestCase, override_settings
 from mock import Mock, patch
+from PIL.JpegImagePlugin import JpegImageFile
+from willow.image import Image as WillowImage
 
 from wagtail.core import hooks
 from wagtail.images import image_operations
 from wagtail.images.exceptions import InvalidFilterSpecError
 from wagtail.images.models import Filter, Image
+from wagtail.images.rect import Rect
 from wagtail.images.tests.utils import get_test_image_file, get_test_image_file_jpeg
 
 
@@ -414,6 +419,114 @@ class TestFilter(TestCase):
         self.assertEqual(run_mock.call_count, 2)
 
 
+class TestFilterRunMany(TestCase):
+    def setUp(self):
+        self.image = Image.objects.create(
+            title="Test image",
+            file=get_test_image_file(),
+        )
+
+    def test_run_many(self):
+        filters = [Filter(spec='width-400'), Filter(spec='fill-100x100|format-jpeg')]
+
+        outputs = Filter.run_many(self.image, filters)
+
+        self.assertEqual(len(outputs), 2)
+        self.assertEqual(outputs[0].get_size(), (400, 300))
+        self.assertEqual(outputs[0].format_name, 'png')
+        self.assertEqual(outputs[1].get_size(), (100, 100))
+        self.assertEqual(outputs[1].format_name, 'jpeg')
+
+    def test_run_many_opens_image_once(self):
+        filters = [Filter(spec='width-400'), Filter(spec='max-100x100'), Filter(spec='original')]
+
+        with patch('wagtail.images.models.WillowImage.open', wraps=WillowImage.open) as open_image:
+            outputs = Filter.run_many(self.image, filters)
+
+        self.assertEqual(open_image.call_count, 1)
+        self.assertEqual([output.get_size() for output in outputs], [(400, 300), (100, 75), (640, 480)])
+
+    def test_run_many_with_outputs(self):
+        f = BytesIO()
+        output, = Filter.run_many(self.image, [Filter(spec='width-400')], [f])
+
+        self.assertIs(output.f, f)
+        self.assertTrue(f.getvalue())
+
+
+class TestDecodeScale(TestCase):
+    def setUp(self):
+        self.image = Image.objects.create(
+            title="Test image",
+            file=get_test_image_file_jpeg(size=(1600, 1200)),
+        )
+
+    def get_decode_scale(self, spec):
+        return Filter(spec=spec).get_decode_scale(1600, 1200, self.image)
+
+    def test_get_decode_scale(self):
+        self.assertEqual(self.get_decode_scale('width-400'), 0.25)
+        self.assertEqual(self.get_decode_scale('height-300'), 0.25)
+        self.assertEqual(self.get_decode_scale('max-400x400'), 0.25)
+        self.assertEqual(self.get_decode_scale('min-400x400'), 1 / 3)
+        self.assertEqual(self.get_decode_scale('fill-400x400'), 1 / 3)
+        self.assertEqual(self.get_decode_scale('jpegquality-40|bgcolor-fff|width-400|height-50'), 0.25)
+
+    def test_get_decode_scale_without_reduction(self):
+        self.assertEqual(self.get_decode_scale('original'), 1)
+        self.assertEqual(self.get_decode_scale('width-3200'), 1)
+        self.assertEqual(self.get_decode_scale('crop-0,0:100,100'), 1)
+
+    def test_get_decode_scale_for_zoomed_fill(self):
+        self.assertEqual(self.get_decode_scale('fill-400x400-c50'), 1 / 3)
+
+        self.image.set_focal_point(Rect(700, 500, 900, 700))
+        self.assertEqual(self.get_decode_scale('fill-400x400-c50'), 1)
+
+    def test_jpeg_is_decoded_in_draft_mode(self):
+        with patch('PIL.JpegImagePlugin.JpegImageFile.draft', autospec=True, side_effect=JpegImageFile.draft) as draft:
+            out = Filter(spec='width-400').run(self.image, BytesIO())
+
+        self.assertEqual(draft.call_args[0][2], (400, 300))
+        self.assertEqual(out.get_size(), (400, 300))
+
+    def test_jpeg_is_decoded_for_largest_output(self):
+        with patch('PIL.JpegImagePlugin.JpegImageFile.draft', autospec=True, side_effect=JpegImageFile.draft) as draft:
+            outputs = Filter.run_many(self.image, [Filter(spec='width-200'), Filter(spec='width-800')])
+
+        self.assertEqual(draft.call_args[0][2], (800, 600))
+        self.assertEqual([output.get_size() for output in outputs], [(200, 150), (800, 600)])
+
+    def test_jpeg_not_decoded_in_draft_mode_for_original(self):
+        with patch('PIL.JpegImagePlugin.JpegImageFile.draft') as draft:
+            out = Filter(spec='original').run(self.image, BytesIO())
+
+        self.assertFalse(draft.called)
+        self.assertEqual(out.get_size(), (1600, 1200))
+
+    def test_fill_with_focal_point(self):
+        # Left half white, right half black
+        f = BytesIO()
+        pillow_image = PIL.Image.new('RGB', (1600, 1200), 'white')
+        pillow_image.paste((0, 0, 0), (800, 0, 1600, 1200))
+        pillow_image.save(f, 'JPEG')
+        self.image.file.save('test.jpg', ImageFile(f))
+        self.image.set_focal_point(Rect(1300, 550, 1500, 650))
+
+        def get_edge(out):
+            # Find where the black half starts in the output
+            pixels = PIL.Image.open(out.f)
+            return next(x for x in range(pixels.size[0]) if pixels.getpixel((x, 50))[0] < 128)
+
+        out = Filter(spec='fill-100x100').run(self.image, BytesIO())
+
+        with patch.object(Filter, 'get_decode_scale', return_value=1):
+            full_size_out = Filter(spec='fill-100x100').run(self.image, BytesIO())
+
+        self.assertEqual(out.get_size(), (100, 100))
+        self.assertAlmostEqual(get_edge(out), get_edge(full_size_out), delta=1)
+
+
 @hooks.register('register_image_operations')
 def register_image_operations():
     return [
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core import management
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from wagtail.core.models import Collection
+from wagtail.images.models import Rendition
+
+from .utils import Image, get_test_image_file
+
+
+class TestGenerateRenditionsCommand(TestCase):
+    def setUp(self):
+        root_collection = Collection.get_first_root_node()
+        self.collection = root_collection.add_child(name="Evil plans")
+
+        self.image = Image.objects.create(
+            title="Test image",
+            file=get_test_image_file(),
+        )
+        self.image_in_collection = Image.objects.create(
+            title="Test image in collection",
+            file=get_test_image_file(),
+            collection=self.collection,
+        )
+
+    def run_command(self, *args, **options):
+        output = StringIO()
+        management.call_command('wagtail_generate_renditions', *args, stdout=output, **options)
+        output.seek(0)
+        return output.read()
+
+    def test_generate_renditions(self):
+        output = self.run_command('width-400', 'fill-100x100')
+
+        self.assertIn("Generated 4 renditions", output)
+        for image in [self.image, self.image_in_collection]:
+            self.assertEqual(
+                set(Rendition.objects.filter(image=image).values_list('filter_spec', flat=True)),
+                {'width-400', 'fill-100x100'}
+            )
+
+    def test_generate_renditions_for_collection(self):
+        self.run_command('width-400', collection_id=self.collection.id)
+
+        self.assertFalse(Rendition.objects.filter(image=self.image).exists())
+        self.assertTrue(Rendition.objects.filter(image=self.image_in_collection, filter_spec='width-400').exists())
+
+    def test_generate_renditions_in_chunks(self):
+        output = self.run_command('width-400', chunk_size=1)
+
+        self.assertIn("Generated 1 renditions", output)
+        self.assertIn("Generated 2 renditions", output)
+        self.assertEqual(Rendition.objects.count(), 2)
+
+    def test_existing_renditions_are_kept(self):
+        rendition = self.image.get_rendition('width-400')
+
+        self.run_command('width-400')
+
+        self.assertEqual(Rendition.objects.get(image=self.image), rendition)
+
+    def test_invalid_filter_spec(self):
+        with self.assertRaises(CommandError):
+            self.run_command('bogus-400')
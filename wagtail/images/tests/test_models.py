@@ -2,6 +2,7 @@ import unittest
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
+from django.core.cache import caches
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.utils import IntegrityError
 from django.test import TestCase
@@ -10,8 +11,9 @@ from django.urls import reverse
 from willow.image import Image as WillowImage
 
 from wagtail.core.models import Collection, GroupCollectionPermission, Page
-from wagtail.images.models import Rendition, SourceImageIOError
+from wagtail.images.models import Filter, Rendition, SourceImageIOError, get_renditions
 from wagtail.images.rect import Rect
+from wagtail.images.rendition_cache import get_cache_key
 from wagtail.tests.testapp.models import EventPage, EventPageCarouselItem
 from wagtail.tests.utils import WagtailTestUtils
 
@@ -243,6 +245,148 @@ class TestRenditions(TestCase):
         self.assertEqual(rendition.alt, "Test image")
 
 
+class TestBulkRenditions(TestCase):
+    def setUp(self):
+        self.images = [
+            Image.objects.create(
+                title="Test image %d" % i,
+                file=get_test_image_file(),
+            )
+            for i in range(3)
+        ]
+
+        # One of the renditions already exists
+        self.existing_rendition = self.images[0].get_rendition('width-400')
+
+    def test_prefetch_renditions(self):
+        for image in self.images:
+            image.get_rendition('width-400')
+            image.get_rendition('max-100x100')
+
+        with self.assertNumQueries(2):
+            # One query for the images and one for their renditions
+            images = list(Image.objects.filter(
+                pk__in=[image.pk for image in self.images]
+            ).prefetch_renditions('width-400', 'max-100x100'))
+
+        with self.assertNumQueries(0):
+            for image in images:
+                rendition = image.get_rendition('width-400')
+                self.assertEqual(rendition.width, 400)
+                self.assertEqual(rendition.image.title, image.title)
+                self.assertEqual(image.get_rendition('max-100x100').width, 100)
+
+    def test_prefetch_renditions_with_missing_rendition(self):
+        image = Image.objects.filter(pk=self.images[1].pk).prefetch_renditions('width-400').get()
+
+        rendition = image.get_rendition('width-400')
+        self.assertEqual(rendition.width, 400)
+        self.assertEqual(Rendition.objects.filter(image=image, filter_spec='width-400').count(), 1)
+
+    def test_get_rendition_uses_prefetch_related(self):
+        image = Image.objects.filter(pk=self.images[0].pk).prefetch_related('renditions').get()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(image.get_rendition('width-400'), self.existing_rendition)
+
+    def test_get_renditions(self):
+        renditions = get_renditions(self.images, ['width-400', Filter(spec='max-100x100')])
+
+        self.assertEqual(set(renditions.keys()), {image.pk for image in self.images})
+        for image in self.images:
+            self.assertEqual(renditions[image.pk]['width-400'].width, 400)
+            self.assertEqual(renditions[image.pk]['max-100x100'].width, 100)
+
+        self.assertEqual(renditions[self.images[0].pk]['width-400'], self.existing_rendition)
+        self.assertEqual(Rendition.objects.filter(image__in=self.images).count(), 6)
+
+        # The renditions are stored on the images
+        with self.assertNumQueries(0):
+            for image in self.images:
+                self.assertEqual(image.get_rendition('width-400'), renditions[image.pk]['width-400'])
+
+    def test_get_renditions_only_fetches_once(self):
+        get_renditions(self.images, ['width-400'])
+
+        images = list(Image.objects.filter(pk__in=[image.pk for image in self.images]))
+        with self.assertNumQueries(1):
+            renditions = get_renditions(images, ['width-400'])
+
+        for image in images:
+            self.assertEqual(renditions[image.pk]['width-400'].width, 400)
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        'renditions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    },
+    WAGTAILIMAGES_RENDITION_CACHE='renditions',
+)
+class TestRenditionCache(TestCase):
+    def setUp(self):
+        # The cache is held in process memory, so it isn't rolled back between tests
+        caches['renditions'].clear()
+
+        self.image = Image.objects.create(
+            title="Test image",
+            file=get_test_image_file(),
+        )
+        self.rendition = self.image.get_rendition('width-400')
+
+    def test_get_rendition_uses_cache(self):
+        image = Image.objects.get(pk=self.image.pk)
+
+        with self.assertNumQueries(0):
+            rendition = image.get_rendition('width-400')
+
+        self.assertEqual(rendition, self.rendition)
+        self.assertEqual(rendition.url, self.rendition.url)
+        self.assertEqual(rendition.width, 400)
+        self.assertEqual(rendition.height, self.rendition.height)
+        self.assertEqual(rendition.image, image)
+
+    def test_get_rendition_falls_back_to_database(self):
+        caches['renditions'].clear()
+        image = Image.objects.get(pk=self.image.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(image.get_rendition('width-400'), self.rendition)
+
+        # The rendition is now cached again
+        with self.assertNumQueries(0):
+            self.assertEqual(image.get_rendition('width-400'), self.rendition)
+
+    def test_focal_point_change(self):
+        self.image.get_rendition('fill-100x100')
+
+        self.image.set_focal_point(Rect(100, 100, 200, 200))
+        self.image.save()
+
+        rendition = self.image.get_rendition('fill-100x100')
+        self.assertNotEqual(rendition.focal_point_key, '')
+        self.assertEqual(rendition.focal_point_key, self.image.get_focal_point_key(Filter('fill-100x100')))
+
+    def test_rendition_delete(self):
+        self.rendition.delete()
+
+        rendition = self.image.get_rendition('width-400')
+        self.assertNotEqual(rendition.pk, self.rendition.pk)
+        self.assertTrue(Rendition.objects.filter(pk=rendition.pk).exists())
+
+    def test_image_save(self):
+        self.image.title = "Renamed image"
+        self.image.save()
+
+        self.assertIsNone(caches['renditions'].get(get_cache_key(Image, self.image.pk)))
+
+    def test_image_delete(self):
+        image_id = self.image.pk
+        self.image.delete()
+
+        self.assertIsNone(caches['renditions'].get(get_cache_key(Image, image_id)))
+
+
 class TestUsageCount(TestCase):
     fixtures = ['test.json']
 
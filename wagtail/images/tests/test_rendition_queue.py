@@ -0,0 +1,173 @@
+from io import StringIO
+
+import mock
+from django import template
+from django.core import management
+from django.test import TestCase, override_settings
+from django.urls import NoReverseMatch
+
+from wagtail.images.models import PendingRendition, Rendition
+from wagtail.images.rendition_queue import ThreadPoolRenditionQueue, get_rendition_queue
+from wagtail.images.views.serve import generate_signature
+
+from .utils import Image, get_test_image_file
+
+
+DATABASE_RENDITION_QUEUE = {
+    'BACKEND': 'wagtail.images.rendition_queue.DatabaseRenditionQueue',
+}
+
+
+class TestRenditionQueue(TestCase):
+    def setUp(self):
+        self.image = Image.objects.create(
+            title="Test image",
+            file=get_test_image_file(),
+        )
+
+    def render_image_tag(self, filter_spec):
+        temp = template.Template('{% load wagtailimages_tags %}{% image image_obj ' + filter_spec + ' %}')
+        return temp.render(template.Context({'image_obj': self.image}))
+
+    def test_no_queue_by_default(self):
+        self.assertIsNone(get_rendition_queue())
+
+        rendition = self.image.get_rendition('width-400', allow_placeholder=True)
+
+        self.assertIsNotNone(rendition.pk)
+        self.assertEqual(rendition.width, 400)
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_get_rendition_with_placeholder(self):
+        rendition = self.image.get_rendition('width-400', allow_placeholder=True)
+
+        # An unsaved rendition pointing at the serve view is returned
+        self.assertIsNone(rendition.pk)
+        signature = generate_signature(self.image.id, 'width-400')
+        self.assertEqual(
+            rendition.url,
+            '/images/%s/%d/width-400/%s' % (signature, self.image.id, self.image.filename)
+        )
+
+        self.assertFalse(Rendition.objects.filter(image=self.image).exists())
+        self.assertTrue(PendingRendition.objects.filter(image_id=self.image.id, filter_spec='width-400').exists())
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_get_rendition_without_serve_view(self):
+        with mock.patch('wagtail.images.views.serve.generate_image_url', side_effect=NoReverseMatch):
+            rendition = self.image.get_rendition('width-400', allow_placeholder=True)
+
+        # Without a URL to show in the meantime, the rendition is generated immediately
+        self.assertIsNotNone(rendition.pk)
+        self.assertFalse(PendingRendition.objects.exists())
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=dict(DATABASE_RENDITION_QUEUE, PLACEHOLDER_ORIGINAL_IMAGE=True))
+    def test_get_rendition_with_original_image_placeholder(self):
+        with mock.patch('wagtail.images.views.serve.generate_image_url', side_effect=NoReverseMatch):
+            rendition = self.image.get_rendition('width-400', allow_placeholder=True)
+
+        self.assertIsNone(rendition.pk)
+        self.assertEqual(rendition.url, self.image.file.url)
+        self.assertTrue(PendingRendition.objects.exists())
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_get_rendition_without_placeholder(self):
+        rendition = self.image.get_rendition('width-400')
+
+        self.assertIsNotNone(rendition.pk)
+        self.assertFalse(PendingRendition.objects.exists())
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_rendition_is_only_queued_once(self):
+        self.image.get_rendition('width-400', allow_placeholder=True)
+        self.image.get_rendition('width-400', allow_placeholder=True)
+
+        self.assertEqual(PendingRendition.objects.count(), 1)
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_existing_rendition_is_used(self):
+        existing_rendition = self.image.get_rendition('width-400')
+
+        self.assertEqual(self.image.get_rendition('width-400', allow_placeholder=True), existing_rendition)
+        self.assertFalse(PendingRendition.objects.exists())
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_image_tag(self):
+        result = self.render_image_tag('width-400')
+
+        self.assertIn('src="/images/', result)
+        self.assertNotIn('width=', result)
+        self.assertEqual(PendingRendition.objects.count(), 1)
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_process_rendition_queue(self):
+        self.image.get_rendition('width-400', allow_placeholder=True)
+        self.image.get_rendition('max-100x100', allow_placeholder=True)
+
+        output = StringIO()
+        management.call_command('process_rendition_queue', stdout=output)
+
+        self.assertIn("Generated 2 renditions", output.getvalue())
+        self.assertFalse(PendingRendition.objects.exists())
+        self.assertEqual(self.image.get_rendition('width-400', allow_placeholder=True).width, 400)
+        self.assertEqual(self.image.get_rendition('max-100x100', allow_placeholder=True).width, 100)
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_process_rendition_queue_skips_deleted_images(self):
+        self.image.get_rendition('width-400', allow_placeholder=True)
+        self.image.delete()
+
+        output = StringIO()
+        management.call_command('process_rendition_queue', stdout=output)
+
+        self.assertIn("Generated 0 renditions", output.getvalue())
+        self.assertFalse(PendingRendition.objects.exists())
+
+    @override_settings(WAGTAILIMAGES_RENDITION_QUEUE=DATABASE_RENDITION_QUEUE)
+    def test_process_rendition_queue_keeps_failed_renditions(self):
+        self.image.get_rendition('width-400', allow_placeholder=True)
+        self.image.get_rendition('max-100x100', allow_placeholder=True)
+
+        def generate_rendition(image_id, filter_spec):
+            if filter_spec == 'width-400':
+                raise IOError("File not found")
+            return Image.objects.get(id=image_id).get_rendition(filter_spec)
+
+        output = StringIO()
+        with mock.patch('wagtail.images.rendition_queue.generate_rendition', side_effect=generate_rendition), \
+                mock.patch('wagtail.images.rendition_queue.logger') as logger:
+            management.call_command('process_rendition_queue', stdout=output)
+
+        # The failure is logged, and the other rendition is still generated
+        self.assertEqual(logger.exception.call_count, 1)
+        self.assertIn("Generated 1 renditions", output.getvalue())
+        self.assertEqual(
+            list(PendingRendition.objects.values_list('filter_spec', flat=True)), ['width-400']
+        )
+
+    def test_thread_pool_queue(self):
+        queue = ThreadPoolRenditionQueue({'WORKERS': 1})
+
+        with mock.patch('wagtail.images.rendition_queue.transaction.on_commit') as on_commit, \
+                mock.patch.object(queue, 'executor') as executor:
+            queue.enqueue(self.image, 'width-400', '')
+            queue.enqueue(self.image, 'width-400', '')
+
+            # Nothing is queued until the transaction commits
+            self.assertEqual(queue.queued, set())
+            for call in on_commit.call_args_list:
+                call[0][0]()
+
+            queue.enqueue(self.image, 'width-400', '')
+
+        # The rendition is only submitted to the pool once
+        self.assertEqual(executor.submit.call_count, 1)
+        self.assertEqual(on_commit.call_count, 2)
+        self.assertEqual(queue.queued, {(self.image.id, 'width-400', '')})
+
+        # Run the job in this thread; it would normally close the thread's own connection
+        with mock.patch('wagtail.images.rendition_queue.connection'):
+            queue.run((self.image.id, 'width-400', ''))
+
+        self.assertEqual(queue.queued, set())
+        self.assertTrue(Rendition.objects.filter(image=self.image, filter_spec='width-400').exists())
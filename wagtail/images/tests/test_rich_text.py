@@ -1,7 +1,8 @@
 from bs4 import BeautifulSoup
 from django.test import TestCase
 
-from wagtail.images.rich_text import ImageEmbedHandler, image_embedtype_handler
+from wagtail.images.rich_text import (
+    ImageEmbedHandler, bulk_image_embedtype_handler, image_embedtype_handler)
 
 from .utils import Image, get_test_image_file
 
@@ -50,6 +51,22 @@ class TestImageEmbedHandler(TestCase):
         self.assertIn('<img class="richtext-image left"', result)
         self.assertIn('alt=""', result)
 
+    def test_bulk_expand_db_attributes(self):
+        image = Image.objects.create(id=1, title='Test', file=get_test_image_file())
+        image.get_rendition('width-500')
+        attrs_list = [
+            {'id': '1', 'alt': 'test-alt', 'format': 'left'},
+            {'id': '0', 'alt': 'missing', 'format': 'left'},
+            {'id': '1', 'alt': 'test-alt-2', 'format': 'left'},
+        ]
+
+        # The image and its existing renditions are fetched in two queries
+        with self.assertNumQueries(2):
+            result = bulk_image_embedtype_handler(attrs_list)
+
+        self.assertEqual(result, [image_embedtype_handler(attrs) for attrs in attrs_list])
+        self.assertIn('alt="test-alt-2"', result[2])
+
     def test_expand_db_attributes_for_editor(self):
         Image.objects.create(id=1, title='Test', file=get_test_image_file())
         result = ImageEmbedHandler.expand_db_attributes(
@@ -503,6 +503,13 @@ class TestRect(TestCase):
         rect = Rect.from_point(100, 200, 50, 20)
         self.assertEqual(rect, Rect(75, 190, 125, 210))
 
+    def test_scale(self):
+        rect = Rect(100, 150, 200, 250)
+        self.assertEqual(rect.scale(0.5), Rect(50, 75, 100, 125))
+
+        # The original rect is unchanged
+        self.assertEqual(rect, Rect(100, 150, 200, 250))
+
 
 class TestGetImageForm(TestCase, WagtailTestUtils):
     def test_fields(self):
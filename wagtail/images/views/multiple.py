@@ -10,11 +10,15 @@ from wagtail.admin.utils import PermissionPolicyChecker
 from wagtail.images import get_image_model
 from wagtail.images.fields import ALLOWED_EXTENSIONS
 from wagtail.images.forms import get_image_form
+from wagtail.images.models import get_renditions
 from wagtail.images.permissions import permission_policy
 from wagtail.search.backends import get_search_backends
 
 permission_checker = PermissionPolicyChecker(permission_policy)
 
+# Renditions used by the image listing, chooser and edit views
+ADMIN_RENDITION_FILTER_SPECS = ['max-165x165', 'max-800x600']
+
 
 def get_image_edit_form(ImageModel):
     ImageForm = get_image_form(ImageModel)
@@ -69,6 +73,10 @@ def add(request):
             image.file_size = image.file.size
             image.save()
 
+            # Generate the renditions that the admin displays for the image now, while the
+            # uploaded file is at hand; this decodes the file once for all of them
+            get_renditions([image], ADMIN_RENDITION_FILTER_SPECS)
+
             # Success! Send back an edit form for this image to the user
             return JsonResponse({
                 'success': True,
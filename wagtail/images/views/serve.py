@@ -8,6 +8,7 @@ from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured, PermissionDenied
 from django.http import HttpResponse, HttpResponsePermanentRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils.decorators import classonlymethod
 from django.utils.encoding import force_text
 from django.views.generic import View
@@ -32,6 +33,15 @@ def generate_signature(image_id, filter_spec, key=None):
     return force_text(base64.urlsafe_b64encode(hmac.new(key, url.encode(), hashlib.sha1).digest()))
 
 
+def generate_image_url(image, filter_spec, viewname='wagtailimages_serve', key=None):
+    """
+    Return the signed URL of the view (by default, the ``wagtailimages_serve`` view) that
+    serves the rendition of image for filter_spec
+    """
+    signature = generate_signature(image.id, filter_spec, key=key)
+    return reverse(viewname, args=(signature, image.id, filter_spec)) + image.filename
+
+
 def verify_signature(signature, image_id, filter_spec, key=None):
     return force_text(signature) == generate_signature(image_id, filter_spec, key=key)
 
@@ -16,7 +16,8 @@ from wagtail.images.api.admin.endpoints import ImagesAdminAPIEndpoint
 from wagtail.images.forms import GroupImagePermissionFormSet
 from wagtail.images.permissions import permission_policy
 from wagtail.images.rich_text import (
-    ContentstateImageConversionRule, EditorHTMLImageConversionRule, image_embedtype_handler)
+    ContentstateImageConversionRule, EditorHTMLImageConversionRule, bulk_image_embedtype_handler,
+    image_embedtype_handler)
 
 
 @hooks.register('register_admin_urls')
@@ -77,7 +78,7 @@ def editor_js():
 @hooks.register('register_rich_text_features')
 def register_image_feature(features):
     # define a handler for converting <embed embedtype="image"> tags into frontend HTML
-    features.register_embed_type('image', image_embedtype_handler)
+    features.register_embed_type('image', image_embedtype_handler, bulk_image_embedtype_handler)
 
     # define a hallo.js plugin to use when the 'image' feature is active
     features.register_editor_plugin(
@@ -49,6 +49,7 @@ def import_backend(dotted_path):
 
 def get_search_backend(backend='default', **kwargs):
     search_backends = get_search_backend_config()
+    backend_name = backend
 
     # Try to find the backend
     try:
@@ -76,7 +77,9 @@ def get_search_backend(backend='default', **kwargs):
             backend, e))
 
     # Create backend
-    return backend_cls(params)
+    search_backend = backend_cls(params)
+    search_backend.name = backend_name
+    return search_backend
 
 
 def _backend_requires_auto_update(backend_name, params):
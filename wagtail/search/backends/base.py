@@ -2,11 +2,14 @@
 import warnings
 from warnings import warn
 
+from django.db.models.fields import FieldDoesNotExist
 from django.db.models.lookups import Lookup
 from django.db.models.query import QuerySet
 from django.db.models.sql.where import SubqueryConstraint, WhereNode
+from django.utils.functional import cached_property
 
-from wagtail.search.index import class_is_indexed
+from wagtail.search import result_cache
+from wagtail.search.index import FilterField, SearchField, class_is_indexed
 from wagtail.search.query import MATCH_ALL, PlainText
 from wagtail.utils.deprecation import RemovedInWagtail22Warning
 
@@ -33,9 +36,17 @@ class OrderByFieldError(FieldError):
     pass
 
 
+class ValuesFieldError(FieldError):
+    pass
+
+
 class BaseSearchQueryCompiler:
     DEFAULT_OPERATOR = 'or'
 
+    # True for the queries of autocomplete() rather than search(), as some backends
+    # compile both with the same class
+    autocomplete = False
+
     def __init__(self, queryset, query, fields=None, operator=None, order_by_relevance=True,
                  include_partials=True):
         self.queryset = queryset
@@ -165,6 +176,25 @@ class BaseSearchQueryCompiler:
         list(self._get_order_by())
 
 
+class SearchResultRecord(dict):
+    """
+    A search result returned by ``BaseSearchResults.values()``: a dict of the values of
+    the requested fields, read without loading the model instance. The instance is only
+    fetched from the database when the ``instance`` attribute is accessed.
+    """
+    def __init__(self, queryset, pk, values):
+        super().__init__(values)
+        self.queryset = queryset
+        self.pk = pk
+
+    @cached_property
+    def instance(self):
+        return self.queryset.get(pk=self.pk)
+
+    def __repr__(self):
+        return '<SearchResultRecord %r: %s>' % (self.pk, super().__repr__())
+
+
 class BaseSearchResults:
     def __init__(self, backend, query_compiler, prefetch_related=None,
                  return_pks=False):
@@ -177,6 +207,7 @@ class BaseSearchResults:
         self._results_cache = None
         self._count_cache = None
         self._score_field = None
+        self._values_fields = None
 
     def _set_limits(self, start=None, stop=None):
         if stop is not None:
@@ -199,6 +230,7 @@ class BaseSearchResults:
         new.start = self.start
         new.stop = self.stop
         new._score_field = self._score_field
+        new._values_fields = self._values_fields
         return new
 
     def _do_search(self):
@@ -207,9 +239,28 @@ class BaseSearchResults:
     def _do_count(self):
         raise NotImplementedError
 
+    def _do_search_with_count(self):
+        """
+        Returns the results, along with the number of results that the search would have
+        with no limits applied where the backend finds it while searching (otherwise None)
+        """
+        return self._do_search(), None
+
+    def _get_count_from_total(self, total):
+        count = total - self.start
+        if self.stop is not None:
+            count = min(count, self.stop - self.start)
+
+        return max(count, 0)
+
     def results(self):
         if self._results_cache is None:
-            self._results_cache = list(self._do_search())
+            self._results_cache = result_cache.get_cached_results(self)
+
+            if self._results_cache is None:
+                self._results_cache = list(self._do_search())
+                result_cache.cache_results(self, self._results_cache)
+
         return self._results_cache
 
     def count(self):
@@ -217,9 +268,39 @@ class BaseSearchResults:
             if self._results_cache is not None:
                 self._count_cache = len(self._results_cache)
             else:
-                self._count_cache = self._do_count()
+                self._count_cache = result_cache.get_cached_count(self)
+
+                if self._count_cache is None:
+                    self._count_cache = self._do_count()
+                    result_cache.cache_count(self, self._count_cache)
         return self._count_cache
 
+    def page(self, start, stop):
+        """
+        Returns a list of the results from start to stop, along with the total number of
+        results. Where the backend supports it, both are found in a single request.
+        """
+        page = self[start:stop]
+
+        if page._results_cache is None:
+            page._results_cache = result_cache.get_cached_results(page)
+
+        if page._results_cache is None:
+            results, total = page._do_search_with_count()
+            page._results_cache = list(results)
+            result_cache.cache_results(page, page._results_cache)
+
+            # A page that isn't full is the last one, which gives the total as well
+            if total is None and page.stop is not None and len(page._results_cache) < page.stop - page.start:
+                if page._results_cache or page.start == self.start:
+                    total = page.start + len(page._results_cache)
+
+            if total is not None and self._count_cache is None:
+                self._count_cache = self._get_count_from_total(total)
+                result_cache.cache_count(self, self._count_cache)
+
+        return page._results_cache, self.count()
+
     def __getitem__(self, key):
         new = self._clone()
 
@@ -245,6 +326,16 @@ class BaseSearchResults:
     def __iter__(self):
         return iter(self.results())
 
+    def iterator(self):
+        """
+        Iterates over the results without caching them, for going through large result
+        sets (such as when exporting every result) in constant memory
+        """
+        if self._results_cache is not None:
+            return iter(self._results_cache)
+
+        return iter(self._do_search())
+
     def __len__(self):
         return len(self.results())
 
@@ -259,6 +350,56 @@ class BaseSearchResults:
         clone._score_field = field_name
         return clone
 
+    def values(self, *field_names):
+        """
+        Return the results as SearchResultRecords holding the values of the given fields
+        (which must be in the model's search_fields), rather than model instances. Where the
+        backend stores the field values in its index, they are read from there, and the
+        database isn't queried at all.
+        """
+        model = self.query_compiler.queryset.model
+        allowed_fields = {
+            field.field_name for field in model.get_search_fields()
+            if isinstance(field, (SearchField, FilterField))
+        }
+
+        for field_name in field_names:
+            if field_name not in allowed_fields:
+                raise ValuesFieldError(
+                    'Cannot return the values of field "' + field_name + '". Please add index.SearchField(\'' +
+                    field_name + '\') or index.FilterField(\'' + field_name + '\') to ' +
+                    model.__name__ + '.search_fields.',
+                    field_name=field_name
+                )
+
+        clone = self._clone()
+        clone._values_fields = field_names
+        return clone
+
+    def _get_records_from_queryset(self, queryset):
+        """
+        Yields SearchResultRecords for the requested fields (see values()) from a queryset of
+        results, for backends that don't store field values in their index
+        """
+        model = queryset.model
+        for field_name in self._values_fields:
+            try:
+                model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                raise ValuesFieldError(
+                    'Cannot return the values of field "' + field_name + '" with this search backend, '
+                    'as it is not a database field.',
+                    field_name=field_name
+                )
+
+        value_names = ['pk'] + list(self._values_fields)
+        if self._score_field and self._score_field in queryset.query.annotations:
+            value_names.append(self._score_field)
+
+        for row in queryset.values(*value_names):
+            pk = row.pop('pk')
+            yield SearchResultRecord(self.query_compiler.queryset, pk, row)
+
 
 class EmptySearchResults(BaseSearchResults):
     def __init__(self):
@@ -276,15 +417,27 @@ class EmptySearchResults(BaseSearchResults):
 
 class BaseSearchBackend:
     query_compiler_class = None
+    autocomplete_query_compiler_class = None
     results_class = None
     rebuilder_class = None
 
+    # The name of the backend in WAGTAILSEARCH_BACKENDS, set by get_search_backend
+    name = None
+
     def __init__(self, params):
-        pass
+        # See wagtail.search.result_cache
+        self.results_cache_params = params.pop('RESULTS_CACHE', None)
 
     def get_index_for_model(self, model):
         return None
 
+    def invalidate_results_cache(self):
+        """
+        Stop cached search results from being used, as the index has changed (see
+        wagtail.search.result_cache)
+        """
+        result_cache.invalidate(self)
+
     def get_rebuilder(self):
         return None
 
@@ -306,9 +459,9 @@ class BaseSearchBackend:
     def delete(self, obj):
         raise NotImplementedError
 
-    def search(self, query, model_or_queryset, fields=None, filters=None,
-               prefetch_related=None, operator=None, order_by_relevance=True,
-               include_partials=True, return_pks=False):
+    def _search(self, query_compiler_class, query, model_or_queryset, fields=None, filters=None,
+                prefetch_related=None, operator=None, order_by_relevance=True,
+                include_partials=True, return_pks=False, fields_only=None, autocomplete=False):
         # Find model/queryset
         if isinstance(model_or_queryset, QuerySet):
             model = model_or_queryset.model
@@ -347,12 +500,42 @@ class BaseSearchBackend:
             )
 
         # Search
-        search_query = self.query_compiler_class(
+        search_query = query_compiler_class(
             queryset, query, fields=fields, operator=operator, order_by_relevance=order_by_relevance,
             include_partials=include_partials
         )
+        search_query.autocomplete = autocomplete
 
         # Check the query
         search_query.check()
 
-        return self.results_class(self, search_query, return_pks=return_pks)
+        results = self.results_class(self, search_query, return_pks=return_pks)
+
+        if fields_only is not None:
+            results = results.values(*fields_only)
+
+        return results
+
+    def search(self, query, model_or_queryset, fields=None, filters=None,
+               prefetch_related=None, operator=None, order_by_relevance=True,
+               include_partials=True, return_pks=False, fields_only=None):
+        return self._search(
+            self.query_compiler_class, query, model_or_queryset, fields=fields, filters=filters,
+            prefetch_related=prefetch_related, operator=operator, order_by_relevance=order_by_relevance,
+            include_partials=include_partials, return_pks=return_pks, fields_only=fields_only
+        )
+
+    def autocomplete(self, query, model_or_queryset, fields=None, operator=None, order_by_relevance=True,
+                     fields_only=None):
+        """
+        Searches for the objects with words starting with each word of query, in the fields
+        with partial_match=True, for showing results as the user types
+        """
+        if self.autocomplete_query_compiler_class is None:
+            raise NotImplementedError("This search backend does not support the autocomplete API.")
+
+        return self._search(
+            self.autocomplete_query_compiler_class, query, model_or_queryset, fields=fields,
+            operator=operator, order_by_relevance=order_by_relevance, fields_only=fields_only,
+            autocomplete=True
+        )
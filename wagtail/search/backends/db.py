@@ -98,6 +98,9 @@ class DatabaseSearchResults(BaseSearchResults):
         if self._score_field:
             queryset = queryset.annotate(**{self._score_field: Value(None, output_field=models.FloatField())})
 
+        if self._values_fields is not None:
+            return self._get_records_from_queryset(queryset)
+
         return queryset.iterator()
 
     def _do_count(self):
@@ -106,6 +109,7 @@ class DatabaseSearchResults(BaseSearchResults):
 
 class DatabaseSearchBackend(BaseSearchBackend):
     query_compiler_class = DatabaseSearchQueryCompiler
+    autocomplete_query_compiler_class = DatabaseSearchQueryCompiler
     results_class = DatabaseSearchResults
 
     def reset_index(self):
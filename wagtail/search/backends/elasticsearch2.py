@@ -11,8 +11,9 @@ from elasticsearch import Elasticsearch, NotFoundError
 from elasticsearch.helpers import bulk
 
 from wagtail.search.backends.base import (
-    BaseSearchBackend, BaseSearchQueryCompiler, BaseSearchResults)
-from wagtail.search.index import FilterField, Indexed, RelatedFields, SearchField, class_is_indexed
+    BaseSearchBackend, BaseSearchQueryCompiler, BaseSearchResults, SearchResultRecord)
+from wagtail.search.index import (
+    FilterField, Indexed, RelatedFields, SearchField, class_is_indexed, prefetch_search_related_objects)
 from wagtail.search.query import (
     And, Boost, Filter, Fuzzy, MatchAll, Not, Or, PlainText, Prefix, Term)
 from wagtail.utils.deprecation import RemovedInWagtail22Warning
@@ -596,6 +597,13 @@ class Elasticsearch2SearchQueryCompiler(BaseSearchQueryCompiler):
 class Elasticsearch2SearchResults(BaseSearchResults):
     fields_param_name = 'fields'
 
+    # The number of results fetched per request when paging through results
+    page_size = 100
+
+    # The deepest result that can be fetched with from/size (this is the default
+    # value of Elasticsearch's index.max_result_window setting)
+    max_result_window = 10000
+
     def _get_es_body(self, for_count=False):
         body = {
             'query': self.query_compiler.get_query()
@@ -609,10 +617,53 @@ class Elasticsearch2SearchResults(BaseSearchResults):
 
         return body
 
+    def _get_values_columns(self):
+        """
+        Returns a dict mapping the names of the document fields that hold the values
+        requested by values() to the search field names they were requested by
+        """
+        columns = {}
+        for field_name in self._values_fields:
+            for field in self.query_compiler.queryset.model.get_search_fields():
+                if isinstance(field, (SearchField, FilterField)) and field.field_name == field_name:
+                    columns[self.query_compiler.mapping.get_field_column_name(field)] = field_name
+                    break
+
+        return columns
+
+    def _get_records_from_hits(self, hits):
+        """
+        Yields SearchResultRecords from a page of hits returned by Elasticsearch, reading
+        the field values from the documents' source rather than the database
+        """
+        pk_field = self.query_compiler.queryset.model._meta.pk
+        columns = self._get_values_columns()
+
+        for hit in hits:
+            source = hit.get('_source', {})
+            values = {field_name: source.get(column) for column, field_name in columns.items()}
+
+            if self._score_field:
+                values[self._score_field] = hit['_score']
+
+            yield SearchResultRecord(
+                self.query_compiler.queryset, pk_field.to_python(hit['fields']['pk'][0]), values
+            )
+
     def _get_results_from_hits(self, hits):
         """
         Yields Django model instances from a page of hits returned by Elasticsearch
         """
+        if self.return_pks:
+            for hit in hits:
+                yield hit['fields']['pk'][0]
+
+            return
+
+        if self._values_fields is not None:
+            yield from self._get_records_from_hits(hits)
+            return
+
         # Get pks from results
         pks = [hit['fields']['pk'][0] for hit in hits]
         scores = {str(hit['fields']['pk'][0]): hit['_score'] for hit in hits}
@@ -633,16 +684,7 @@ class Elasticsearch2SearchResults(BaseSearchResults):
             if result:
                 yield result
 
-    def _do_search(self):
-        PAGE_SIZE = 100
-
-        if self.stop is not None:
-            limit = self.stop - self.start
-        else:
-            limit = None
-
-        use_scroll = limit is None or limit > PAGE_SIZE
-
+    def _get_search_params(self):
         params = {
             'index': self.backend.get_index_for_model(self.query_compiler.queryset.model).name,
             'body': self._get_es_body(),
@@ -650,72 +692,115 @@ class Elasticsearch2SearchResults(BaseSearchResults):
             self.fields_param_name: 'pk',
         }
 
-        if use_scroll:
-            params.update({
-                'scroll': '2m',
-                'size': PAGE_SIZE,
-            })
+        if self._values_fields:
+            # Only fetch the requested fields from the documents' source
+            params['_source'] = list(self._get_values_columns().keys())
 
-            # The scroll API doesn't support offset, manually skip the first results
-            skip = self.start
+        return params
 
-            # Send to Elasticsearch
-            page = self.backend.es.search(**params)
+    def _do_search(self):
+        if self.stop is not None and self.stop <= self.max_result_window:
+            return self._do_from_size_search()
+        else:
+            return self._do_deep_search()
 
-            while True:
-                hits = page['hits']['hits']
+    def _do_search_with_count(self):
+        if self.stop is not None and self.stop <= self.max_result_window:
+            # The response holds the total number of hits along with the page of results
+            hits = self._do_from_size_request()['hits']
+            return list(self._get_results_from_hits(hits['hits'])), hits['total']
+        else:
+            return super()._do_search_with_count()
 
-                if len(hits) == 0:
-                    break
+    def _do_from_size_request(self):
+        params = self._get_search_params()
+        params.update({
+            'from_': self.start,
+            'size': self.stop - self.start,
+        })
 
-                # Get results
-                if skip < len(hits):
-                    for result in self._get_results_from_hits(hits):
-                        if limit is not None and limit == 0:
-                            break
+        # Send to Elasticsearch
+        return self.backend.es.search(**params)
 
-                        if skip == 0:
-                            yield result
+    def _do_from_size_search(self):
+        """
+        Fetches the results in a single request, using from/size
+        """
+        hits = self._do_from_size_request()['hits']['hits']
+
+        # Get results
+        yield from self._get_results_from_hits(hits)
+
+    def _do_deep_search(self):
+        """
+        Fetches results that may lie beyond max_result_window, which from/size can't reach.
+        Elasticsearch 2 doesn't support search_after, so this uses the scroll API.
+        """
+        return self._do_scroll_search()
+
+    def _do_scroll_search(self):
+        """
+        Fetches the results a page at a time through a scroll context
+        """
+        if self.stop is not None:
+            limit = self.stop - self.start
+        else:
+            limit = None
+
+        params = self._get_search_params()
+        params.update({
+            'scroll': '2m',
+            'size': self.page_size,
+        })
+
+        # The scroll API doesn't support offset, manually skip the first results
+        skip = self.start
+
+        # Send to Elasticsearch
+        page = self.backend.es.search(**params)
 
-                            if limit is not None:
-                                limit -= 1
-                        else:
-                            skip -= 1
+        while True:
+            hits = page['hits']['hits']
 
+            if len(hits) == 0:
+                break
+
+            # Get results
+            if skip < len(hits):
+                for result in self._get_results_from_hits(hits):
                     if limit is not None and limit == 0:
                         break
-                else:
-                    # Skip whole page
-                    skip -= len(hits)
 
-                # Fetch next page of results
-                if '_scroll_id' not in page:
-                    break
+                    if skip == 0:
+                        yield result
 
-                page = self.backend.es.scroll(scroll_id=page['_scroll_id'], scroll='2m')
+                        if limit is not None:
+                            limit -= 1
+                    else:
+                        skip -= 1
 
-            # Clear the scroll
-            if '_scroll_id' in page:
-                self.backend.es.clear_scroll(scroll_id=page['_scroll_id'])
-        else:
-            params.update({
-                'from_': self.start,
-                'size': limit or PAGE_SIZE,
-            })
+                if limit is not None and limit == 0:
+                    break
+            else:
+                # Skip whole page
+                skip -= len(hits)
 
-            # Send to Elasticsearch
-            hits = self.backend.es.search(**params)['hits']['hits']
+            # Fetch next page of results
+            if '_scroll_id' not in page:
+                break
 
-            if self.return_pks:
-                pks = [hit['fields']['pk'][0] for hit in hits]
-                for pk in pks:
-                    yield pk
+            page = self.backend.es.scroll(scroll_id=page['_scroll_id'], scroll='2m')
 
-                return
+        # Clear the scroll
+        if '_scroll_id' in page:
+            self.backend.es.clear_scroll(scroll_id=page['_scroll_id'])
 
-            # Get results
-            for result in self._get_results_from_hits(hits):
-                yield result
+    def iterator(self):
+        # Iterating over every result is what the scroll API is made for
+        if self._results_cache is not None:
+            return iter(self._results_cache)
+
+        return self._do_scroll_search()
 
     def _do_count(self):
         # Get count
@@ -808,6 +893,9 @@ class Elasticsearch2Index:
         mapping = self.mapping_class(model)
         doc_type = mapping.get_document_type()
 
+        # Fetch the related objects needed for the documents for all items at once
+        prefetch_search_related_objects(model, items)
+
         # Create list of actions
         actions = []
         for item in items:
@@ -865,6 +953,10 @@ class ElasticsearchIndexRebuilder:
 
         return self.index
 
+    def resume(self, index_name):
+        # The index is rebuilt in place, so carry on adding to it
+        return self.index
+
     def finish(self):
         self.index.refresh()
 
@@ -894,6 +986,12 @@ class ElasticsearchAtomicIndexRebuilder(ElasticsearchIndexRebuilder):
 
         return self.index
 
+    def resume(self, index_name):
+        # Carry on adding to the new index that an interrupted rebuild created
+        self.index = self.alias.backend.index_class(self.alias.backend, index_name)
+
+        return self.index
+
     def finish(self):
         self.index.refresh()
 
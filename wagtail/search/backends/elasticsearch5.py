@@ -92,6 +92,71 @@ class Elasticsearch5SearchQueryCompiler(Elasticsearch2SearchQueryCompiler):
 class Elasticsearch5SearchResults(Elasticsearch2SearchResults):
     fields_param_name = 'stored_fields'
 
+    def _get_search_after_sort(self):
+        """
+        Returns the sort of the query, with the pk field added as a tiebreaker so that
+        every result has a distinct position for the next page to continue from
+        """
+        sort = self.query_compiler.get_sort() or ['_score']
+        if 'pk' not in sort:
+            sort = sort + ['pk']
+
+        return sort
+
+    def _do_deep_search(self):
+        """
+        Fetches results that may lie beyond max_result_window with search_after: each page
+        continues from the sort values of the last hit before it, so no scroll context is
+        held open on the cluster, and the hits before start are walked past in pages as
+        large as Elasticsearch allows, transferring only their sort values.
+        """
+        if self.stop is not None:
+            limit = self.stop - self.start
+        else:
+            limit = None
+
+        params = self._get_search_params()
+        params['body']['sort'] = self._get_search_after_sort()
+
+        def search(size, search_after, **kwargs):
+            page_params = dict(params, size=size, **kwargs)
+            if search_after is not None:
+                page_params['body'] = dict(params['body'], search_after=search_after)
+
+            return self.backend.es.search(**page_params).get('hits', {}).get('hits', [])
+
+        # Unless the first result is within reach of from/size, walk past the results
+        # before it, only transferring their sort values
+        skip = self.start
+        search_after = None
+        if skip >= self.max_result_window:
+            while skip > 0:
+                hits = search(min(skip, self.max_result_window), search_after, filter_path=['hits.hits.sort'])
+                if not hits:
+                    return
+
+                skip -= len(hits)
+                search_after = hits[-1]['sort']
+
+        while limit is None or limit > 0:
+            size = self.page_size if limit is None else min(limit, self.max_result_window)
+
+            if search_after is None:
+                size = min(size, self.max_result_window - skip)
+                hits = search(size, None, from_=skip)
+            else:
+                hits = search(size, search_after)
+
+            yield from self._get_results_from_hits(hits)
+
+            if len(hits) < size:
+                break
+
+            if limit is not None:
+                limit -= len(hits)
+
+            search_after = hits[-1]['sort']
+
 
 class Elasticsearch5SearchBackend(Elasticsearch2SearchBackend):
     mapping_class = Elasticsearch5Mapping
@@ -0,0 +1,502 @@
+"""
+A search backend that keeps an inverted index in the database, for sites that can't
+run Elasticsearch or PostgreSQL.
+
+Whenever an object is indexed, its searchable content is split into terms, and the
+number of times that each term occurs in each search field is stored in the
+IndexedTerm table, along with the boost of the field. Searches look up the terms of
+the query in that table, rather than scanning the searched model's table, and rank
+the results with BM25: the more often a term occurs in an object (weighted by the
+boosts of the fields it occurs in), and the less often it occurs in others, the higher
+the object is ranked. To use it::
+
+    WAGTAILSEARCH_BACKENDS = {
+        'default': {
+            'BACKEND': 'wagtail.search.backends.indexed_db',
+        }
+    }
+
+Then run the ``update_index`` management command to build the index. The ``BM25_K1``
+and ``BM25_B`` options set the parameters of the ranking function (1.2 and 0.75 by
+default).
+"""
+
+import itertools
+import math
+import re
+from collections import Counter
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Avg, Case, Count, F, Q, Sum, Value, When
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import ExpressionWrapper
+from django.db.models.functions import Cast, Coalesce
+from django.utils.encoding import force_text
+
+from wagtail.search.backends.base import BaseSearchBackend, BaseSearchResults
+from wagtail.search.backends.db import DatabaseSearchQueryCompiler
+from wagtail.search.index import RelatedFields, SearchField, prefetch_search_related_objects
+from wagtail.search.models import IndexedDocument, IndexedTerm
+from wagtail.search.query import And, MatchAll, Not, Or, SearchQueryShortcut, Term
+from wagtail.search.utils import AND, OR
+
+TERM_RE = re.compile(r'\w+')
+MAX_TERM_LENGTH = IndexedTerm._meta.get_field('term').max_length
+
+
+def get_terms(text):
+    """
+    Splits text into the terms that are stored in the index
+    """
+    return [term[:MAX_TERM_LENGTH] for term in TERM_RE.findall(text.lower())]
+
+
+def get_ancestors_content_types_pks(model):
+    """
+    Returns content types ids for the ancestors of this model, excluding it.
+    """
+    return [content_type.pk for content_type in
+            ContentType.objects.get_for_models(*model._meta.get_parent_list()).values()]
+
+
+def get_descendants_content_types_pks(model):
+    """
+    Returns content types ids for the descendants of this model, including it.
+    """
+    descendant_models = [other_model for other_model in apps.get_models()
+                         if issubclass(other_model, model)]
+    return [content_type.pk for content_type in
+            ContentType.objects.get_for_models(model, *descendant_models).values()]
+
+
+def get_pk_cast_field(model):
+    """
+    Returns the field to cast the object ids of the index to, to compare them with the
+    primary keys of model
+    """
+    field = model._meta.pk
+    while field.remote_field is not None:
+        # The parent link of a multi-table inheritance child
+        field = field.target_field
+
+    if isinstance(field, models.BigAutoField):
+        return models.BigIntegerField()
+    if isinstance(field, models.AutoField):
+        return models.IntegerField()
+    return field
+
+
+class IndexedDatabaseIndex:
+    # The number of objects to write to the index at a time
+    batch_size = 500
+
+    def __init__(self, backend, model):
+        self.backend = backend
+        self.model = model
+        self.name = model._meta.label
+        self.search_fields = self.model.get_search_fields()
+
+    def add_model(self, model):
+        pass
+
+    def refresh(self):
+        pass
+
+    def delete_stale_entries(self):
+        if self.model._meta.parents:
+            # We don't need to delete stale entries for non-root models,
+            # since we already delete them by deleting roots.
+            return
+
+        existing_object_ids = (self.model._default_manager
+                               .annotate(object_id=Cast('pk', models.CharField(max_length=255)))
+                               .values('object_id'))
+        (IndexedDocument.objects.filter(content_type_id__in=get_descendants_content_types_pks(self.model))
+         .exclude(object_id__in=existing_object_ids).delete())
+
+    def prepare_value(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, str):
+            return value
+        if isinstance(value, list):
+            return ', '.join(self.prepare_value(item) for item in value)
+        if isinstance(value, dict):
+            return ', '.join(self.prepare_value(item) for item in value.values())
+        return force_text(value)
+
+    def prepare_field(self, obj, field, field_name):
+        """
+        Yields a ``(field_name, terms, boost)`` tuple for the values of field on obj. The
+        fields of related objects are named after the relation, eg ``authors__name``
+        """
+        if isinstance(field, SearchField):
+            yield field_name, get_terms(self.prepare_value(field.get_value(obj))), field.boost
+        elif isinstance(field, RelatedFields):
+            sub_obj = field.get_value(obj)
+            if sub_obj is None:
+                return
+            if isinstance(sub_obj, models.Manager):
+                sub_objs = sub_obj.all()
+            else:
+                if callable(sub_obj):
+                    sub_obj = sub_obj()
+                sub_objs = [sub_obj]
+            for sub_obj in sub_objs:
+                for sub_field in field.fields:
+                    yield from self.prepare_field(sub_obj, sub_field, field_name + LOOKUP_SEP + sub_field.field_name)
+
+    def prepare_terms(self, obj):
+        """
+        Returns the IndexedTerms for obj (without their document), and the number of terms
+        in its searchable content
+        """
+        frequencies = Counter()
+        weights = {}
+        length = 0
+        for field in self.search_fields:
+            for field_name, terms, boost in self.prepare_field(obj, field, field.field_name):
+                frequencies.update((field_name, term) for term in terms)
+                weights[field_name] = boost if boost is not None else 1
+                length += len(terms)
+
+        indexed_terms = [
+            IndexedTerm(term=term, field=field_name, frequency=frequency, weight=weights[field_name])
+            for (field_name, term), frequency in frequencies.items()
+        ]
+        return indexed_terms, length
+
+    def add_item(self, obj):
+        self.add_items(self.model, [obj])
+
+    def add_items(self, model, objs):
+        content_type_pk = ContentType.objects.get_for_model(model).pk
+        replaced_content_type_pks = [content_type_pk] + get_ancestors_content_types_pks(model)
+
+        # Fetch the related objects needed for the index for all objects at once
+        prefetch_search_related_objects(model, objs)
+
+        for i in range(0, len(objs), self.batch_size):
+            terms_by_object_id = {
+                force_text(obj.pk): self.prepare_terms(obj)
+                for obj in objs[i:i + self.batch_size]
+            }
+            object_ids = list(terms_by_object_id.keys())
+
+            with transaction.atomic():
+                # Replace the existing documents of the objects, including any left from when
+                # they were indexed as an ancestor model
+                IndexedDocument.objects.filter(
+                    content_type_id__in=replaced_content_type_pks, object_id__in=object_ids
+                ).delete()
+
+                IndexedDocument.objects.bulk_create([
+                    IndexedDocument(content_type_id=content_type_pk, object_id=object_id, length=length)
+                    for object_id, (indexed_terms, length) in terms_by_object_id.items()
+                ])
+
+                # Not all databases return the ids of created objects, so fetch them
+                document_ids = dict(IndexedDocument.objects.filter(
+                    content_type_id=content_type_pk, object_id__in=object_ids
+                ).values_list('object_id', 'id'))
+
+                for object_id, (indexed_terms, length) in terms_by_object_id.items():
+                    for indexed_term in indexed_terms:
+                        indexed_term.document_id = document_ids[object_id]
+
+                IndexedTerm.objects.bulk_create([
+                    indexed_term
+                    for indexed_terms, length in terms_by_object_id.values()
+                    for indexed_term in indexed_terms
+                ])
+
+    def delete_item(self, obj):
+        # The object may be indexed as an ancestor or descendant of its class
+        content_type_pks = get_ancestors_content_types_pks(type(obj)) + get_descendants_content_types_pks(type(obj))
+        IndexedDocument.objects.filter(content_type_id__in=content_type_pks, object_id=force_text(obj.pk)).delete()
+
+    def __str__(self):
+        return self.name
+
+
+class IndexedDatabaseSearchQueryCompiler(DatabaseSearchQueryCompiler):
+    def _get_query_terms(self, query):
+        """
+        Yields the terms of query, with their boosts
+        """
+        if isinstance(query, SearchQueryShortcut):
+            yield from self._get_query_terms(query.get_equivalent())
+        elif isinstance(query, Term):
+            for term in get_terms(query.term):
+                yield term, query.boost
+        elif isinstance(query, Not):
+            # Negated terms don't contribute to the score
+            for term, boost in self._get_query_terms(query.subquery):
+                yield term, 0
+        elif isinstance(query, (And, Or)):
+            for subquery in query.subqueries:
+                yield from self._get_query_terms(subquery)
+        else:
+            raise NotImplementedError(
+                '`%s` is not supported by the indexed database search backend.'
+                % query.__class__.__name__)
+
+    def _build_match(self, query, term_annotations):
+        """
+        Compiles query into a filter on the term frequencies annotated by get_matches,
+        given a mapping of terms to the names of their annotations
+        """
+        if isinstance(query, SearchQueryShortcut):
+            return self._build_match(query.get_equivalent(), term_annotations)
+        if isinstance(query, Term):
+            terms = get_terms(query.term)
+            if not terms:
+                # Nothing can match a term that has no words in it
+                return Q(pk__in=[])
+            return AND(Q(**{term_annotations[term] + '__gt': 0}) for term in terms)
+        if isinstance(query, Not):
+            return ~self._build_match(query.subquery, term_annotations)
+        if isinstance(query, And):
+            return AND(self._build_match(subquery, term_annotations) for subquery in query.subqueries)
+        if isinstance(query, Or):
+            return OR(self._build_match(subquery, term_annotations) for subquery in query.subqueries)
+
+    def _matches_empty_document(self, query):
+        """
+        Returns True if a document with none of the terms of query would match it (eg, for
+        ``Not(Term('foo'))``)
+        """
+        if isinstance(query, SearchQueryShortcut):
+            return self._matches_empty_document(query.get_equivalent())
+        if isinstance(query, Not):
+            return not self._matches_empty_document(query.subquery)
+        if isinstance(query, And):
+            return all(self._matches_empty_document(subquery) for subquery in query.subqueries)
+        if isinstance(query, Or):
+            return any(self._matches_empty_document(subquery) for subquery in query.subqueries)
+        return False
+
+    def get_matches(self, k1, b):
+        """
+        Returns a queryset of the IndexedDocuments that match the query, annotated with
+        their BM25 score as ``score``, or None if the query matches everything
+        """
+        if isinstance(self.query, MatchAll):
+            return None
+
+        query_terms = list(self._get_query_terms(self.query))
+        terms = {term for term, boost in query_terms}
+
+        documents = IndexedDocument.objects.filter(
+            content_type_id__in=get_descendants_content_types_pks(self.queryset.model)
+        )
+        indexed_terms = IndexedTerm.objects.filter(document__in=documents, term__in=terms)
+        if self.fields:
+            indexed_terms = indexed_terms.filter(field__in=self.fields)
+
+        # Statistics for the ranking function
+        statistics = documents.aggregate(count=Count('id'), average_length=Avg('length'))
+        document_count = statistics['count']
+        average_length = statistics['average_length'] or 1
+        document_frequencies = dict(
+            indexed_terms.values_list('term').annotate(document_count=Count('document', distinct=True))
+        )
+
+        if not self._matches_empty_document(self.query):
+            # Only look at the documents that contain at least one of the terms
+            # (in a single filter() call, so that the annotations below are over the same join)
+            term_filter = Q(terms__term__in=terms)
+            if self.fields:
+                term_filter &= Q(terms__field__in=self.fields)
+            documents = documents.filter(term_filter)
+
+        # Annotate each document with the number of times that each term occurs in it, and the
+        # same weighted by the boosts of the fields that it occurs in
+        annotations = {}
+        term_annotations = {}
+        for i, term in enumerate(sorted(terms)):
+            condition = Q(terms__term=term)
+            if self.fields:
+                condition &= Q(terms__field__in=self.fields)
+
+            term_annotations[term] = 'frequency_%d' % i
+            annotations['frequency_%d' % i] = Coalesce(Sum(Case(
+                When(condition, then=F('terms__frequency')),
+                default=Value(0), output_field=models.IntegerField()
+            )), Value(0))
+            annotations['weighted_frequency_%d' % i] = Coalesce(Sum(Case(
+                When(condition, then=F('terms__frequency') * F('terms__weight')),
+                default=Value(0.0), output_field=models.FloatField()
+            )), Value(0.0))
+
+        documents = documents.annotate(**annotations).filter(self._build_match(self.query, term_annotations))
+
+        # BM25: the score of each term saturates as its frequency grows, more quickly in
+        # short documents, and is scaled by the rarity of the term across all documents
+        score = Value(0.0)
+        length_normalisation = Value(k1 * (1 - b)) + Value(k1 * b / average_length) * F('length')
+        for term, boost in query_terms:
+            if not boost:
+                continue
+
+            document_frequency = document_frequencies.get(term, 0)
+            idf = math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            frequency = F('weighted_' + term_annotations[term])
+            score = score + Value(idf * boost * (k1 + 1)) * frequency / (frequency + length_normalisation)
+
+        return documents.annotate(score=ExpressionWrapper(score, output_field=models.FloatField()))
+
+
+class IndexedDatabaseSearchResults(BaseSearchResults):
+    # The number of objects to fetch per query when loading a page of results
+    batch_size = 500
+
+    def get_queryset(self):
+        """
+        Returns a queryset of the objects that match the query, and the IndexedDocument
+        queryset that it was matched against (or None if the query matches everything)
+        """
+        queryset = self.query_compiler.queryset
+
+        # Run _get_filters_from_queryset to test that no fields that are not
+        # a FilterField have been used in the query.
+        self.query_compiler._get_filters_from_queryset()
+
+        matches = self.query_compiler.get_matches(self.backend.k1, self.backend.b)
+        if matches is not None:
+            object_pks = matches.annotate(
+                object_pk=Cast('object_id', get_pk_cast_field(queryset.model))
+            ).values('object_pk')
+            queryset = queryset.filter(pk__in=object_pks)
+
+        return queryset, matches
+
+    def _get_results(self, queryset):
+        if self.return_pks:
+            return queryset.values_list('pk', flat=True)
+        if self._values_fields is not None:
+            return self._get_records_from_queryset(queryset)
+        return queryset.iterator()
+
+    def _set_scores(self, results, scores):
+        for result in results:
+            score = scores.get(force_text(result.pk))
+            if self._values_fields is not None:
+                result[self._score_field] = score
+            else:
+                setattr(result, self._score_field, score)
+
+    def _get_scored_results(self, results, matches):
+        """
+        Yields results, with their scores looked up a batch at a time
+        """
+        results = iter(results)
+        while True:
+            batch = list(itertools.islice(results, self.batch_size))
+            if not batch:
+                return
+
+            scores = dict(matches.filter(
+                object_id__in=[force_text(result.pk) for result in batch]
+            ).values_list('object_id', 'score'))
+            self._set_scores(batch, scores)
+
+            yield from batch
+
+    def _get_ranked_results(self, ranked_matches):
+        """
+        Yields the results for a list of ``(pk, score)`` tuples, in the same order
+        """
+        for i in range(0, len(ranked_matches), self.batch_size):
+            batch_pks = [pk for pk, score in ranked_matches[i:i + self.batch_size]]
+
+            # These objects are known to match, so there is no need to filter them again
+            results = {
+                result if self.return_pks else result.pk: result
+                for result in self._get_results(self.query_compiler.queryset.filter(pk__in=batch_pks))
+            }
+
+            if self._score_field and not self.return_pks:
+                scores = {force_text(pk): score for pk, score in ranked_matches[i:i + self.batch_size]}
+                self._set_scores(results.values(), scores)
+
+            for pk in batch_pks:
+                if pk in results:
+                    yield results[pk]
+
+    def _do_search(self):
+        queryset, matches = self.get_queryset()
+
+        if matches is None or not self.query_compiler.order_by_relevance:
+            results = self._get_results(queryset[self.start:self.stop])
+            if matches is not None and self._score_field and not self.return_pks:
+                results = self._get_scored_results(results, matches)
+            return results
+
+        # Rank the matching objects in the database, with the most recent first where
+        # scores are equal, and only fetch the scores of the ones on this page
+        ranked_matches = matches.annotate(
+            object_pk=Cast('object_id', get_pk_cast_field(queryset.model))
+        ).filter(
+            # Not the results queryset, which is already filtered on the matches
+            object_pk__in=self.query_compiler.queryset.values('pk')
+        ).order_by('-score', '-object_pk').values_list('object_pk', 'score')
+
+        return self._get_ranked_results(list(ranked_matches[self.start:self.stop]))
+
+    def _do_count(self):
+        queryset, matches = self.get_queryset()
+        return queryset[self.start:self.stop].count()
+
+
+class IndexedDatabaseSearchRebuilder:
+    def __init__(self, index):
+        self.index = index
+
+    def start(self):
+        self.index.delete_stale_entries()
+        return self.index
+
+    def resume(self, index_name):
+        return self.index
+
+    def finish(self):
+        pass
+
+
+class IndexedDatabaseSearchBackend(BaseSearchBackend):
+    query_compiler_class = IndexedDatabaseSearchQueryCompiler
+    results_class = IndexedDatabaseSearchResults
+    rebuilder_class = IndexedDatabaseSearchRebuilder
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.k1 = params.get('BM25_K1', 1.2)
+        self.b = params.get('BM25_B', 0.75)
+
+    def get_index_for_model(self, model):
+        return IndexedDatabaseIndex(self, model)
+
+    def reset_index(self):
+        IndexedDocument.objects.all().delete()
+
+    def add_type(self, model):
+        pass  # Not needed
+
+    def refresh_index(self):
+        pass  # Not needed
+
+    def add(self, obj):
+        self.get_index_for_model(type(obj)).add_item(obj)
+
+    def add_bulk(self, model, obj_list):
+        if obj_list:
+            self.get_index_for_model(model).add_items(model, obj_list)
+
+    def delete(self, obj):
+        self.get_index_for_model(type(obj)).delete_item(obj)
+
+
+SearchBackend = IndexedDatabaseSearchBackend
@@ -4,6 +4,7 @@ import logging
 from django.apps import apps
 from django.core import checks
 from django.db import models
+from django.db.models.constants import LOOKUP_SEP
 from django.db.models.fields import FieldDoesNotExist
 from django.db.models.fields.related import ForeignObjectRel, OneToOneRel, RelatedField
 
@@ -76,6 +77,23 @@ class Indexed:
 
         return queryset
 
+    @classmethod
+    def get_search_related_lookups(cls):
+        """
+        Returns a ``(select_related, prefetch_related)`` tuple of the lookups that fetch
+        all the related objects referenced by RelatedFields in search_fields, so that
+        search documents can be built without running queries for each object
+        """
+        select_related = []
+        prefetch_related = []
+        for field in cls.get_search_fields():
+            if isinstance(field, RelatedFields):
+                field_select_related, field_prefetch_related = field.get_related_lookups(cls)
+                select_related.extend(field_select_related)
+                prefetch_related.extend(field_prefetch_related)
+
+        return select_related, prefetch_related
+
     def get_indexed_instance(self):
         """
         If the indexed model uses multi table inheritance, override this method
@@ -113,6 +131,10 @@ class Indexed:
 
     search_fields = []
 
+    # The name of a date/time field recording when an object was last changed, used by
+    # `update_index --since` to find the objects to reindex
+    search_updated_at_field = None
+
 
 def get_indexed_models():
     return [
@@ -138,7 +160,29 @@ def get_indexed_instance(instance, check_exists=True):
     return indexed_instance
 
 
+def prefetch_search_related_objects(model, objs):
+    """
+    Fetch the related objects referenced by the RelatedFields of model for a list of
+    objects (that may not have come from ``get_indexed_objects``), in a query per relation
+    rather than per object. Relations that have already been fetched are not fetched again.
+    """
+    if not objs:
+        return
+
+    select_related, prefetch_related = model.get_search_related_lookups()
+    lookups = select_related + prefetch_related
+    if lookups:
+        models.prefetch_related_objects(objs, *lookups)
+
+
 def insert_or_update_object(instance):
+    from wagtail.search.index_queue import get_index_queue
+
+    index_queue = get_index_queue()
+    if index_queue is not None:
+        index_queue.add(instance)
+        return
+
     indexed_instance = get_indexed_instance(instance)
 
     if indexed_instance:
@@ -149,8 +193,17 @@ def insert_or_update_object(instance):
                 # Catch and log all errors
                 logger.exception("Exception raised while adding %r into the '%s' search backend", indexed_instance, backend_name)
 
+            backend.invalidate_results_cache()
+
 
 def remove_object(instance):
+    from wagtail.search.index_queue import get_index_queue
+
+    index_queue = get_index_queue()
+    if index_queue is not None:
+        index_queue.remove(instance)
+        return
+
     indexed_instance = get_indexed_instance(instance, check_exists=False)
 
     if indexed_instance:
@@ -161,6 +214,8 @@ def remove_object(instance):
                 # Catch and log all errors
                 logger.exception("Exception raised while deleting %r from the '%s' search backend", indexed_instance, backend_name)
 
+            backend.invalidate_results_cache()
+
 
 class BaseField:
     def __init__(self, field_name, **kwargs):
@@ -243,33 +298,69 @@ class RelatedFields:
         if isinstance(field, (RelatedField, ForeignObjectRel)):
             return getattr(obj, self.field_name)
 
-    def select_on_queryset(self, queryset):
+    def get_related_lookups(self, cls):
         """
-        This method runs either prefetch_related or select_related on the queryset
-        to improve indexing speed of the relation.
+        Returns a ``(select_related, prefetch_related)`` tuple of the lookups that fetch
+        this relation of cls, along with the relations of any RelatedFields nested within
+        this one.
+
+        Each relation is looked up with either select_related or prefetch_related,
+        depending on the number of related objects:
+         - single (eg ForeignKey, OneToOne), it uses select_related
+         - multiple (eg ManyToMany, reverse ForeignKey, ParentalKey, tags) it uses prefetch_related
 
-        It decides which method to call based on the number of related objects:
-         - single (eg ForeignKey, OneToOne), it runs select_related
-         - multiple (eg ManyToMany, reverse ForeignKey) it runs prefetch_related
+        Relations below a prefetched relation are always prefetched.
         """
         try:
-            field = self.get_field(queryset.model)
+            field = self.get_field(cls)
         except FieldDoesNotExist:
-            return queryset
+            return [], []
 
         if isinstance(field, RelatedField):
             if field.many_to_one or field.one_to_one:
-                queryset = queryset.select_related(self.field_name)
+                single = True
             elif field.one_to_many or field.many_to_many:
-                queryset = queryset.prefetch_related(self.field_name)
+                single = False
+            else:
+                return [], []
 
         elif isinstance(field, ForeignObjectRel):
-            # Reverse relation
-            if isinstance(field, OneToOneRel):
-                # select_related for reverse OneToOneField
-                queryset = queryset.select_related(self.field_name)
-            else:
-                # prefetch_related for anything else (reverse ForeignKey/ManyToManyField)
-                queryset = queryset.prefetch_related(self.field_name)
+            # Reverse relation; select_related for reverse OneToOneField, and prefetch_related
+            # for anything else (reverse ForeignKey/ManyToManyField)
+            single = isinstance(field, OneToOneRel)
+
+        else:
+            return [], []
+
+        select_related = []
+        prefetch_related = []
+        if single:
+            select_related.append(self.field_name)
+        else:
+            prefetch_related.append(self.field_name)
+
+        for sub_field in self.fields:
+            if isinstance(sub_field, RelatedFields):
+                sub_select_related, sub_prefetch_related = sub_field.get_related_lookups(field.related_model)
+                if not single:
+                    sub_prefetch_related = sub_select_related + sub_prefetch_related
+                    sub_select_related = []
+
+                select_related.extend(self.field_name + LOOKUP_SEP + lookup for lookup in sub_select_related)
+                prefetch_related.extend(self.field_name + LOOKUP_SEP + lookup for lookup in sub_prefetch_related)
+
+        return select_related, prefetch_related
+
+    def select_on_queryset(self, queryset):
+        """
+        This method runs either prefetch_related or select_related on the queryset
+        to improve indexing speed of the relation (see get_related_lookups).
+        """
+        select_related, prefetch_related = self.get_related_lookups(queryset.model)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
 
         return queryset
@@ -0,0 +1,318 @@
+"""
+Deferred, batched updating of search indexes.
+
+By default, an object is added to (or removed from) the search index by the
+``post_save`` and ``post_delete`` signal handlers, in the request that saves it; with
+Elasticsearch, that means a request to the search server for every save. When the
+``WAGTAILSEARCH_INDEX_QUEUE`` setting is defined, the signal handlers (and
+``wagtail.search.index.insert_or_update_object``/``remove_object``) instead record the
+change in a queue. Repeated changes to the same object are coalesced, and the objects
+are then indexed with one ``add_bulk`` call per model for each batch.
+
+For example::
+
+    WAGTAILSEARCH_INDEX_QUEUE = {
+        'BACKEND': 'wagtail.search.index_queue.DatabaseIndexQueue',
+    }
+
+The available backends are ``TransactionIndexQueue``, which holds the changes made in
+a transaction in memory and applies them once it commits (so a bulk import in one
+transaction is indexed in batches at the end), and ``DatabaseIndexQueue``, which records
+the changes in the database, to be applied by the ``process_search_queue`` management
+command; with the latter, saving an object no longer depends on the search backend
+being available. Both backends accept a ``BATCH_SIZE`` option (default 1000), the
+number of objects to index at a time. Changes that the database queue fails to apply
+(for example, while the search backend is down) are kept in the queue and retried by
+later runs, up to its ``MAX_ATTEMPTS`` option (default 10) times.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from wagtail.search.backends import get_search_backends_with_name
+from wagtail.search.index import class_is_indexed
+
+logger = logging.getLogger('wagtail.search.index')
+
+
+UPDATE = 'update'
+DELETE = 'delete'
+
+
+_index_queues = {}
+
+
+def get_index_queue():
+    """
+    Return the index queue configured by the ``WAGTAILSEARCH_INDEX_QUEUE`` setting, or
+    None if search indexes should be updated immediately
+    """
+    params = getattr(settings, 'WAGTAILSEARCH_INDEX_QUEUE', None)
+    if not params:
+        return None
+
+    # Queues hold state (such as the changes made in the current transaction), so only
+    # create one of each
+    backend = params['BACKEND']
+    if backend not in _index_queues:
+        _index_queues[backend] = import_string(backend)(params)
+
+    return _index_queues[backend]
+
+
+def get_indexed_instances(model, pks):
+    """
+    Fetch the objects of model with the given primary keys that belong in the search
+    index, in their most specific class (see ``Indexed.get_indexed_instance``). This is
+    the bulk equivalent of ``wagtail.search.index.get_indexed_instance``; it returns an
+    ordered mapping of the classes of the objects to lists of objects.
+    """
+    pks_by_model = OrderedDict()
+    for obj in model._default_manager.filter(pk__in=pks):
+        indexed_instance = obj.get_indexed_instance()
+        if indexed_instance is not None:
+            pks_by_model.setdefault(type(indexed_instance), []).append(indexed_instance.pk)
+
+    # Make sure that the objects are in their class's indexed objects, fetching them
+    # from there so that they come with any related objects that are indexed
+    indexed_instances = OrderedDict()
+    for indexed_model, indexed_pks in pks_by_model.items():
+        objects = list(indexed_model.get_indexed_objects().filter(pk__in=indexed_pks))
+        if objects:
+            indexed_instances[indexed_model] = objects
+
+    return indexed_instances
+
+
+def apply_operations(operations, batch_size=1000):
+    """
+    Update the search backends for a list of ``(model, pk, action)`` tuples, where action
+    is ``UPDATE`` or ``DELETE``. Only the last action for each object is applied.
+
+    Errors raised by the backends are logged rather than raised; the operations that
+    failed for any backend are returned.
+    """
+    actions = OrderedDict()
+    for model, pk, action in operations:
+        actions.pop((model, pk), None)
+        actions[(model, pk)] = action
+
+    pks_to_update = OrderedDict()
+    objects_to_delete = []
+    for (model, pk), action in actions.items():
+        if action == DELETE:
+            objects_to_delete.append(model(pk=pk))
+        else:
+            pks_to_update.setdefault(model, []).append(pk)
+
+    backends = list(get_search_backends_with_name(with_auto_update=True))
+    failed_operations = []
+
+    for model, pks in pks_to_update.items():
+        for i in range(0, len(pks), batch_size):
+            for indexed_model, objects in get_indexed_instances(model, pks[i:i + batch_size]).items():
+                failed = False
+                for backend_name, backend in backends:
+                    try:
+                        backend.add_bulk(indexed_model, objects)
+                    except Exception:
+                        # Catch and log all errors
+                        logger.exception("Exception raised while adding %d %s objects into the '%s' search backend", len(objects), indexed_model.__name__, backend_name)
+                        failed = True
+
+                if failed:
+                    failed_operations.extend((model, obj.pk, UPDATE) for obj in objects)
+
+    for obj in objects_to_delete:
+        failed = False
+        for backend_name, backend in backends:
+            try:
+                backend.delete(obj)
+            except Exception:
+                # Catch and log all errors
+                logger.exception("Exception raised while deleting %r from the '%s' search backend", obj, backend_name)
+                failed = True
+
+        if failed:
+            failed_operations.append((type(obj), obj.pk, DELETE))
+
+    for backend_name, backend in backends:
+        backend.invalidate_results_cache()
+
+    return failed_operations
+
+
+class BaseIndexQueue:
+    def __init__(self, params):
+        self.params = params
+        self.batch_size = params.get('BATCH_SIZE', 1000)
+
+    def add(self, instance):
+        """
+        Queue instance to be added to the search index, or updated if it is already there.
+        The instance is fetched again when the queue is processed, so unsaved changes to it
+        are not indexed.
+        """
+        if instance.pk is not None and class_is_indexed(type(instance)):
+            self.enqueue(type(instance), instance.pk, UPDATE)
+
+    def remove(self, instance):
+        """
+        Queue instance to be removed from the search index
+        """
+        if not class_is_indexed(type(instance)):
+            return
+
+        indexed_instance = instance.get_indexed_instance()
+        if indexed_instance is not None:
+            self.enqueue(type(indexed_instance), indexed_instance.pk, DELETE)
+
+    def enqueue(self, model, pk, action):
+        raise NotImplementedError
+
+
+class TransactionIndexQueue(BaseIndexQueue):
+    """
+    Holds the changes made in each transaction in memory, and applies them when it
+    commits. Outside of a transaction, changes are applied immediately.
+    """
+    def __init__(self, params):
+        super().__init__(params)
+        self.local = threading.local()
+
+    def get_pending_operations(self):
+        """
+        Return the list of changes to apply when the current transaction commits, or None if
+        there are none; changes left over from a transaction that was rolled back are discarded
+        """
+        operations = getattr(self.local, 'operations', None)
+        if operations is None:
+            return None
+
+        connection = transaction.get_connection()
+        if not any(func is self.local.flush for sids, func in connection.run_on_commit):
+            self.local.operations = None
+            return None
+
+        return operations
+
+    def enqueue(self, model, pk, action):
+        operations = self.get_pending_operations()
+        if operations is not None:
+            operations.append((model, pk, action))
+            return
+
+        operations = [(model, pk, action)]
+
+        def flush():
+            if getattr(self.local, 'operations', None) is operations:
+                self.local.operations = None
+
+            try:
+                apply_operations(operations, batch_size=self.batch_size)
+            except Exception:
+                # The transaction has already committed, so don't fail the request
+                logger.exception("Exception raised while updating the search index")
+
+        self.local.operations = operations
+        self.local.flush = flush
+        transaction.on_commit(flush)
+
+
+class DatabaseIndexQueue(BaseIndexQueue):
+    """
+    Records changes in the PendingIndexUpdate table, to be applied by the
+    ``process_search_queue`` management command
+    """
+    def __init__(self, params):
+        super().__init__(params)
+        self.max_attempts = params.get('MAX_ATTEMPTS', 10)
+
+    def enqueue(self, model, pk, action):
+        from django.contrib.contenttypes.models import ContentType
+        from wagtail.search.models import PendingIndexUpdate
+
+        # Only one record is kept per object, holding the latest action
+        PendingIndexUpdate.objects.update_or_create(
+            content_type=ContentType.objects.get_for_model(model, for_concrete_model=False),
+            object_id=str(pk),
+            defaults={'action': action},
+        )
+
+    def claim_batch(self, batch_size, after_id=None):
+        """
+        Return up to batch_size records from the queue (after the record with id after_id, if
+        given), locking them until the current transaction ends. Where the database supports
+        it, records that another process has locked are skipped; otherwise, processes wait for
+        each other's batches.
+        """
+        from wagtail.search.models import PendingIndexUpdate
+
+        pending_updates = PendingIndexUpdate.objects.order_by('id')
+        if after_id is not None:
+            pending_updates = pending_updates.filter(id__gt=after_id)
+        if transaction.get_connection().features.has_select_for_update_skip_locked:
+            pending_updates = pending_updates.select_for_update(skip_locked=True)
+        else:
+            pending_updates = pending_updates.select_for_update()
+
+        return list(pending_updates[:batch_size])
+
+    def process(self, batch_size=None):
+        """
+        Apply all queued changes, returning the number of records processed. Each batch of
+        records is removed from the queue in the same transaction that applies it, so
+        changes that fail to apply (or that a process is interrupted while applying) are
+        kept, to be retried by the next run.
+        """
+        from django.contrib.contenttypes.models import ContentType
+        from django.db.models import F
+        from wagtail.search.models import PendingIndexUpdate
+
+        batch_size = batch_size or self.batch_size
+
+        count = 0
+        after_id = None
+        while True:
+            with transaction.atomic():
+                pending_updates = self.claim_batch(batch_size, after_id=after_id)
+                if not pending_updates:
+                    return count
+
+                operations = []
+                pending_updates_by_object = {}
+                for pending_update in pending_updates:
+                    model = ContentType.objects.get_for_id(pending_update.content_type_id).model_class()
+                    if model is None:
+                        # The model has been removed
+                        continue
+
+                    pk = model._meta.pk.to_python(pending_update.object_id)
+                    operations.append((model, pk, pending_update.action))
+                    pending_updates_by_object[(model, pk)] = pending_update
+
+                retried_ids = []
+                for model, pk, action in apply_operations(operations, batch_size=batch_size):
+                    pending_update = pending_updates_by_object[(model, pk)]
+                    if pending_update.attempts + 1 >= self.max_attempts:
+                        logger.error(
+                            "Giving up on %s of %s %r in the search index after %d attempts",
+                            action, model.__name__, pk, pending_update.attempts + 1
+                        )
+                    else:
+                        retried_ids.append(pending_update.id)
+
+                PendingIndexUpdate.objects.filter(id__in=retried_ids).update(attempts=F('attempts') + 1)
+                PendingIndexUpdate.objects.filter(
+                    id__in=[pending_update.id for pending_update in pending_updates]
+                ).exclude(id__in=retried_ids).delete()
+
+            # Later batches carry on after this one, so the changes that failed aren't retried
+            # until the next run
+            after_id = pending_updates[-1].id
+            count += len(pending_updates)
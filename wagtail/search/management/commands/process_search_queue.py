@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from wagtail.search.index_queue import DatabaseIndexQueue
+
+
+class Command(BaseCommand):
+    help = "Applies the search index changes queued by the database index queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', action='store', dest='batch_size', type=int, default=1000,
+            help="Number of queued changes to fetch and index at a time (default: 1000)")
+
+    def handle(self, *args, **options):
+        params = getattr(settings, 'WAGTAILSEARCH_INDEX_QUEUE', None) or {}
+        count = DatabaseIndexQueue(params).process(batch_size=options['batch_size'])
+        self.stdout.write("Processed %d search index changes" % count)
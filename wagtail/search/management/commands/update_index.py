@@ -1,11 +1,18 @@
 import collections
+import datetime
+from concurrent.futures import ThreadPoolExecutor
 
+from django.apps import apps
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from wagtail.search.backends import get_search_backend
 from wagtail.search.index import get_indexed_models
+from wagtail.search.models import IndexRebuildCheckpoint
 
 
 def group_models_by_index(backend, models):
@@ -50,7 +57,134 @@ def group_models_by_index(backend, models):
 
 
 class Command(BaseCommand):
-    def update_backend(self, backend_name, schema_only=False):
+    def get_models(self, model_labels=None):
+        """
+        Return the indexed models to update: all of them, or those matching model_labels
+        (a list of 'app_label.ModelName' strings), including their subclasses
+        """
+        indexed_models = get_indexed_models()
+        if not model_labels:
+            return indexed_models
+
+        selected_models = []
+        for model_label in model_labels:
+            try:
+                model = apps.get_model(model_label)
+            except (LookupError, ValueError):
+                raise CommandError("Unknown model '%s'" % model_label)
+
+            matching_models = [
+                indexed_model for indexed_model in indexed_models
+                if issubclass(indexed_model, model)
+            ]
+            if not matching_models:
+                raise CommandError("Model '%s' is not indexed" % model_label)
+
+            selected_models.extend(
+                indexed_model for indexed_model in matching_models
+                if indexed_model not in selected_models
+            )
+
+        return selected_models
+
+    def get_queryset(self, model, since=None):
+        queryset = model.get_indexed_objects()
+
+        if since is not None:
+            if model.search_updated_at_field:
+                queryset = queryset.filter(**{model.search_updated_at_field + '__gte': since})
+            else:
+                self.stdout.write(
+                    "{}.{} has no search_updated_at_field; indexing all objects".format(
+                        model._meta.app_label, model.__name__
+                    )
+                )
+
+        return queryset
+
+    def get_checkpoint(self, backend_name, model):
+        return IndexRebuildCheckpoint.objects.filter(
+            backend_name=backend_name,
+            content_type=ContentType.objects.get_for_model(model, for_concrete_model=False),
+        ).first()
+
+    def get_rebuild_index_name(self, backend_name, models):
+        """
+        Return the name of the index that an interrupted run was rebuilding for models, or
+        None if it was only updating the existing index
+        """
+        checkpoint = IndexRebuildCheckpoint.objects.filter(
+            backend_name=backend_name,
+            content_type__in=ContentType.objects.get_for_models(*models, for_concrete_models=False).values(),
+        ).exclude(index_name='').first()
+
+        if checkpoint is not None:
+            return checkpoint.index_name
+
+    def save_checkpoint(self, backend_name, model, last_pk=None, completed=False, index_name=None):
+        defaults = {'completed': completed}
+        if last_pk is not None:
+            defaults['last_pk'] = str(last_pk)
+        if index_name is not None:
+            defaults['index_name'] = index_name
+
+        IndexRebuildCheckpoint.objects.update_or_create(
+            backend_name=backend_name,
+            content_type=ContentType.objects.get_for_model(model, for_concrete_model=False),
+            defaults=defaults,
+        )
+
+    def add_items(self, index, model, items):
+        index.add_items(model, items)
+
+    def add_items_in_thread(self, index, model, items):
+        try:
+            self.add_items(index, model, items)
+        finally:
+            # Each thread has its own database connection; don't leave it open
+            connection.close()
+
+    def index_model(self, backend_name, index, model, queryset, start_after=None, chunk_size=1000, workers=1):
+        """
+        Add the objects in queryset to index, chunk_size at a time, recording a checkpoint
+        after each chunk. Returns the number of objects added.
+        """
+        chunks = self.print_iter_progress(self.queryset_chunks(queryset, chunk_size, start_after=start_after))
+        object_count = 0
+
+        if workers > 1:
+            # Objects are fetched in this thread and indexed in the others. Chunks are completed
+            # in order, so the checkpoint only passes a chunk once all the ones before it are done
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending_chunks = collections.deque()
+                for chunk in chunks:
+                    pending_chunks.append((
+                        chunk[-1].pk, len(chunk), executor.submit(self.add_items_in_thread, index, model, chunk)
+                    ))
+
+                    # Don't fetch more than a few chunks ahead of the workers
+                    while len(pending_chunks) > workers * 2 or (pending_chunks and pending_chunks[0][2].done()):
+                        last_pk, length, future = pending_chunks.popleft()
+                        future.result()
+                        self.save_checkpoint(backend_name, model, last_pk=last_pk)
+                        object_count += length
+
+                while pending_chunks:
+                    last_pk, length, future = pending_chunks.popleft()
+                    future.result()
+                    self.save_checkpoint(backend_name, model, last_pk=last_pk)
+                    object_count += length
+        else:
+            for chunk in chunks:
+                self.add_items(index, model, chunk)
+                self.save_checkpoint(backend_name, model, last_pk=chunk[-1].pk)
+                object_count += len(chunk)
+
+        self.save_checkpoint(backend_name, model, completed=True)
+        return object_count
+
+    def update_backend(self, backend_name, schema_only=False, models=None, since=None, resume=False,
+                       chunk_size=1000, workers=1):
         self.stdout.write("Updating backend: " + backend_name)
 
         backend = get_search_backend(backend_name)
@@ -59,16 +193,60 @@ class Command(BaseCommand):
             self.stdout.write("Backend '%s' doesn't require rebuilding" % backend_name)
             return
 
-        models_grouped_by_index = group_models_by_index(backend, get_indexed_models()).items()
+        checkpoints = IndexRebuildCheckpoint.objects.filter(backend_name=backend_name)
+        if resume and not checkpoints.exists():
+            self.stdout.write(backend_name + ": Nothing to resume")
+            resume = False
+
+        # Whether the interrupted run was rebuilding the indexes, rather than updating them
+        resume_rebuild = resume and checkpoints.exclude(index_name='').exists()
+        if resume_rebuild and (models is not None or since is not None):
+            raise CommandError(
+                "The interrupted run was rebuilding the indexes of backend '%s', so it can't be "
+                "resumed with --model or --since" % backend_name
+            )
+
+        # A partial update adds objects to the existing indexes, rather than rebuilding them
+        partial = models is not None or since is not None or (resume and not resume_rebuild)
+
+        if models is None:
+            models = get_indexed_models()
+
+        if not resume:
+            checkpoints.delete()
+
+        models_grouped_by_index = group_models_by_index(backend, models).items()
         if not models_grouped_by_index:
             self.stdout.write(backend_name + ": No indices to rebuild")
 
         for index, models in models_grouped_by_index:
-            self.stdout.write(backend_name + ": Rebuilding index %s" % index.name)
-
-            # Start rebuild
-            rebuilder = backend.rebuilder_class(index)
-            index = rebuilder.start()
+            rebuild_index_name = self.get_rebuild_index_name(backend_name, models) if resume_rebuild else None
+
+            if rebuild_index_name:
+                self.stdout.write(backend_name + ": Resuming rebuild of index %s" % index.name)
+
+                # Carry on with the index that the interrupted run was building, which
+                # may not be the live one
+                rebuilder = backend.rebuilder_class(index)
+                if getattr(rebuilder, 'resume', None) is None:
+                    raise CommandError(
+                        "Backend '%s' can't resume rebuilding index %s; run update_index "
+                        "without --resume to rebuild it again" % (backend_name, index.name)
+                    )
+                index = rebuilder.resume(rebuild_index_name)
+            elif partial:
+                rebuilder = None
+                self.stdout.write(backend_name + ": Updating index %s" % index.name)
+            else:
+                self.stdout.write(backend_name + ": Rebuilding index %s" % index.name)
+
+                # Start rebuild
+                rebuilder = backend.rebuilder_class(index)
+                index = rebuilder.start()
+
+                # Record the index being built, so that --resume can finish it
+                for model in models:
+                    self.save_checkpoint(backend_name, model, index_name=index.name)
 
             # Add models
             for model in models:
@@ -78,21 +256,39 @@ class Command(BaseCommand):
             object_count = 0
             if not schema_only:
                 for model in models:
+                    start_after = None
+                    if resume:
+                        checkpoint = self.get_checkpoint(backend_name, model)
+                        if checkpoint is not None:
+                            if checkpoint.completed:
+                                continue
+
+                            if checkpoint.last_pk:
+                                start_after = model._meta.pk.to_python(checkpoint.last_pk)
+
                     self.stdout.write('{}: {}.{} '.format(backend_name, model._meta.app_label, model.__name__).ljust(35), ending='')
 
-                    # Add items (1000 at a time)
-                    for chunk in self.print_iter_progress(self.queryset_chunks(model.get_indexed_objects().order_by('pk'))):
-                        index.add_items(model, chunk)
-                        object_count += len(chunk)
+                    object_count += self.index_model(
+                        backend_name, index, model, self.get_queryset(model, since=since),
+                        start_after=start_after, chunk_size=chunk_size, workers=workers
+                    )
 
                     self.print_newline()
 
-            # Finish rebuild
-            rebuilder.finish()
+            if rebuilder is None:
+                index.refresh()
+            else:
+                # Finish rebuild
+                rebuilder.finish()
 
             self.stdout.write(backend_name + ": indexed %d objects" % object_count)
             self.print_newline()
 
+        # Everything is up to date, so there is nothing to resume
+        checkpoints.delete()
+
+        backend.invalidate_results_cache()
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--backend', action='store', dest='backend_name', default=None,
@@ -100,6 +296,39 @@ class Command(BaseCommand):
         parser.add_argument(
             '--schema-only', action='store_true', dest='schema_only', default=False,
             help="Prevents loading any data into the index")
+        parser.add_argument(
+            '--model', action='append', dest='models', metavar='APP_LABEL.MODEL_NAME',
+            help="Only index this model and its subclasses, adding to the existing index "
+                 "rather than rebuilding it. May be given more than once")
+        parser.add_argument(
+            '--since', action='store', dest='since', default=None,
+            help="Only index objects updated since this date or datetime (using the model's "
+                 "search_updated_at_field), adding to the existing index rather than rebuilding it")
+        parser.add_argument(
+            '--resume', action='store_true', dest='resume', default=False,
+            help="Continue an interrupted run from its last checkpoint. An interrupted rebuild "
+                 "is finished off. If there is nothing to resume, this does the same as without --resume")
+        parser.add_argument(
+            '--chunk-size', action='store', dest='chunk_size', type=int, default=1000,
+            help="Number of objects to fetch and index at a time (default: 1000)")
+        parser.add_argument(
+            '--workers', action='store', dest='workers', type=int, default=1,
+            help="Number of threads to index objects in (default: 1). Threads use their own "
+                 "database connections, so don't use this with a backend that rebuilds its "
+                 "index within a database transaction")
+
+    def parse_since(self, value):
+        since = parse_datetime(value)
+        if since is None:
+            date = parse_date(value)
+            if date is None:
+                raise CommandError("Invalid date or datetime '%s'" % value)
+            since = datetime.datetime.combine(date, datetime.time())
+
+        if settings.USE_TZ and timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+        return since
 
     def handle(self, **options):
         # Get list of backends to index
@@ -113,9 +342,20 @@ class Command(BaseCommand):
             # index the 'default' backend only
             backend_names = ['default']
 
+        models = self.get_models(options['models']) if options.get('models') else None
+        since = self.parse_since(options['since']) if options.get('since') else None
+
         # Update backends
         for backend_name in backend_names:
-            self.update_backend(backend_name, schema_only=options.get('schema_only', False))
+            self.update_backend(
+                backend_name,
+                schema_only=options.get('schema_only', False),
+                models=models,
+                since=since,
+                resume=options.get('resume', False),
+                chunk_size=options.get('chunk_size', 1000),
+                workers=options.get('workers', 1),
+            )
 
     def print_newline(self):
         self.stdout.write('')
@@ -143,19 +383,21 @@ class Command(BaseCommand):
 
             self.stdout.flush()
 
-    # Atomic so the count of models doesnt change as it is iterated
-    @transaction.atomic
-    def queryset_chunks(self, qs, chunk_size=1000):
+    def queryset_chunks(self, qs, chunk_size=1000, start_after=None):
         """
-        Yield a queryset in chunks of at most ``chunk_size``. The chunk yielded
-        will be a list, not a queryset. Iterating over the chunks is done in a
-        transaction so that the order and count of items in the queryset
-        remains stable.
+        Yield a queryset in chunks of at most ``chunk_size``, in primary key order,
+        starting after the primary key ``start_after`` if given. The chunk yielded
+        will be a list, not a queryset.
+
+        Each chunk is fetched with a ``pk > last pk`` filter rather than an offset, so
+        fetching a chunk doesn't get slower the further through the table it is, and
+        no transaction needs to be held open between chunks.
         """
-        i = 0
+        qs = qs.order_by('pk')
         while True:
-            items = list(qs[i * chunk_size:][:chunk_size])
+            chunk_qs = qs if start_after is None else qs.filter(pk__gt=start_after)
+            items = list(chunk_qs[:chunk_size])
             if not items:
                 break
             yield items
-            i += 1
+            start_after = items[-1].pk
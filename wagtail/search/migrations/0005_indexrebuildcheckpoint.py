@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('wagtailsearch', '0004_pendingindexupdate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexRebuildCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('backend_name', models.CharField(max_length=255)),
+                ('index_name', models.CharField(blank=True, max_length=255)),
+                ('last_pk', models.CharField(blank=True, max_length=255)),
+                ('completed', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.ContentType')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='indexrebuildcheckpoint',
+            unique_together={('backend_name', 'content_type')},
+        ),
+    ]
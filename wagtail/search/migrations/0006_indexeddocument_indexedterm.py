@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('wagtailsearch', '0005_indexrebuildcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexedDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.CharField(max_length=255)),
+                ('length', models.IntegerField()),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.ContentType')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IndexedTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=100)),
+                ('field', models.CharField(max_length=255)),
+                ('frequency', models.IntegerField()),
+                ('weight', models.FloatField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='wagtailsearch.IndexedDocument')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='indexeddocument',
+            unique_together={('content_type', 'object_id')},
+        ),
+    ]
@@ -1,10 +1,12 @@
 import datetime
 
 from django.conf import settings
-from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
+from wagtail.search.query_hits import get_hits_buffer
 from wagtail.search.utils import MAX_QUERY_STRING_LENGTH, normalise_query_string
 
 
@@ -20,6 +22,12 @@ class Query(models.Model):
     def add_hit(self, date=None):
         if date is None:
             date = timezone.now().date()
+
+        hits_buffer = get_hits_buffer()
+        if hits_buffer is not None and self.pk is not None:
+            hits_buffer.add(self, date)
+            return
+
         daily_hits, created = QueryDailyHits.objects.get_or_create(query=self, date=date)
         daily_hits.hits = models.F('hits') + 1
         daily_hits.save()
@@ -68,8 +76,119 @@ class QueryDailyHits(models.Model):
 
         cls.objects.filter(date__lt=min_date).delete()
 
+    @classmethod
+    def add_hits(cls, hits):
+        """
+        Add hits in bulk, where hits is a dict mapping (query_id, date) tuples to the number
+        of hits to add. Hits on queries that no longer exist are ignored.
+        """
+        with transaction.atomic():
+            query_ids = set(Query.objects.filter(
+                pk__in={query_id for query_id, date in hits}
+            ).values_list('pk', flat=True))
+            hits = {key: count for key, count in hits.items() if key[0] in query_ids}
+
+            existing_pks = {
+                (query_id, date): pk
+                for pk, query_id, date in cls.objects.filter(
+                    query_id__in=query_ids, date__in={date for query_id, date in hits}
+                ).values_list('pk', 'query_id', 'date')
+            }
+
+            # Rows that are given the same number of hits are updated together
+            pks_by_count = {}
+            new_daily_hits = []
+            for (query_id, date), count in hits.items():
+                if (query_id, date) in existing_pks:
+                    pks_by_count.setdefault(count, []).append(existing_pks[(query_id, date)])
+                else:
+                    new_daily_hits.append(cls(query_id=query_id, date=date, hits=count))
+
+            for count, pks in pks_by_count.items():
+                cls.objects.filter(pk__in=pks).update(hits=models.F('hits') + count)
+
+            try:
+                with transaction.atomic():
+                    cls.objects.bulk_create(new_daily_hits)
+            except IntegrityError:
+                # Another process has added some of these rows in the meantime
+                for daily_hits in new_daily_hits:
+                    cls.objects.get_or_create(query_id=daily_hits.query_id, date=daily_hits.date)
+                    cls.objects.filter(query_id=daily_hits.query_id, date=daily_hits.date).update(
+                        hits=models.F('hits') + daily_hits.hits
+                    )
+
     class Meta:
         unique_together = (
             ('query', 'date'),
         )
         verbose_name = _('Query Daily Hits')
+
+
+class PendingIndexUpdate(models.Model):
+    """
+    A change to the search index recorded by the database index queue (see
+    wagtail.search.index_queue), to be applied by the process_search_queue command
+    """
+    ACTION_CHOICES = (
+        ('update', _('Update')),
+        ('delete', _('Delete')),
+    )
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    object_id = models.CharField(max_length=255)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    attempts = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = (
+            ('content_type', 'object_id'),
+        )
+
+
+class IndexRebuildCheckpoint(models.Model):
+    """
+    Records how far the update_index command has got through indexing a model, so that
+    an interrupted run can be continued with ``update_index --resume``. When the run was
+    rebuilding the index, index_name is the name of the index being built (which may not
+    be the live index, with a backend that rebuilds into a new index and then swaps to it)
+    """
+    backend_name = models.CharField(max_length=255)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    index_name = models.CharField(max_length=255, blank=True)
+    last_pk = models.CharField(max_length=255, blank=True)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (
+            ('backend_name', 'content_type'),
+        )
+
+
+class IndexedDocument(models.Model):
+    """
+    An object in the inverted index kept by the indexed database search backend (see
+    wagtail.search.backends.indexed_db)
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    object_id = models.CharField(max_length=255)
+    length = models.IntegerField()
+
+    class Meta:
+        unique_together = (
+            ('content_type', 'object_id'),
+        )
+
+
+class IndexedTerm(models.Model):
+    """
+    The number of times that a term occurs in a search field of an IndexedDocument, and
+    the boost of that field
+    """
+    document = models.ForeignKey(IndexedDocument, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=100, db_index=True)
+    field = models.CharField(max_length=255)
+    frequency = models.IntegerField()
+    weight = models.FloatField()
@@ -0,0 +1,105 @@
+"""
+Buffered recording of search query hits.
+
+By default, ``Query.add_hit`` updates the ``QueryDailyHits`` table for every search,
+which costs a couple of queries on the busiest public page of most sites. When the
+``WAGTAILSEARCH_HITS_BUFFER`` setting is defined, hits are instead counted in memory
+by each process, and the counts are written in bulk (a few queries, however many hits
+there are) once the oldest of them is ``FLUSH_INTERVAL`` seconds old (default 60), or
+once ``MAX_SIZE`` different queries and dates have been counted (default 1000).
+For example::
+
+    WAGTAILSEARCH_HITS_BUFFER = {
+        'FLUSH_INTERVAL': 60,
+        'MAX_SIZE': 1000,
+    }
+
+The hit counts, and so the results of ``Query.get_most_popular``, are the same once
+the hits have been written. The flush is checked for when a hit is added, and runs
+when the process exits; hits that are still buffered when a process is killed are lost.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger('wagtail.search')
+
+
+_hits_buffers = {}
+
+
+def get_hits_buffer():
+    """
+    Return the hits buffer configured by the ``WAGTAILSEARCH_HITS_BUFFER`` setting, or
+    None if hits should be written immediately
+    """
+    params = getattr(settings, 'WAGTAILSEARCH_HITS_BUFFER', None)
+    if params is None:
+        return None
+
+    # Buffers hold the hits counted so far, so only create one for each configuration
+    key = tuple(sorted(params.items()))
+    if key not in _hits_buffers:
+        hits_buffer = HitsBuffer(params)
+        atexit.register(hits_buffer.flush)
+        _hits_buffers[key] = hits_buffer
+
+    return _hits_buffers[key]
+
+
+class HitsBuffer:
+    def __init__(self, params):
+        self.flush_interval = params.get('FLUSH_INTERVAL', 60)
+        self.max_size = params.get('MAX_SIZE', 1000)
+        self.lock = threading.Lock()
+        self.hits = Counter()
+        self.first_hit_time = None
+
+    def add(self, query, date):
+        """
+        Count a hit on query (a saved Query) for date, writing the buffered hits if they
+        are due to be
+        """
+        with self.lock:
+            if not self.hits:
+                self.first_hit_time = time.monotonic()
+
+            self.hits[(query.pk, date)] += 1
+
+            if (len(self.hits) < self.max_size and
+                    time.monotonic() - self.first_hit_time < self.flush_interval):
+                return
+
+            hits = self.take()
+
+        self.write(hits)
+
+    def take(self):
+        hits, self.hits = self.hits, Counter()
+        return hits
+
+    def flush(self):
+        """
+        Write all buffered hits to the database
+        """
+        with self.lock:
+            hits = self.take()
+
+        self.write(hits)
+
+    def write(self, hits):
+        from wagtail.search.models import QueryDailyHits
+
+        if not hits:
+            return
+
+        try:
+            QueryDailyHits.add_hits(hits)
+        except Exception:
+            # Search query statistics aren't worth failing a request for
+            logger.exception("Exception raised while saving %d search query hits", sum(hits.values()))
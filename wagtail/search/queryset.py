@@ -3,10 +3,29 @@ from wagtail.search.backends import get_search_backend
 
 class SearchableQuerySetMixin:
     def search(self, query, fields=None,
-               operator=None, order_by_relevance=True, backend='default'):
+               operator=None, order_by_relevance=True, backend='default', fields_only=None):
         """
         This runs a search query on all the items in the QuerySet
         """
         search_backend = get_search_backend(backend)
-        return search_backend.search(query, self, fields=fields,
-                                     operator=operator, order_by_relevance=order_by_relevance)
+        results = search_backend.search(query, self, fields=fields,
+                                        operator=operator, order_by_relevance=order_by_relevance)
+
+        if fields_only is not None:
+            results = results.values(*fields_only)
+
+        return results
+
+    def autocomplete(self, query, fields=None,
+                     operator=None, order_by_relevance=True, backend='default', fields_only=None):
+        """
+        This runs an autocomplete query on all the items in the QuerySet
+        """
+        search_backend = get_search_backend(backend)
+        results = search_backend.autocomplete(query, self, fields=fields,
+                                              operator=operator, order_by_relevance=order_by_relevance)
+
+        if fields_only is not None:
+            results = results.values(*fields_only)
+
+        return results
@@ -0,0 +1,199 @@
+"""
+A cache of search results, held in front of the search backend.
+
+When the entry for a search backend in ``WAGTAILSEARCH_BACKENDS`` has a ``RESULTS_CACHE``
+option naming one of the caches defined in ``CACHES``, the primary keys of the results of
+each search, and the number of results, are kept in that cache; repeating a search then
+only costs a ``pk__in`` query to fetch the objects, rather than requests to the backend.
+For example::
+
+    WAGTAILSEARCH_BACKENDS = {
+        'default': {
+            'BACKEND': 'wagtail.search.backends.elasticsearch5',
+            'RESULTS_CACHE': {
+                'CACHE': 'search',
+                'TIMEOUT': 300,
+            },
+        },
+    }
+
+Cache keys are made from the name of the backend, the search query (with its text
+lowercased, and whitespace collapsed), the queryset being searched (its model, filters and
+ordering), the other options of the search and the slice of results. They also hold a
+generation number for the backend, which is incremented whenever objects are added to or
+removed from its index through ``wagtail.search.index`` (and so the signal handlers), the
+index queue or the ``update_index`` command, so that results aren't reused once the index
+changes. ``TIMEOUT`` (default 300 seconds) limits how long results are reused for after
+changes made in other ways.
+
+Searches that annotate results with their score, or return field values (see
+``values()``), aren't cached.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+
+from wagtail.search.query import SearchQuery
+
+
+def get_results_cache(backend):
+    """
+    Return the cache holding the results of backend, or None if its results should not be
+    cached
+    """
+    params = getattr(backend, 'results_cache_params', None)
+    if not params:
+        return None
+
+    return caches[params.get('CACHE', 'default')]
+
+
+def get_generation_cache_key(backend):
+    return 'wagtail-search-generation-%s' % backend.name
+
+
+def get_generation(backend, cache):
+    cache_key = get_generation_cache_key(backend)
+    generation = cache.get(cache_key)
+    if generation is None:
+        # Start from the current time, so that results cached under a generation number
+        # that was evicted from the cache are not reused
+        cache.add(cache_key, int(time.time() * 1000), None)
+        generation = cache.get(cache_key)
+
+    return generation
+
+
+def invalidate(backend):
+    """
+    Stop the cached results of backend from being used, as its index has changed
+    """
+    cache = get_results_cache(backend)
+    if cache is None:
+        return
+
+    cache_key = get_generation_cache_key(backend)
+    try:
+        cache.incr(cache_key)
+    except ValueError:
+        # The generation number isn't in the cache, so no results are cached under it
+        pass
+
+
+def get_query_key(query):
+    """
+    Return a hashable representation of a search query (or one of its attributes), which
+    is the same for queries that only differ in the case and spacing of their text
+    """
+    if isinstance(query, SearchQuery):
+        return (query.__class__.__name__, ) + tuple(
+            (name, get_query_key(value)) for name, value in sorted(vars(query).items())
+        )
+    elif isinstance(query, str):
+        return ' '.join(query.lower().split())
+    elif isinstance(query, (list, tuple)):
+        return tuple(get_query_key(value) for value in query)
+    else:
+        return query
+
+
+def get_cache_key(search_results, cache, *extra):
+    query_compiler = search_results.query_compiler
+    queryset = query_compiler.queryset
+
+    try:
+        queryset_sql = str(queryset.query)
+    except EmptyResultSet:
+        queryset_sql = None
+
+    key = repr((
+        type(query_compiler).__name__,
+        query_compiler.autocomplete,
+        get_query_key(query_compiler.query),
+        queryset.model._meta.label,
+        queryset_sql,
+        query_compiler.fields,
+        query_compiler.order_by_relevance,
+        query_compiler.include_partials,
+        search_results.return_pks,
+    ) + extra)
+
+    return 'wagtail-search-results-%s-%s-%s' % (
+        search_results.backend.name,
+        get_generation(search_results.backend, cache),
+        hashlib.md5(key.encode('utf-8')).hexdigest(),
+    )
+
+
+def can_cache(search_results):
+    return not search_results._score_field and not search_results._values_fields
+
+
+def get_cached_results(search_results):
+    """
+    Return the results of search_results from the cache, fetching the objects from the
+    database, or None if they are not cached (or the cache is not enabled)
+    """
+    cache = get_results_cache(search_results.backend)
+    if cache is None or not can_cache(search_results):
+        return None
+
+    pks = cache.get(get_cache_key(search_results, cache, search_results.start, search_results.stop))
+    if pks is None:
+        return None
+
+    if search_results.return_pks:
+        return pks
+
+    queryset = search_results.query_compiler.queryset.filter(pk__in=pks)
+    if search_results.prefetch_related:
+        for prefetch in search_results.prefetch_related:
+            queryset = queryset.prefetch_related(prefetch)
+
+    # Objects that have been deleted since the results were cached are left out
+    objects = {obj.pk: obj for obj in queryset}
+    return [objects[pk] for pk in pks if pk in objects]
+
+
+def cache_results(search_results, results):
+    cache = get_results_cache(search_results.backend)
+    if cache is None or not can_cache(search_results):
+        return
+
+    if search_results.return_pks:
+        pks = list(results)
+    else:
+        pks = [obj.pk for obj in results]
+
+    cache.set(
+        get_cache_key(search_results, cache, search_results.start, search_results.stop),
+        pks,
+        search_results.backend.results_cache_params.get('TIMEOUT', 300)
+    )
+
+
+def get_cached_count(search_results):
+    """
+    Return the number of results of search_results from the cache, or None if it is not
+    cached (or the cache is not enabled)
+    """
+    cache = get_results_cache(search_results.backend)
+    if cache is None:
+        return None
+
+    return cache.get(get_cache_key(search_results, cache, 'count', search_results.start, search_results.stop))
+
+
+def cache_count(search_results, count):
+    cache = get_results_cache(search_results.backend)
+    if cache is None:
+        return
+
+    cache.set(
+        get_cache_key(search_results, cache, 'count', search_results.start, search_results.stop),
+        count,
+        search_results.backend.results_cache_params.get('TIMEOUT', 300)
+    )
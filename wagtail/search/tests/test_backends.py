@@ -4,18 +4,20 @@ import unittest
 from datetime import date
 from io import StringIO
 
+import mock
 from django.conf import settings
 from django.core import management
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 
 from wagtail.search.backends import (
     InvalidSearchBackendError, get_search_backend, get_search_backends)
-from wagtail.search.backends.base import FieldError
-from wagtail.search.backends.db import DatabaseSearchBackend
+from wagtail.search.backends.base import FieldError, SearchResultRecord, ValuesFieldError
+from wagtail.search.backends.db import DatabaseSearchBackend, DatabaseSearchResults
 from wagtail.search.query import MATCH_ALL, And, Boost, Filter, Not, Or, PlainText, Term
 from wagtail.tests.search import models
 from wagtail.tests.utils import WagtailTestUtils
+from wagtail.utils.pagination import paginate
 
 
 class BackendTests(WagtailTestUtils):
@@ -381,6 +383,50 @@ class BackendTests(WagtailTestUtils):
             "A Game of Thrones"
         ])
 
+    # VALUES TESTS
+
+    def test_page(self):
+        results = self.backend.search(MATCH_ALL, models.Book)
+        book_count = models.Book.objects.count()
+
+        page, count = results.page(0, 2)
+        self.assertEqual(len(page), 2)
+        self.assertEqual(count, book_count)
+
+        # Last page
+        page, count = results[1:].page(book_count - 3, book_count + 10)
+        self.assertEqual(len(page), 2)
+        self.assertEqual(count, book_count - 1)
+
+        # Out of range
+        page, count = results.page(book_count + 10, book_count + 20)
+        self.assertEqual(page, [])
+        self.assertEqual(count, book_count)
+
+    def test_values(self):
+        results = self.backend.search(MATCH_ALL, models.Novel.objects.order_by('number_of_pages'), order_by_relevance=False)
+
+        records = list(results.values('title', 'number_of_pages')[:2])
+
+        self.assertIsInstance(records[0], SearchResultRecord)
+        self.assertEqual(records[0], {'title': "Foundation", 'number_of_pages': 255})
+        self.assertEqual(records[1]['title'], "The Hobbit")
+
+        # The model instance is fetched on request
+        self.assertEqual(records[0].instance, models.Novel.objects.get(title="Foundation"))
+
+    def test_values_with_fields_only(self):
+        results = self.backend.search("JavaScript", models.Book, fields_only=['title'])
+
+        self.assertUnsortedListEqual([record['title'] for record in results], [
+            "JavaScript: The good parts",
+            "JavaScript: The Definitive Guide"
+        ])
+
+    def test_values_of_non_indexed_field(self):
+        with self.assertRaises(ValuesFieldError):
+            self.backend.search(MATCH_ALL, models.Author).values('name', 'books')
+
     # MISC TESTS
 
     def test_same_rank_pages(self):
@@ -741,3 +787,46 @@ class TestBackendLoader(TestCase):
         backends = list(get_search_backends())
 
         self.assertEqual(len(backends), 1)
+
+
+class TestPaginateSearchResults(TestCase):
+    fixtures = ['search']
+
+    def paginate(self, page):
+        request = RequestFactory().get('/', {'p': page})
+        results = get_search_backend('wagtail.search.backends.db').search(MATCH_ALL, models.Book)
+        return paginate(request, results, per_page=5)
+
+    def test_paginate(self):
+        book_count = models.Book.objects.count()
+
+        # The count comes with the page, unless it's the last page
+        with mock.patch.object(DatabaseSearchResults, '_do_count', return_value=book_count) as do_count:
+            paginator, page = self.paginate(2)
+
+        self.assertEqual(do_count.call_count, 1)
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(paginator.count, book_count)
+
+        with mock.patch.object(DatabaseSearchResults, '_do_count') as do_count:
+            paginator, page = self.paginate(paginator.num_pages)
+
+        self.assertFalse(do_count.called)
+        self.assertEqual(len(page), book_count - (paginator.num_pages - 1) * 5)
+        self.assertEqual(paginator.count, book_count)
+
+    def test_paginate_out_of_range(self):
+        paginator, page = self.paginate(1000)
+        self.assertEqual(page.number, paginator.num_pages)
+
+    def test_paginate_page_below_range(self):
+        paginator, page = self.paginate(0)
+        self.assertEqual(page.number, paginator.num_pages)
+
+        paginator, page = self.paginate(-1)
+        self.assertEqual(page.number, paginator.num_pages)
+
+    def test_paginate_invalid_page(self):
+        paginator, page = self.paginate('foo')
+        self.assertEqual(page.number, 1)
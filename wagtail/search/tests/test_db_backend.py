@@ -2,6 +2,8 @@ import unittest
 
 from django.test import TestCase
 
+from wagtail.tests.search import models
+
 from .test_backends import BackendTests
 
 
@@ -37,3 +39,10 @@ class TestDBBackend(BackendTests, TestCase):
     @unittest.expectedFailure
     def test_search_callable_field(self):
         super().test_search_callable_field()
+
+    def test_autocomplete(self):
+        results = self.backend.autocomplete("Jav", models.Book)
+        self.assertUnsortedListEqual([r.title for r in results], [
+            "JavaScript: The good parts",
+            "JavaScript: The Definitive Guide"
+        ])
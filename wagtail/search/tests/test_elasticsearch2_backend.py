@@ -491,6 +491,87 @@ class TestElasticsearch2SearchResults(TestCase):
         self.assertEqual(results[1], models.Book.objects.get(id=2))
         self.assertEqual(results[2], models.Book.objects.get(id=1))
 
+    @mock.patch('elasticsearch.Elasticsearch.search')
+    def test_slice_deep_results(self, search):
+        search.return_value = self.construct_search_response([])
+        results = self.get_results()[5000:5010]
+
+        list(results)  # Performs search
+
+        # Slices within the result window are fetched directly, rather than through a scroll
+        search.assert_called_once_with(
+            from_=5000,
+            body={'query': 'QUERY'},
+            _source=False,
+            fields='pk',
+            index='wagtail__searchtests_book',
+            size=10
+        )
+
+    @mock.patch('elasticsearch.Elasticsearch.search')
+    def test_slice_beyond_max_result_window(self, search):
+        search.return_value = self.construct_search_response([])
+        results = self.get_results()[20000:20010]
+
+        list(results)  # Performs search
+
+        search.assert_any_call(
+            body={'query': 'QUERY'},
+            _source=False,
+            fields='pk',
+            index='wagtail__searchtests_book',
+            scroll='2m',
+            size=100
+        )
+
+    @mock.patch('elasticsearch.Elasticsearch.count')
+    @mock.patch('elasticsearch.Elasticsearch.search')
+    def test_page(self, search, count):
+        response = self.construct_search_response([1, 2])
+        response['hits']['total'] = 25
+        search.return_value = response
+
+        results, total = self.get_results().page(10, 20)
+
+        # The total number of results comes with the page, so there's no separate count
+        search.assert_called_once_with(
+            from_=10,
+            body={'query': 'QUERY'},
+            _source=False,
+            fields='pk',
+            index='wagtail__searchtests_book',
+            size=10
+        )
+        self.assertFalse(count.called)
+        self.assertEqual([result.pk for result in results], [1, 2])
+        self.assertEqual(total, 25)
+
+    @mock.patch('elasticsearch.Elasticsearch.search')
+    def test_values(self, search):
+        response = self.construct_search_response([3, 1])
+        for hit, title in zip(response['hits']['hits'], ["Three", "One"]):
+            hit['_source'] = {'title': title}
+        search.return_value = response
+
+        results = self.get_results()
+        results.query_compiler.mapping = results.backend.mapping_class(models.Book)
+
+        # Values are read from the documents, without querying the database
+        with self.assertNumQueries(0):
+            records = list(results.values('title'))
+
+        search.assert_any_call(
+            body={'query': 'QUERY'},
+            _source=['title'],
+            fields='pk',
+            index='wagtail__searchtests_book',
+            scroll='2m',
+            size=100
+        )
+        self.assertEqual(records, [{'title': "Three"}, {'title': "One"}])
+        self.assertEqual(records[0].pk, 3)
+        self.assertEqual(records[0].instance, models.Book.objects.get(id=3))
+
 
 class TestElasticsearch2Mapping(TestCase):
     fixtures = ['search']
@@ -7,7 +7,8 @@ from django.db.models import Q
 from django.test import TestCase
 from elasticsearch.serializer import JSONSerializer
 
-from wagtail.search.backends.elasticsearch5 import Elasticsearch5SearchBackend
+from wagtail.search.backends.elasticsearch5 import (
+    Elasticsearch5SearchBackend, Elasticsearch5SearchResults)
 from wagtail.search.query import MATCH_ALL
 from wagtail.tests.search import models
 
@@ -365,11 +366,11 @@ class TestElasticsearch5SearchResults(TestCase):
         list(results)  # Performs search
 
         search.assert_any_call(
-            body={'query': 'QUERY'},
+            body={'query': 'QUERY', 'sort': ['_score', 'pk']},
             _source=False,
             stored_fields='pk',
             index='wagtail__searchtests_book',
-            scroll='2m',
+            from_=0,
             size=100
         )
 
@@ -491,6 +492,80 @@ class TestElasticsearch5SearchResults(TestCase):
         self.assertEqual(results[1], models.Book.objects.get(id=2))
         self.assertEqual(results[2], models.Book.objects.get(id=1))
 
+    def construct_sorted_search_response(self, results):
+        response = self.construct_search_response(results)
+        for hit in response['hits']['hits']:
+            hit['sort'] = [1, hit['fields']['pk'][0]]
+
+        return response
+
+    @mock.patch('elasticsearch.Elasticsearch.search')
+    def test_slice_beyond_max_result_window(self, search):
+        search.side_effect = [
+            self.construct_sorted_search_response(range(1, 11)),
+            self.construct_sorted_search_response(range(11, 21)),
+            self.construct_sorted_search_response(range(21, 26)),
+            self.construct_sorted_search_response([3, 2, 1]),
+        ]
+
+        with mock.patch.object(Elasticsearch5SearchResults, 'max_result_window', 10):
+            results = list(self.get_results()[25:28])
+
+        # The first 25 results are walked past with search_after, only fetching their sort values
+        self.assertEqual(search.call_count, 4)
+        search.assert_any_call(
+            body={'query': 'QUERY', 'sort': ['_score', 'pk'], 'search_after': [1, '10']},
+            _source=False,
+            stored_fields='pk',
+            index='wagtail__searchtests_book',
+            filter_path=['hits.hits.sort'],
+            size=10
+        )
+        search.assert_called_with(
+            body={'query': 'QUERY', 'sort': ['_score', 'pk'], 'search_after': [1, '25']},
+            _source=False,
+            stored_fields='pk',
+            index='wagtail__searchtests_book',
+            size=3
+        )
+
+        self.assertEqual(results, [models.Book.objects.get(id=3), models.Book.objects.get(id=2), models.Book.objects.get(id=1)])
+
+    @mock.patch('elasticsearch.Elasticsearch.search')
+    def test_iterate_over_all_pages(self, search):
+        search.side_effect = [
+            self.construct_sorted_search_response([1, 2]),
+            self.construct_sorted_search_response([3]),
+        ]
+
+        with mock.patch.object(Elasticsearch5SearchResults, 'page_size', 2):
+            results = list(self.get_results()[1:])
+
+        search.assert_called_with(
+            body={'query': 'QUERY', 'sort': ['_score', 'pk'], 'search_after': [1, '2']},
+            _source=False,
+            stored_fields='pk',
+            index='wagtail__searchtests_book',
+            size=2
+        )
+        self.assertEqual(results, [models.Book.objects.get(id=1), models.Book.objects.get(id=2), models.Book.objects.get(id=3)])
+
+    @mock.patch('elasticsearch.Elasticsearch.search')
+    def test_iterator_uses_scroll(self, search):
+        search.return_value = self.construct_search_response([1])
+        results = self.get_results()
+
+        self.assertEqual(list(results.iterator()), [models.Book.objects.get(id=1)])
+
+        search.assert_any_call(
+            body={'query': 'QUERY'},
+            _source=False,
+            stored_fields='pk',
+            index='wagtail__searchtests_book',
+            scroll='2m',
+            size=100
+        )
+
 
 class TestElasticsearch5Mapping(TestCase):
     fixtures = ['search']
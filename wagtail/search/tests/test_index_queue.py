@@ -0,0 +1,239 @@
+from datetime import date
+from io import StringIO
+
+import mock
+from django.contrib.contenttypes.models import ContentType
+from django.core import management
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from wagtail.search import index
+from wagtail.search.models import PendingIndexUpdate
+from wagtail.tests.search import models
+
+
+DATABASE_INDEX_QUEUE = {
+    'BACKEND': 'wagtail.search.index_queue.DatabaseIndexQueue',
+}
+
+TRANSACTION_INDEX_QUEUE = {
+    'BACKEND': 'wagtail.search.index_queue.TransactionIndexQueue',
+}
+
+
+@mock.patch('wagtail.search.tests.DummySearchBackend', create=True)
+@override_settings(
+    WAGTAILSEARCH_BACKENDS={
+        'default': {
+            'BACKEND': 'wagtail.search.tests.DummySearchBackend'
+        }
+    },
+    WAGTAILSEARCH_INDEX_QUEUE=DATABASE_INDEX_QUEUE,
+)
+class TestDatabaseIndexQueue(TestCase):
+    def create_book(self, title="Test"):
+        return models.Book.objects.create(title=title, publication_date=date(2017, 10, 18), number_of_pages=100)
+
+    def process_queue(self):
+        out = StringIO()
+        management.call_command('process_search_queue', stdout=out)
+        return out.getvalue()
+
+    def test_save_is_queued(self, backend):
+        backend().reset_mock()
+        book = self.create_book()
+
+        self.assertFalse(backend().add.mock_calls)
+        self.assertTrue(PendingIndexUpdate.objects.filter(object_id=str(book.pk), action='update').exists())
+
+    def test_repeated_saves_are_coalesced(self, backend):
+        book = self.create_book()
+        book.title = "Updated test"
+        book.save()
+        index.insert_or_update_object(book)
+
+        self.assertEqual(PendingIndexUpdate.objects.count(), 1)
+
+    def test_delete_replaces_update(self, backend):
+        book = self.create_book()
+        book_id = book.pk
+        book.delete()
+
+        pending_update = PendingIndexUpdate.objects.get()
+        self.assertEqual(pending_update.object_id, str(book_id))
+        self.assertEqual(pending_update.action, 'delete')
+
+    def test_process(self, backend):
+        books = [self.create_book("Test %d" % i) for i in range(3)]
+        books[0].title = "Updated test"
+        books[0].save()
+        backend().reset_mock()
+
+        self.assertEqual(self.process_queue(), "Processed 3 search index changes\n")
+
+        # All three books are indexed in one call, with their current titles
+        backend().add_bulk.assert_called_once()
+        model, objects = backend().add_bulk.call_args[0]
+        self.assertEqual(model, models.Book)
+        self.assertEqual([book.title for book in objects], ["Updated test", "Test 1", "Test 2"])
+        self.assertFalse(backend().add.mock_calls)
+
+        self.assertFalse(PendingIndexUpdate.objects.exists())
+
+    def test_process_delete(self, backend):
+        book = self.create_book()
+        book_id = book.pk
+        book.delete()
+        backend().reset_mock()
+
+        self.process_queue()
+
+        backend().delete.assert_called_once()
+        deleted_object = backend().delete.call_args[0][0]
+        self.assertIsInstance(deleted_object, models.Book)
+        self.assertEqual(deleted_object.pk, book_id)
+        self.assertFalse(backend().add_bulk.mock_calls)
+
+    def test_process_converts_to_specific_class(self, backend):
+        novel = models.Novel.objects.create(
+            title="Test novel", publication_date=date(2017, 10, 18), number_of_pages=100
+        )
+        PendingIndexUpdate.objects.all().delete()
+
+        # Queue the novel through its Book instance
+        index.insert_or_update_object(novel.book_ptr)
+        backend().reset_mock()
+
+        self.process_queue()
+
+        backend().add_bulk.assert_called_once_with(models.Novel, [novel])
+
+    def test_process_skips_objects_not_in_indexed_objects(self, backend):
+        self.create_book("Don't index me!")
+        backend().reset_mock()
+
+        self.process_queue()
+
+        self.assertFalse(backend().add_bulk.mock_calls)
+
+    def test_non_indexed_models_are_not_queued(self, backend):
+        index.insert_or_update_object(ContentType.objects.get_for_model(models.Book))
+
+        self.assertFalse(PendingIndexUpdate.objects.exists())
+
+    def test_failed_changes_are_queued_again(self, backend):
+        book = self.create_book()
+        backend().add_bulk.side_effect = ValueError("Search backend is down")
+
+        with self.assertLogs('wagtail.search.index', level='ERROR'):
+            self.assertEqual(self.process_queue(), "Processed 1 search index changes\n")
+
+        # The change is kept to be retried by the next run, rather than retried straight away
+        backend().add_bulk.assert_called_once()
+        pending_update = PendingIndexUpdate.objects.get()
+        self.assertEqual(pending_update.object_id, str(book.pk))
+        self.assertEqual(pending_update.action, 'update')
+        self.assertEqual(pending_update.attempts, 1)
+
+        backend().add_bulk.side_effect = None
+        backend().reset_mock()
+        self.process_queue()
+
+        backend().add_bulk.assert_called_once_with(models.Book, [book])
+        self.assertFalse(PendingIndexUpdate.objects.exists())
+
+    def test_interrupted_changes_are_kept(self, backend):
+        book = self.create_book()
+
+        with mock.patch('wagtail.search.index_queue.apply_operations', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.process_queue()
+
+        pending_update = PendingIndexUpdate.objects.get()
+        self.assertEqual(pending_update.object_id, str(book.pk))
+        self.assertEqual(pending_update.attempts, 0)
+
+    def test_failed_delete_is_queued_again(self, backend):
+        book = self.create_book()
+        book_id = book.pk
+        book.delete()
+        backend().delete.side_effect = ValueError("Search backend is down")
+
+        with self.assertLogs('wagtail.search.index', level='ERROR'):
+            self.process_queue()
+
+        pending_update = PendingIndexUpdate.objects.get()
+        self.assertEqual(pending_update.object_id, str(book_id))
+        self.assertEqual(pending_update.action, 'delete')
+        self.assertEqual(pending_update.attempts, 1)
+
+    def test_failed_changes_are_not_queued_again_after_max_attempts(self, backend):
+        book = self.create_book()
+        PendingIndexUpdate.objects.update(attempts=9)
+        backend().add_bulk.side_effect = ValueError("Search backend is down")
+
+        with self.assertLogs('wagtail.search.index', level='ERROR') as logs:
+            self.process_queue()
+
+        self.assertFalse(PendingIndexUpdate.objects.exists())
+        self.assertIn("Giving up on update of Book %r" % book.pk, logs.output[-1])
+
+
+@mock.patch('wagtail.search.tests.DummySearchBackend', create=True)
+@override_settings(
+    WAGTAILSEARCH_BACKENDS={
+        'default': {
+            'BACKEND': 'wagtail.search.tests.DummySearchBackend'
+        }
+    },
+    WAGTAILSEARCH_INDEX_QUEUE=TRANSACTION_INDEX_QUEUE,
+)
+class TestTransactionIndexQueue(TransactionTestCase):
+    def create_book(self, title="Test"):
+        return models.Book.objects.create(title=title, publication_date=date(2017, 10, 18), number_of_pages=100)
+
+    def test_changes_are_applied_on_commit(self, backend):
+        backend().reset_mock()
+
+        with transaction.atomic():
+            books = [self.create_book("Test %d" % i) for i in range(3)]
+            books[0].delete()
+
+            self.assertFalse(backend().add_bulk.mock_calls)
+            self.assertFalse(backend().delete.mock_calls)
+
+        backend().add_bulk.assert_called_once_with(models.Book, books[1:])
+        backend().delete.assert_called_once()
+        self.assertFalse(backend().add.mock_calls)
+
+    def test_changes_are_discarded_on_rollback(self, backend):
+        backend().reset_mock()
+
+        try:
+            with transaction.atomic():
+                self.create_book()
+                raise ValueError
+        except ValueError:
+            pass
+
+        with transaction.atomic():
+            book = self.create_book()
+
+        backend().add_bulk.assert_called_once_with(models.Book, [book])
+
+    def test_changes_outside_transaction_are_applied_immediately(self, backend):
+        backend().reset_mock()
+
+        book = self.create_book()
+
+        backend().add_bulk.assert_called_once_with(models.Book, [book])
+
+    def test_catches_index_error(self, backend):
+        backend().add_bulk.side_effect = ValueError("Test")
+        backend().reset_mock()
+
+        with self.assertLogs('wagtail.search.index', level='ERROR') as cm:
+            self.create_book()
+
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn("Exception raised while adding 1 Book objects into the 'default' search backend", cm.output[0])
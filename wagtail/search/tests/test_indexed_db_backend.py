@@ -0,0 +1,103 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core import management
+from django.test import TestCase, override_settings
+
+from wagtail.search.models import IndexedDocument, IndexedTerm
+from wagtail.search.query import Boost, Term
+from wagtail.tests.search import models
+
+from .test_backends import BackendTests
+
+
+@override_settings(WAGTAILSEARCH_BACKENDS={
+    'default': {
+        'BACKEND': 'wagtail.search.backends.db',
+    },
+    'indexed_db': {
+        'BACKEND': 'wagtail.search.backends.indexed_db',
+        'AUTO_UPDATE': False,
+    },
+})
+class TestIndexedDBBackend(BackendTests, TestCase):
+    backend_path = 'wagtail.search.backends.indexed_db'
+
+    def test_autocomplete_not_supported(self):
+        with self.assertRaises(NotImplementedError):
+            self.backend.autocomplete("Jav", models.Book)
+
+    def test_ranked_page(self):
+        results = self.backend.search("JavaScript Definitive", models.Book, operator='or')
+        titles = [r.title for r in results]
+
+        page, count = results.page(1, 2)
+
+        self.assertEqual([r.title for r in page], titles[1:2])
+        self.assertEqual(count, len(titles))
+
+    def test_annotate_score(self):
+        results = list(self.backend.search("JavaScript Definitive", models.Book, operator='or').annotate_score('_score'))
+
+        self.assertEqual(results[0].title, "JavaScript: The Definitive Guide")
+        self.assertGreater(results[0]._score, results[1]._score)
+        self.assertGreater(results[1]._score, 0)
+
+    def test_annotate_score_without_ordering_by_relevance(self):
+        results = list(
+            self.backend.search("JavaScript Definitive", models.Book, operator='or', order_by_relevance=False)
+            .annotate_score('_score')
+        )
+        scores = {r.title: r._score for r in results}
+
+        self.assertGreater(scores["JavaScript: The Definitive Guide"], scores["JavaScript: The good parts"])
+        self.assertGreater(scores["JavaScript: The good parts"], 0)
+
+    def test_term_boosting(self):
+        results = list(self.backend.search(Term('definitive') | Boost(Term('good'), 10), models.Book))
+
+        self.assertEqual([r.title for r in results], [
+            "JavaScript: The good parts",
+            "JavaScript: The Definitive Guide",
+        ])
+
+    def test_index_terms(self):
+        book = models.Book.objects.create(title="Hello hello world", publication_date=date(2017, 10, 18), number_of_pages=100)
+        self.backend.add(book)
+
+        book_content_type = ContentType.objects.get_for_model(models.Book)
+        document = IndexedDocument.objects.get(content_type=book_content_type, object_id=str(book.pk))
+        self.assertEqual(document.length, 3)
+        self.assertEqual(
+            set(document.terms.values_list('term', 'field', 'frequency', 'weight')),
+            {('hello', 'title', 2, 2.0), ('world', 'title', 1, 2.0)}
+        )
+
+        # Indexing the book again replaces its terms
+        book.title = "Goodbye"
+        book.save()
+        self.backend.add(book)
+
+        self.assertEqual(
+            list(IndexedTerm.objects.filter(document__content_type=book_content_type, document__object_id=str(book.pk))
+                 .values_list('term', flat=True)),
+            ['goodbye']
+        )
+        self.assertEqual([r.title for r in self.backend.search("Goodbye", models.Book)], ["Goodbye"])
+
+        # Deleting the book removes it from the index
+        self.backend.delete(book)
+
+        self.assertFalse(IndexedDocument.objects.filter(content_type=book_content_type, object_id=str(book.pk)).exists())
+
+    def test_rebuild_deletes_stale_entries(self):
+        novel = models.Novel.objects.get(title="Foundation")
+        novel_id = str(novel.pk)
+        novel.delete()
+
+        management.call_command('update_index', backend_name=self.backend_name, stdout=StringIO())
+
+        self.assertFalse(IndexedDocument.objects.filter(
+            content_type=ContentType.objects.get_for_model(models.Novel), object_id=novel_id
+        ).exists())
@@ -2,10 +2,11 @@ import datetime
 from io import StringIO
 
 from django.core import management
-from django.test import SimpleTestCase, TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
 from wagtail.contrib.search_promotions.models import SearchPromotion
 from wagtail.search import models
+from wagtail.search.query_hits import get_hits_buffer
 from wagtail.search.utils import normalise_query_string, separate_filters_from_query
 from wagtail.tests.utils import WagtailTestUtils
 
@@ -30,6 +31,77 @@ class TestHitCounter(TestCase):
         self.assertEqual(models.Query.get("Hello").hits, 10)
 
 
+@override_settings(WAGTAILSEARCH_HITS_BUFFER={'MAX_SIZE': 3})
+class TestHitsBuffer(TestCase):
+    def tearDown(self):
+        get_hits_buffer().take()
+
+    def test_hits_are_buffered(self):
+        query = models.Query.get("Hello")
+
+        with self.assertNumQueries(0):
+            for i in range(10):
+                query.add_hit()
+
+        self.assertEqual(query.hits, 0)
+
+        get_hits_buffer().flush()
+        self.assertEqual(query.hits, 10)
+
+    def test_flush_when_full(self):
+        queries = [models.Query.get("Hello %d" % i) for i in range(3)]
+
+        queries[0].add_hit()
+        queries[0].add_hit()
+        queries[1].add_hit()
+        self.assertFalse(models.QueryDailyHits.objects.exists())
+
+        queries[2].add_hit()
+        self.assertEqual([query.hits for query in queries], [2, 1, 1])
+
+    @override_settings(WAGTAILSEARCH_HITS_BUFFER={'FLUSH_INTERVAL': 0})
+    def test_flush_after_interval(self):
+        query = models.Query.get("Hello")
+        query.add_hit()
+
+        self.assertEqual(query.hits, 1)
+
+    def test_flush_adds_to_existing_hits(self):
+        today = datetime.date.today()
+        yesterday = today - datetime.timedelta(days=1)
+        query = models.Query.get("Hello")
+        query.daily_hits.create(date=today, hits=5)
+
+        query.add_hit(date=today)
+        query.add_hit(date=yesterday)
+        get_hits_buffer().flush()
+
+        self.assertEqual(query.daily_hits.get(date=today).hits, 6)
+        self.assertEqual(query.daily_hits.get(date=yesterday).hits, 1)
+
+    def test_flush_ignores_deleted_queries(self):
+        query = models.Query.get("Hello")
+        query.add_hit()
+        models.Query.objects.filter(pk=query.pk).delete()
+
+        get_hits_buffer().flush()
+        self.assertFalse(models.QueryDailyHits.objects.exists())
+
+    def test_query_popularity(self):
+        for i in range(3):
+            models.Query.get("unpopular query").add_hit()
+        for i in range(10):
+            models.Query.get("popular query").add_hit()
+        get_hits_buffer().flush()
+
+        popular_queries = models.Query.get_most_popular()
+        self.assertEqual(list(popular_queries), [
+            models.Query.get("popular query"),
+            models.Query.get("unpopular query"),
+        ])
+        self.assertEqual([query._hits for query in popular_queries], [10, 3])
+
+
 class TestQueryStringNormalisation(TestCase):
     def setUp(self):
         self.query = models.Query.get("Hello World!")
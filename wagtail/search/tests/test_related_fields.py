@@ -1,6 +1,7 @@
 from django.test import TestCase
 
 from wagtail.search import index
+from wagtail.search.backends.elasticsearch2 import Elasticsearch2Mapping
 from wagtail.tests.search.models import Book, Novel
 from wagtail.tests.testapp.models import Advert, ManyToManyBlogPage
 
@@ -84,3 +85,69 @@ class TestSelectOnQuerySet(TestCase):
         # Tags should be prefetch_related
         self.assertIn('tags', queryset._prefetch_related_lookups)
         self.assertFalse(queryset.query.select_related)
+
+    def test_select_on_queryset_with_nested_prefetch(self):
+        fields = index.RelatedFields('categories', [
+            index.RelatedFields('category', [
+                index.SearchField('name')
+            ])
+        ])
+
+        queryset = fields.select_on_queryset(ManyToManyBlogPage.objects.all())
+
+        # Relations below a prefetched relation are prefetched too
+        self.assertEqual(queryset._prefetch_related_lookups, ('categories', 'categories__category'))
+        self.assertFalse(queryset.query.select_related)
+
+    def test_select_on_queryset_with_nested_select(self):
+        fields = index.RelatedFields('protagonist', [
+            index.RelatedFields('novel', [
+                index.RelatedFields('characters', [
+                    index.SearchField('name'),
+                ]),
+            ]),
+        ])
+
+        queryset = fields.select_on_queryset(Novel.objects.all())
+
+        self.assertEqual(queryset.query.select_related, {'protagonist': {'novel': {}}})
+        self.assertEqual(queryset._prefetch_related_lookups, ('protagonist__novel__characters', ))
+
+
+class TestPrefetchSearchRelatedObjects(TestCase):
+    fixtures = ['search']
+
+    def test_get_search_related_lookups(self):
+        select_related, prefetch_related = Novel.get_search_related_lookups()
+
+        self.assertEqual(select_related, ['protagonist'])
+        self.assertEqual(set(prefetch_related), {'authors', 'tags', 'characters'})
+
+    def test_get_indexed_objects(self):
+        queryset = Novel.get_indexed_objects()
+
+        self.assertIn('protagonist', queryset.query.select_related)
+        self.assertEqual(set(queryset._prefetch_related_lookups), {'authors', 'tags', 'characters'})
+
+    def test_build_documents_without_queries(self):
+        novels = list(Novel.objects.all())
+        mapping = Elasticsearch2Mapping(Novel)
+
+        # One query for each relation
+        with self.assertNumQueries(4):
+            index.prefetch_search_related_objects(Novel, novels)
+
+        with self.assertNumQueries(0):
+            documents = [mapping.get_document(novel) for novel in novels]
+
+        lord_of_the_rings = documents[[novel.title for novel in novels].index("The Fellowship of the Ring")]
+        self.assertEqual(
+            [author['name'] for author in lord_of_the_rings['authors']],
+            ["J. R. R. Tolkien"]
+        )
+
+    def test_already_fetched_relations_are_not_fetched_again(self):
+        novels = list(Novel.get_indexed_objects())
+
+        with self.assertNumQueries(0):
+            index.prefetch_search_related_objects(Novel, novels)
@@ -0,0 +1,136 @@
+from datetime import date
+
+import mock
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from wagtail.search import index
+from wagtail.search.backends import get_search_backend
+from wagtail.search.backends.db import DatabaseSearchResults
+from wagtail.tests.search import models
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'search': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'wagtail-search-results',
+        },
+    },
+    WAGTAILSEARCH_BACKENDS={
+        'default': {
+            'BACKEND': 'wagtail.search.backends.db',
+            'RESULTS_CACHE': {
+                'CACHE': 'search',
+            },
+        },
+    },
+)
+class TestResultCache(TestCase):
+    fixtures = ['search']
+
+    def setUp(self):
+        caches['search'].clear()
+        self.backend = get_search_backend('default')
+
+    def search(self, query, queryset=None, **kwargs):
+        if queryset is None:
+            queryset = models.Book.objects.all()
+
+        with mock.patch.object(DatabaseSearchResults, '_do_search', autospec=True,
+                               side_effect=DatabaseSearchResults._do_search) as do_search:
+            results = list(self.backend.search(query, queryset, **kwargs))
+
+        return results, do_search.called
+
+    def test_repeated_search_is_cached(self):
+        results, searched = self.search("JavaScript")
+        self.assertTrue(searched)
+        self.assertEqual(len(results), 2)
+
+        with self.assertNumQueries(1):
+            cached_results, searched = self.search("JavaScript")
+
+        self.assertFalse(searched)
+        self.assertEqual(cached_results, results)
+
+    def test_query_is_normalised(self):
+        self.search("JavaScript  Definitive", operator='and')
+
+        results, searched = self.search("javascript definitive", operator='and')
+        self.assertFalse(searched)
+        self.assertEqual([book.title for book in results], ["JavaScript: The Definitive Guide"])
+
+    def test_different_searches_are_not_shared(self):
+        self.search("JavaScript")
+
+        results, searched = self.search("JavaScript", operator='or')
+        self.assertTrue(searched)
+
+        results, searched = self.search("JavaScript", models.Book.objects.filter(number_of_pages__lt=0))
+        self.assertTrue(searched)
+        self.assertEqual(results, [])
+
+        results, searched = self.search("JavaScript", models.Author.objects.all())
+        self.assertTrue(searched)
+
+    def test_autocomplete_is_not_shared_with_search(self):
+        self.search("JavaScript")
+
+        with mock.patch.object(DatabaseSearchResults, '_do_search', autospec=True,
+                               side_effect=DatabaseSearchResults._do_search) as do_search:
+            list(self.backend.autocomplete("JavaScript", models.Book.objects.all()))
+
+        self.assertTrue(do_search.called)
+
+    def test_slices_are_cached_separately(self):
+        results = self.backend.search("JavaScript", models.Book)
+        list(results[:1])
+        self.assertEqual(len(list(results[1:])), 1)
+
+    def test_count_is_cached(self):
+        self.assertEqual(self.backend.search("JavaScript", models.Book).count(), 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.search("JavaScript", models.Book).count(), 2)
+
+    def test_return_pks(self):
+        results, searched = self.search("JavaScript", return_pks=True)
+
+        with self.assertNumQueries(0):
+            cached_results, searched = self.search("JavaScript", return_pks=True)
+
+        self.assertFalse(searched)
+        self.assertEqual(cached_results, results)
+
+    def test_scores_are_not_cached(self):
+        list(self.backend.search("JavaScript", models.Book).annotate_score('_score'))
+
+        results, searched = self.search("JavaScript")
+        self.assertTrue(searched)
+
+    def test_index_changes_invalidate_results(self):
+        self.search("JavaScript")
+
+        book = models.Book.objects.create(
+            title="JavaScript for beginners", publication_date=date(2018, 1, 1), number_of_pages=100
+        )
+        index.insert_or_update_object(book)
+
+        results, searched = self.search("JavaScript")
+        self.assertTrue(searched)
+        self.assertIn(book, results)
+
+    def test_deleted_objects_are_left_out(self):
+        results, searched = self.search("JavaScript")
+
+        # Delete the object without updating the index
+        with mock.patch.object(self.backend.__class__, 'invalidate_results_cache'):
+            results[0].delete()
+
+        cached_results, searched = self.search("JavaScript")
+        self.assertFalse(searched)
+        self.assertEqual(cached_results, results[1:])
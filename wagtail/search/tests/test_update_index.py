@@ -0,0 +1,245 @@
+from datetime import date
+from io import StringIO
+
+import mock
+from django.contrib.contenttypes.models import ContentType
+from django.core import management
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from wagtail.search.backends.base import BaseSearchBackend
+from wagtail.search.models import IndexRebuildCheckpoint
+from wagtail.tests.search import models
+
+
+class RecordingIndex:
+    name = 'recording'
+
+    # Shared by all instances, as the command creates a new backend for each backend name
+    calls = []
+    fail_after = None
+
+    def add_model(self, model):
+        pass
+
+    def add_items(self, model, items):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise ValueError("Failed to add items")
+
+        self.calls.append((model, [item.pk for item in items]))
+
+    def refresh(self):
+        pass
+
+    @classmethod
+    def get_indexed_pks(cls, model):
+        return [pk for call_model, pks in cls.calls if call_model is model for pk in pks]
+
+
+class RecordingRebuilder:
+    # Rebuilds into a new index, like the Elasticsearch backends do with ATOMIC_REBUILD
+    started = False
+    resumed_index_name = None
+    finished = False
+
+    def __init__(self, index):
+        self.index = RecordingIndex()
+        self.index.name = 'recording_new'
+
+    def start(self):
+        RecordingRebuilder.started = True
+        return self.index
+
+    def resume(self, index_name):
+        RecordingRebuilder.resumed_index_name = index_name
+        return self.index
+
+    def finish(self):
+        RecordingRebuilder.finished = True
+
+
+class RecordingSearchBackend(BaseSearchBackend):
+    rebuilder_class = RecordingRebuilder
+
+    def get_index_for_model(self, model):
+        return RecordingIndex()
+
+    def add(self, obj):
+        pass
+
+    def delete(self, obj):
+        pass
+
+
+@override_settings(WAGTAILSEARCH_BACKENDS={
+    'default': {
+        'BACKEND': 'wagtail.search.tests.test_update_index.RecordingSearchBackend',
+    }
+})
+class TestUpdateIndexCommand(TestCase):
+    fixtures = ['search']
+
+    def setUp(self):
+        RecordingIndex.calls = []
+        RecordingIndex.fail_after = None
+        RecordingRebuilder.started = False
+        RecordingRebuilder.resumed_index_name = None
+        RecordingRebuilder.finished = False
+
+    def update_index(self, **options):
+        management.call_command('update_index', stdout=StringIO(), **options)
+
+    def test_rebuild(self):
+        self.update_index()
+
+        self.assertTrue(RecordingRebuilder.started)
+        self.assertEqual(
+            RecordingIndex.get_indexed_pks(models.Author),
+            list(models.Author.objects.order_by('pk').values_list('pk', flat=True))
+        )
+        self.assertEqual(
+            RecordingIndex.get_indexed_pks(models.Novel),
+            list(models.Novel.objects.order_by('pk').values_list('pk', flat=True))
+        )
+        self.assertFalse(IndexRebuildCheckpoint.objects.exists())
+
+    def test_chunks(self):
+        self.update_index(models=['searchtests.Author'], chunk_size=4)
+
+        author_pks = list(models.Author.objects.order_by('pk').values_list('pk', flat=True))
+        self.assertEqual(RecordingIndex.calls, [
+            (models.Author, author_pks[0:4]),
+            (models.Author, author_pks[4:8]),
+            (models.Author, author_pks[8:]),
+        ])
+
+    def test_workers(self):
+        self.update_index(chunk_size=2, workers=3)
+
+        self.assertEqual(
+            sorted(RecordingIndex.get_indexed_pks(models.Author)),
+            list(models.Author.objects.order_by('pk').values_list('pk', flat=True))
+        )
+        self.assertFalse(IndexRebuildCheckpoint.objects.exists())
+
+    def test_model(self):
+        self.update_index(models=['searchtests.Book'])
+
+        # Partial updates add to the existing index
+        self.assertFalse(RecordingRebuilder.started)
+
+        # Subclasses are included
+        self.assertEqual(
+            {model for model, pks in RecordingIndex.calls},
+            {models.Novel, models.ProgrammingGuide}
+        )
+
+    def test_unknown_model(self):
+        with self.assertRaises(CommandError):
+            self.update_index(models=['searchtests.Spaceship'])
+
+    def test_since(self):
+        with mock.patch.object(models.Book, 'search_updated_at_field', 'publication_date'):
+            self.update_index(models=['searchtests.Book', 'searchtests.Author'], since='1998-01-01')
+
+        indexed_book_pks = (
+            RecordingIndex.get_indexed_pks(models.Novel) + RecordingIndex.get_indexed_pks(models.ProgrammingGuide)
+        )
+        self.assertEqual(
+            sorted(indexed_book_pks),
+            list(models.Book.objects.filter(publication_date__gte=date(1998, 1, 1)).order_by('pk').values_list('pk', flat=True))
+        )
+        self.assertLess(len(indexed_book_pks), models.Book.objects.count())
+
+        # Authors have no search_updated_at_field, so all of them are indexed
+        self.assertEqual(len(RecordingIndex.get_indexed_pks(models.Author)), models.Author.objects.count())
+
+    def test_invalid_since(self):
+        with self.assertRaises(CommandError):
+            self.update_index(since='last tuesday')
+
+    def test_resume_after_failure(self):
+        author_pks = list(models.Author.objects.order_by('pk').values_list('pk', flat=True))
+
+        RecordingIndex.fail_after = 2
+        with self.assertRaises(ValueError):
+            self.update_index(models=['searchtests.Author'], chunk_size=4)
+
+        checkpoint = IndexRebuildCheckpoint.objects.get(backend_name='default')
+        self.assertEqual(checkpoint.last_pk, str(author_pks[7]))
+        self.assertFalse(checkpoint.completed)
+
+        RecordingIndex.calls = []
+        RecordingIndex.fail_after = None
+        self.update_index(models=['searchtests.Author'], chunk_size=4, resume=True)
+
+        self.assertEqual(RecordingIndex.calls, [(models.Author, author_pks[8:])])
+        self.assertFalse(IndexRebuildCheckpoint.objects.exists())
+
+    def test_resume_skips_completed_models(self):
+        # Pretend that a run was interrupted after indexing authors
+        IndexRebuildCheckpoint.objects.create(
+            backend_name='default',
+            content_type=ContentType.objects.get_for_model(models.Author),
+            completed=True,
+        )
+
+        self.update_index(models=['searchtests.Author', 'searchtests.Novel'], resume=True)
+
+        self.assertFalse(RecordingRebuilder.started)
+        self.assertEqual({model for model, pks in RecordingIndex.calls}, {models.Novel})
+
+    def test_resume_rebuild_after_failure(self):
+        author_pks = list(models.Author.objects.order_by('pk').values_list('pk', flat=True))
+
+        RecordingIndex.fail_after = 2
+        with self.assertRaises(ValueError):
+            self.update_index(chunk_size=4)
+
+        # The new index isn't swapped in until the rebuild finishes
+        self.assertFalse(RecordingRebuilder.finished)
+        checkpoint = IndexRebuildCheckpoint.objects.get(
+            backend_name='default',
+            content_type=ContentType.objects.get_for_model(models.Author),
+        )
+        self.assertEqual(checkpoint.index_name, 'recording_new')
+        self.assertEqual(checkpoint.last_pk, str(author_pks[7]))
+
+        RecordingIndex.calls = []
+        RecordingIndex.fail_after = None
+        RecordingRebuilder.started = False
+        self.update_index(chunk_size=4, resume=True)
+
+        # The rebuild carries on into the same index, then finishes it
+        self.assertFalse(RecordingRebuilder.started)
+        self.assertEqual(RecordingRebuilder.resumed_index_name, 'recording_new')
+        self.assertTrue(RecordingRebuilder.finished)
+        self.assertEqual(RecordingIndex.get_indexed_pks(models.Author), author_pks[8:])
+        self.assertEqual(
+            RecordingIndex.get_indexed_pks(models.Novel),
+            list(models.Novel.objects.order_by('pk').values_list('pk', flat=True))
+        )
+        self.assertFalse(IndexRebuildCheckpoint.objects.exists())
+
+    def test_resume_rebuild_with_rebuilder_that_cant_resume(self):
+        RecordingIndex.fail_after = 2
+        with self.assertRaises(ValueError):
+            self.update_index(chunk_size=4)
+
+        RecordingIndex.fail_after = None
+        with mock.patch.object(RecordingRebuilder, 'resume', None):
+            with self.assertRaises(CommandError):
+                self.update_index(chunk_size=4, resume=True)
+
+        self.assertFalse(RecordingRebuilder.finished)
+
+    def test_resume_without_checkpoints(self):
+        self.update_index(resume=True)
+
+        # There's nothing to resume, so the index is rebuilt
+        self.assertTrue(RecordingRebuilder.started)
+        self.assertTrue(RecordingRebuilder.finished)
+        self.assertEqual(
+            RecordingIndex.get_indexed_pks(models.Author),
+            list(models.Author.objects.order_by('pk').values_list('pk', flat=True))
+        )
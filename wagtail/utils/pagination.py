@@ -1,8 +1,10 @@
 from urllib.parse import parse_qs
 
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
 from django.utils.http import urlencode
 
+from wagtail.search.backends.base import BaseSearchResults
+
 DEFAULT_PAGE_KEY = 'p'
 
 
@@ -10,6 +12,24 @@ def paginate(request, items, page_key=DEFAULT_PAGE_KEY, per_page=20):
     page = request.GET.get(page_key, 1)
 
     paginator = Paginator(items, per_page)
+
+    if isinstance(items, BaseSearchResults):
+        # Fetch the page of search results along with the number of results, which
+        # search backends can find in the same request
+        try:
+            number = int(page)
+        except (TypeError, ValueError):
+            number = 1
+
+        # Page numbers below 1 are out of range, so they fall back to the last page below
+        if number >= 1:
+            bottom = (number - 1) * per_page
+            results, paginator.count = items.page(bottom, bottom + per_page)
+            if results or number == 1:
+                return paginator, Page(results, number, paginator)
+
+        # The page is out of range, so fall back to the last page below
+
     try:
         page = paginator.page(page)
     except PageNotAnInteger: